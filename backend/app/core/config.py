@@ -1,5 +1,7 @@
 from dotenv import load_dotenv
 import os
+import json
+import tempfile
 from datetime import timedelta
 
 load_dotenv()  # load environment variables from .env
@@ -16,8 +18,69 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL = os.getenv("DATABASE_URL")
+    # Serve the main routes with async def handlers on an AsyncSession instead of the threadpool
+    DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")  # defaults to DATABASE_URL with its async driver
+    # Read replicas (comma-separated URLs): read-only routes are spread over them, writes stay on DATABASE_URL
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    # After a user's own write, their reads go to the primary this long so replica lag can't hide it
+    READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"  # log every statement
+    # Warn when one request runs the same statement this many times (an N+1 loop); 0 disables
+    SQL_REPEATED_QUERY_THRESHOLD = int(os.getenv("SQL_REPEATED_QUERY_THRESHOLD", "5"))
     JWT_SECRET = os.getenv("JWT_SECRET", "fallbacksecret")
     JWT_ALGO = os.getenv("JWT_ALGO", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
+    # Users resolved from tokens are cached per worker: changes made through another worker show after the TTL
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))  # 0 disables the cache
+    USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+    # Market data
+    MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "coingecko")  # or "replay" to run offline
+    MARKET_DATA_REPLAY_PATH = os.getenv("MARKET_DATA_REPLAY_PATH", os.path.join(os.path.dirname(__file__), "..", "..", "fixtures", "prices.jsonl"))
+    MARKET_DATA_RECORD_PATH = os.getenv("MARKET_DATA_RECORD_PATH")  # append every live fetch here as a replay fixture
+    MARKET_DATA_TIMEOUT_SECONDS = float(os.getenv("MARKET_DATA_TIMEOUT_SECONDS", "10"))
+    MARKET_DATA_POOL_SIZE = int(os.getenv("MARKET_DATA_POOL_SIZE", "10"))
+    # Hedged fetches: if the primary is slower than its p95, ask the secondary too
+    MARKET_DATA_SECONDARY_PROVIDER = os.getenv("MARKET_DATA_SECONDARY_PROVIDER")  # unset disables hedging
+    MARKET_DATA_SECONDARY_BASE_URL = os.getenv("MARKET_DATA_SECONDARY_BASE_URL")  # e.g. a CoinGecko-compatible mirror
+    MARKET_DATA_SECONDARY_REPLAY_PATH = os.getenv("MARKET_DATA_SECONDARY_REPLAY_PATH")
+    MARKET_DATA_HEDGE_MIN_DELAY_MS = float(os.getenv("MARKET_DATA_HEDGE_MIN_DELAY_MS", "50"))
+    MARKET_DATA_HEDGE_MAX_DELAY_MS = float(os.getenv("MARKET_DATA_HEDGE_MAX_DELAY_MS", "2000"))
+    MARKET_DATA_HEDGE_INITIAL_DELAY_MS = float(os.getenv("MARKET_DATA_HEDGE_INITIAL_DELAY_MS", "500"))  # until enough samples
+    # Outbound rate limit shared by every market data call in this process (CoinGecko free tier is ~30/min)
+    MARKET_DATA_RATE_LIMIT_PER_SECOND = float(os.getenv("MARKET_DATA_RATE_LIMIT_PER_SECOND", "0.5"))
+    MARKET_DATA_RATE_LIMIT_BURST = int(os.getenv("MARKET_DATA_RATE_LIMIT_BURST", "5"))
+    MARKET_DATA_RATE_LIMIT_MIN_PER_SECOND = float(os.getenv("MARKET_DATA_RATE_LIMIT_MIN_PER_SECOND", "0.05"))
+    MARKET_DATA_RATE_LIMIT_MAX_BACKOFF_SECONDS = float(os.getenv("MARKET_DATA_RATE_LIMIT_MAX_BACKOFF_SECONDS", "120"))
+    MARKET_DATA_REQUEST_MAX_WAIT_SECONDS = float(os.getenv("MARKET_DATA_REQUEST_MAX_WAIT_SECONDS", "0"))  # 0: serve cached instead of queueing
+    COINGECKO_BASE_URL = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
+    COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY")
+    COINGECKO_SYMBOL_MAP = json.loads(os.getenv("COINGECKO_SYMBOL_MAP", "{}"))  # e.g. {"SOL": "solana"}
+    PRICE_REFRESHER_ENABLED = os.getenv("PRICE_REFRESHER_ENABLED", "true").lower() == "true"
+    PRICE_REFRESH_INTERVAL_SECONDS = float(os.getenv("PRICE_REFRESH_INTERVAL_SECONDS", "20"))
+    PRICE_CACHE_SOFT_TTL_SECONDS = float(os.getenv("PRICE_CACHE_SOFT_TTL_SECONDS", "60"))
+    PRICE_CACHE_HARD_TTL_SECONDS = float(os.getenv("PRICE_CACHE_HARD_TTL_SECONDS", "600"))  # past this, callers wait for a fetch
+    # "memory" keeps one cache per worker, "sqlite" shares one file between all workers on the host
+    PRICE_CACHE_BACKEND = os.getenv("PRICE_CACHE_BACKEND", "memory")
+    PRICE_CACHE_PATH = os.getenv("PRICE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "crypto_port_prices.sqlite3"))
+    PRICE_STREAM_QUEUE_SIZE = int(os.getenv("PRICE_STREAM_QUEUE_SIZE", "16"))  # ticks buffered per slow client
+    PRICE_STREAM_HEARTBEAT_SECONDS = float(os.getenv("PRICE_STREAM_HEARTBEAT_SECONDS", "15"))
+    PRICE_HISTORY_DIR = os.getenv("PRICE_HISTORY_DIR", os.path.join(os.path.dirname(__file__), "..", "..", "data", "price_history"))
+    MAX_PRICE_AGE_SECONDS = float(os.getenv("MAX_PRICE_AGE_SECONDS", "120"))  # refuse to trade on older prices
+    # orders/alerts committed this long after a higher id are still picked up (app/services/id_watermark.py)
+    ENGINE_SYNC_LOOKBACK_SECONDS = float(os.getenv("ENGINE_SYNC_LOOKBACK_SECONDS", "120"))
+
+    # Analytics
+    ANALYTICS_WORKERS = int(os.getenv("ANALYTICS_WORKERS", "2"))
+    RISK_FREE_RATE = float(os.getenv("RISK_FREE_RATE", "0.0"))  # annual, used for Sharpe
+
+    # Daily NAV snapshots
+    NAV_SNAPSHOT_JOB_ENABLED = os.getenv("NAV_SNAPSHOT_JOB_ENABLED", "true").lower() == "true"
+    NAV_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("NAV_SNAPSHOT_INTERVAL_SECONDS", "3600"))
+    NAV_SNAPSHOT_DAILY_RETENTION_DAYS = int(os.getenv("NAV_SNAPSHOT_DAILY_RETENTION_DAYS", "730"))  # older rows thinned to weekly
+
+    # Tax lots
+    TAX_LOT_METHOD = os.getenv("TAX_LOT_METHOD", "fifo").lower()  # which lots a sell closes: fifo, lifo or hifo
 
 settings = Settings()
@@ -0,0 +1,69 @@
+# app/core/fixed_point.py
+"""
+Fixed-point amounts. Quantities, prices and cash are Decimals with a fixed
+number of places in Python and scaled integers (a count of the smallest
+unit) in the database, so both ends are exact and moving between them is
+an integer scaling, never a trip through float or str.
+
+    quantity  8 places  (1e-8 of a coin, a satoshi)
+    price     8 places  (sub-cent coins like ADA or SHIB)
+    money     2 places  (cents: wallet balances, NAV, realized gains)
+
+Stored as BIGINT, that allows up to ~9.2e10 coins per row and prices
+or balances up to ~9.2e10 / ~9.2e16 dollars.
+"""
+from decimal import ROUND_HALF_EVEN, Context, Decimal
+
+QUANTITY_PLACES = 8
+PRICE_PLACES = 8
+MONEY_PLACES = 2
+
+ZERO = Decimal(0)
+MAX_UNITS = 2 ** 63 - 1  # the largest BIGINT
+_CENT = Decimal(1).scaleb(-MONEY_PLACES)
+# wide enough for the exact product of any two BIGINT-sized amounts (19 digits each)
+_WIDE = Context(prec=40, rounding=ROUND_HALF_EVEN)
+
+
+def to_units(value, places: int) -> int:
+    """
+    `value` as a count of 10**-places units, rounded half-even. Ints are
+    whole amounts (5 -> 5.00), floats go through their shortest repr.
+    """
+    if isinstance(value, int):
+        return value * 10 ** places
+    if isinstance(value, float):
+        value = Decimal(repr(value))
+    elif not isinstance(value, Decimal):
+        value = Decimal(value)
+    return int(value.scaleb(places).to_integral_value(ROUND_HALF_EVEN))
+
+
+def from_units(units: int, places: int) -> Decimal:
+    return Decimal(units).scaleb(-places)
+
+
+def max_amount(places: int) -> Decimal:
+    """The largest magnitude a column with `places` decimal places can store."""
+    return from_units(MAX_UNITS, places)
+
+
+def quantize(value, places: int) -> Decimal:
+    """`value` rounded half-even to `places`, as a Decimal."""
+    return from_units(to_units(value, places), places)
+
+
+def notional(quantity: Decimal, price: Decimal) -> Decimal:
+    """
+    quantity * price in money: the exact product, rounded half-even to the
+    cent once. Takes a quantity and a price already on their scale.
+    """
+    # On scale, a product under 1e11 has at most 11 + 16 digits, exact in the
+    # default 28-digit context; anything larger is multiplied in _WIDE
+    if quantity.adjusted() + price.adjusted() < 10:
+        return (quantity * price).quantize(_CENT, ROUND_HALF_EVEN)
+    return _WIDE.quantize(_WIDE.multiply(quantity, price), _CENT)
+
+
+def money(value) -> Decimal:
+    return quantize(value, MONEY_PLACES)
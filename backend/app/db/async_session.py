@@ -0,0 +1,47 @@
+# app/db/async_session.py
+"""
+Async engine and session, used by the routes in app/routes/aio when
+DB_ASYNC is on. Same database as app/db/session.py, through an async
+driver (aiosqlite / asyncpg / aiomysql) so a request waiting on the
+database doesn't hold a threadpool thread.
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.instrumentation import instrument
+
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver of `url` for its async counterpart (sqlite:// -> sqlite+aiosqlite://)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+_session_factory = None
+
+
+def async_session_factory() -> async_sessionmaker:
+    """
+    The async sessionmaker. Its engine is created on first use, so with
+    DB_ASYNC off no async driver is imported and any DATABASE_URL works.
+    """
+    global _session_factory
+    if _session_factory is None:
+        engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL), echo=settings.SQL_ECHO
+        )
+        instrument(engine.sync_engine)
+        # expire_on_commit=False: attributes can't lazy-load after a commit in async code
+        _session_factory = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    return _session_factory
+
+
+async def get_async_db():
+    async with async_session_factory()() as db:
+        yield db
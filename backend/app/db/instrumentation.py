@@ -0,0 +1,67 @@
+# app/db/instrumentation.py
+"""
+Per-request SQL accounting from engine events. A request opens a
+QueryStats with track_queries(); every statement executed while it is the
+current one (same task, or a thread/greenlet started from it) adds its
+duration and its SQL text, which doubles as the query's shape since
+parameters are bound separately.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+_current = ContextVar("sql_query_stats", default=None)
+
+
+class QueryStats:
+    __slots__ = ("count", "total_ms", "slowest_ms", "slowest", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest = None
+        self.shapes = Counter()
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement] += 1
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest = statement
+
+    def repeated(self, threshold: int) -> list:
+        """(statement, times) for every shape executed at least `threshold` times, most repeated first."""
+        return [(statement, n) for statement, n in self.shapes.most_common() if n >= threshold]
+
+
+@contextmanager
+def track_queries():
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - start) * 1000)
+
+
+def instrument(engine):
+    """Attach the timing listeners to a sync Engine (for an AsyncEngine pass its .sync_engine)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,98 @@
+# app/db/replicas.py
+"""
+Read replicas. Routes that only read take their session from
+read_session(), which binds it to the next replica in turn; everything
+else keeps using the primary through SessionLocal. Without
+DATABASE_REPLICA_URLS every read session is a primary session.
+
+Replicas lag the primary, so a user who just traded could read their old
+balance back. For READ_YOUR_WRITES_SECONDS after a write their reads stay
+on the primary. The window travels with the client as a cookie holding
+its end time, so it holds whichever worker serves the next read.
+RecentWriters keeps the same window per worker process for clients that
+don't keep cookies.
+"""
+import itertools
+import math
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.db.instrumentation import instrument
+from app.db.session import SessionLocal
+
+replica_engines = [create_engine(url, echo=settings.SQL_ECHO) for url in settings.DATABASE_REPLICA_URLS]
+for replica_engine in replica_engines:
+    instrument(replica_engine)
+
+_next_replica = itertools.cycle(replica_engines)
+_next_replica_lock = threading.Lock()
+_stats = {"replica_sessions": 0, "primary_sessions": 0}
+
+
+def read_session(primary: bool = False):
+    """A session for reads: on the next replica, or on the primary if asked for or if there are no replicas."""
+    if primary or not replica_engines:
+        _stats["primary_sessions"] += 1
+        return SessionLocal()
+    with _next_replica_lock:
+        bind = next(_next_replica)
+    _stats["replica_sessions"] += 1
+    return SessionLocal(bind=bind)
+
+
+class RecentWriters:
+    """Subjects (token `sub`) that wrote recently, each with the monotonic time its window ends."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until = {}
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+    def __len__(self):
+        now = time.monotonic()
+        return sum(until > now for until in list(self._until.values()))
+
+    def mark(self, subject: str):
+        now = time.monotonic()
+        with self._lock:
+            self._until[subject] = now + self.window
+            if now >= self._next_prune:
+                # drop expired windows at most once per window, so the dict stays as small as the active writers
+                self._until = {s: until for s, until in self._until.items() if until > now}
+                self._next_prune = now + self.window
+
+    def wrote_recently(self, subject: str) -> bool:
+        until = self._until.get(subject)
+        return until is not None and until > time.monotonic()
+
+
+recent_writers = RecentWriters(settings.READ_YOUR_WRITES_SECONDS)
+
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+
+def read_your_writes_cookie() -> str:
+    """Set-Cookie value opening the window now: its end as epoch seconds, expiring with it."""
+    window = settings.READ_YOUR_WRITES_SECONDS
+    return (
+        f"{READ_YOUR_WRITES_COOKIE}={time.time() + window:.3f}; Max-Age={math.ceil(window)}; "
+        "Path=/; HttpOnly; SameSite=Lax"
+    )
+
+
+def cookie_window_open(until: Optional[str]) -> bool:
+    """Whether a read_primary_until cookie is still in its window. Ends further out than one window are ignored."""
+    try:
+        remaining = float(until) - time.time()
+    except (TypeError, ValueError):
+        return False
+    return 0 < remaining <= settings.READ_YOUR_WRITES_SECONDS
+
+
+def get_replica_stats() -> dict:
+    return dict(_stats, replicas=len(replica_engines), recent_writers=len(recent_writers))
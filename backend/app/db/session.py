@@ -2,6 +2,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
+from app.core.config import settings
+from app.db.instrumentation import instrument
 from app.models import *
 
 load_dotenv()
@@ -10,7 +12,8 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 
 
 
-engine = create_engine(DATABASE_URL, echo=True)  
+engine = create_engine(DATABASE_URL, echo=settings.SQL_ECHO)
+instrument(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
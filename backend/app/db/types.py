@@ -0,0 +1,36 @@
+# app/db/types.py
+from sqlalchemy import BigInteger, Numeric, cast
+from sqlalchemy.types import TypeDecorator
+
+from app.core.fixed_point import from_units, to_units
+
+# Scaled integers widened for products and ratios done in SQL: exact NUMERIC
+# on PostgreSQL; SQLite has nothing wider than 64-bit integers and falls back to REAL
+WIDE = Numeric(38, 0)
+
+
+class FixedPoint(TypeDecorator):
+    """
+    A Decimal with `places` decimal places, stored as the BIGINT count of
+    its smallest unit (see app.core.fixed_point). Exact on every backend,
+    SQLite included. Values bound against a FixedPoint column in SQL
+    expressions (`Wallet.balance - amount`) are scaled the same way.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def __init__(self, places: int):
+        super().__init__()
+        self.places = places
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_units(value, self.places)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_units(value, self.places)
+
+
+def widen(expression):
+    """The raw units of a FixedPoint expression as WIDE, for multiplying without overflowing BIGINT."""
+    return cast(expression, WIDE)
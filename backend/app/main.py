@@ -1,23 +1,65 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.db.session import get_db
-from app.routes import auth, portfolio_entry, asset, transaction, wallet
+from app.routes import auth, portfolio_entry, asset, transaction, wallet, prices, orders, alerts
 from app.middlewares.cors import setup_cors
+from app.middlewares.sql_timing import setup_sql_timing, get_route_query_stats
+from app.middlewares.read_your_writes import setup_read_your_writes
+from app.db.replicas import get_replica_stats
+from app.models.user import User
+from app.services.dependecy import get_current_user
+from app.core.config import settings
+from app.services.price_refresher import price_refresher
+from app.services.snapshot_service import nav_snapshot_job
+from app.services import market_data
 from fastapi.openapi.utils import get_openapi
 import json
 from fastapi.responses import Response, HTMLResponse
 from typing import Optional
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep the price cache warm so trades and /assets/ never wait on CoinGecko
+    if settings.PRICE_REFRESHER_ENABLED:
+        price_refresher.start()
+    if settings.NAV_SNAPSHOT_JOB_ENABLED:
+        nav_snapshot_job.start()
+    yield
+    await nav_snapshot_job.stop()
+    await price_refresher.stop()
+    await market_data.provider.aclose()
+
+app = FastAPI(lifespan=lifespan)
+setup_sql_timing(app)
+if settings.DATABASE_REPLICA_URLS:
+    setup_read_your_writes(app)
 setup_cors(app)
 
 # Include your routers AFTER defining routes
+if settings.DB_ASYNC:
+    from app.routes.aio import auth, portfolio_entry, asset, transaction, wallet
 app.include_router(auth.router)
 app.include_router(portfolio_entry.router)
 app.include_router(asset.router)
 app.include_router(transaction.router)
 app.include_router(wallet.router)
+app.include_router(prices.router)
+app.include_router(orders.router)
+app.include_router(alerts.router)
+
+
+@app.get("/db/query-stats")
+def get_db_query_stats(current_user: User = Depends(get_current_user)):
+    """Per-route query counts, DB time histograms and slowest statements"""
+    return get_route_query_stats()
+
+
+@app.get("/db/replica-stats")
+def get_db_replica_stats(current_user: User = Depends(get_current_user)):
+    """How many read sessions went to a replica vs the primary, and how many users are in their read-your-writes window"""
+    return get_replica_stats()
 
 @app.get("/api-docs/pdf", include_in_schema=False)
 async def get_api_pdf():
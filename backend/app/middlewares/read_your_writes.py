@@ -0,0 +1,51 @@
+# app/middlewares/read_your_writes.py
+from app.db.replicas import read_your_writes_cookie, recent_writers
+from app.services.dependecy import token_subject
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marks the caller as a recent writer when a request that can write
+    (anything but GET/HEAD/OPTIONS) succeeds, so get_read_db keeps their
+    reads on the primary for READ_YOUR_WRITES_SECONDS. The mark is a
+    cookie on the response, which any worker honours, plus this worker's
+    RecentWriters for clients that drop cookies. It is made before the
+    response starts, so a read the client sends after seeing the response
+    can't get ahead of it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_marking_writer(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                subject = token_subject(_bearer_token(scope))
+                if subject is not None:
+                    recent_writers.mark(subject)
+                    # the window goes back with the response, for whichever worker serves the next read
+                    message["headers"] = [*message.get("headers", []), (b"set-cookie", read_your_writes_cookie().encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_marking_writer)
+
+
+def _bearer_token(scope):
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" else None
+    return None
+
+
+def setup_read_your_writes(app):
+    """
+    Add read-your-writes tracking for the read replicas to the FastAPI application
+    """
+    app.add_middleware(ReadYourWritesMiddleware)
+    return app
@@ -0,0 +1,115 @@
+# app/middlewares/sql_timing.py
+import logging
+import threading
+
+from app.core.config import settings
+from app.db.instrumentation import track_queries
+from app.services.hedging import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class RouteQueryStats:
+    """Per-route DB time histogram, query counts and the slowest statement seen."""
+
+    def __init__(self):
+        self.db_time = LatencyHistogram()
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.repeated_query_warnings = 0
+        self.slowest_ms = 0.0
+        self.slowest = None
+        self._lock = threading.Lock()
+
+    def record(self, stats, repeated: bool):
+        self.db_time.record(stats.total_ms)
+        with self._lock:
+            self.requests += 1
+            self.queries += stats.count
+            self.max_queries = max(self.max_queries, stats.count)
+            self.repeated_query_warnings += repeated
+            if stats.slowest_ms > self.slowest_ms:
+                self.slowest_ms = stats.slowest_ms
+                self.slowest = stats.slowest
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "avg_queries": self.queries / self.requests if self.requests else 0.0,
+                "max_queries": self.max_queries,
+                "repeated_query_warnings": self.repeated_query_warnings,
+                "slowest_ms": round(self.slowest_ms, 2),
+                "slowest_statement": self.slowest,
+                "db_time": self.db_time.snapshot(),
+            }
+
+
+_route_stats = {}
+_route_stats_lock = threading.Lock()
+
+
+def _stats_for(key: str) -> RouteQueryStats:
+    stats = _route_stats.get(key)
+    if stats is None:
+        with _route_stats_lock:
+            stats = _route_stats.setdefault(key, RouteQueryStats())
+    return stats
+
+
+def get_route_query_stats() -> dict:
+    return {key: stats.snapshot() for key, stats in sorted(_route_stats.items())}
+
+
+class SQLTimingMiddleware:
+    """
+    Counts the statements each request runs, reports them in a Server-Timing
+    header (query count, total DB time, slowest statement) and folds them
+    into per-route stats. Warns when a request repeats one statement
+    SQL_REPEATED_QUERY_THRESHOLD times or more, the signature of a query
+    issued per row or per leg instead of once.
+
+    The header goes out with the response start, so statements run while a
+    StreamingResponse body is being sent only reach the per-route stats.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with track_queries() as stats:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    header = (
+                        f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", '
+                        f"db-slowest;dur={stats.slowest_ms:.1f}"
+                    )
+                    message.setdefault("headers", []).append((b"server-timing", header.encode()))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self._finish(scope, stats)
+
+    def _finish(self, scope, stats):
+        # FastAPI leaves the matched route in the scope; unmatched paths share one bucket
+        route = scope.get("route")
+        key = f"{scope['method']} {route.path if route is not None else '<unmatched>'}"
+        repeated = stats.repeated(settings.SQL_REPEATED_QUERY_THRESHOLD) if settings.SQL_REPEATED_QUERY_THRESHOLD else []
+        if repeated:
+            summary = "; ".join(f"{times}x {' '.join(statement.split())[:120]}" for statement, times in repeated)
+            logger.warning(f"{key} repeated statements, possible N+1: {summary}")
+        _stats_for(key).record(stats, bool(repeated))
+
+
+def setup_sql_timing(app):
+    """
+    Add per-request SQL instrumentation to the FastAPI application
+    """
+    app.add_middleware(SQLTimingMiddleware)
+    return app
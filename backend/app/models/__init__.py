@@ -1,4 +1,8 @@
 from .user import User
 from .portfolio_entry import PortfolioEntry
 from .asset import Asset
-from .transaction import Transaction
\ No newline at end of file
+from .transaction import Transaction
+from .nav_snapshot import NavSnapshot
+from .tax_lot import TaxLot, RealizedGain
+from .order import Order
+from .price_alert import PriceAlert, AlertNotification
@@ -0,0 +1,21 @@
+# app/models/nav_snapshot.py
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.fixed_point import MONEY_PLACES
+from app.db.base import Base
+from app.db.types import FixedPoint
+
+class NavSnapshot(Base):
+    """One net asset value row per user per day (holdings at market + wallet cash)."""
+    __tablename__ = "nav_snapshots"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_nav_snapshots_user_day"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    holdings_value = Column(FixedPoint(MONEY_PLACES), nullable=False)
+    cash_balance = Column(FixedPoint(MONEY_PLACES), nullable=False)
+    nav = Column(FixedPoint(MONEY_PLACES), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
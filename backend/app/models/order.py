@@ -0,0 +1,32 @@
+# app/models/order.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, Index
+from app.core.fixed_point import PRICE_PLACES, QUANTITY_PLACES
+from app.db.base import Base
+from app.db.types import FixedPoint
+
+class Order(Base):
+    """
+    A resting limit or stop order, filled by the order engine once the
+    market price crosses `trigger_price`.
+    """
+    __tablename__ = "orders"
+    __table_args__ = (
+        # the engine picks up new open orders by id; users list theirs newest first
+        Index("ix_orders_status_id", "status", "id"),
+        Index("ix_orders_user_created", "user_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    side = Column(String(4), nullable=False)  # 'buy' or 'sell'
+    type = Column(String(5), nullable=False)  # 'limit' or 'stop'
+    quantity = Column(FixedPoint(QUANTITY_PLACES), nullable=False)
+    trigger_price = Column(FixedPoint(PRICE_PLACES), nullable=False)
+    status = Column(String(10), nullable=False, default="open")  # open, filled, cancelled, rejected
+    created_at = Column(DateTime, default=datetime.utcnow)
+    filled_at = Column(DateTime, nullable=True)
+    fill_price = Column(FixedPoint(PRICE_PLACES), nullable=True)
+    transaction_id = Column(Integer, ForeignKey("transactions.id", ondelete="SET NULL"), nullable=True)
+    error = Column(String(255), nullable=True)
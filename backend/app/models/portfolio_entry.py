@@ -1,18 +1,22 @@
 # app/models/portfolio_entry.py
-from sqlalchemy import Column, Integer, ForeignKey, Float
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
+from app.core.fixed_point import PRICE_PLACES, QUANTITY_PLACES
 from app.db.base import Base
+from app.db.types import FixedPoint
 
 class PortfolioEntry(Base):
     __tablename__ = "portfolio_entries"
+    # one position per asset, so concurrent first buys can't create two
+    __table_args__ = (UniqueConstraint("user_id", "asset_id", name="uq_portfolio_entries_user_asset"),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
-    quantity = Column(Float, nullable=False)
-    average_buy_price = Column(Float, nullable=False)
+    quantity = Column(FixedPoint(QUANTITY_PLACES), nullable=False)
+    average_buy_price = Column(FixedPoint(PRICE_PLACES), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="portfolio_entries")
     asset = relationship("Asset", back_populates="portfolio_entries")
-    transactions = relationship("Transaction", back_populates="portfolio_entry", cascade="all, delete-orphan")
+    transactions = relationship("Transaction", back_populates="portfolio_entry", passive_deletes=True)
@@ -0,0 +1,41 @@
+# app/models/price_alert.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, ForeignKey, Float, String, DateTime, Index
+from app.db.base import Base
+
+class PriceAlert(Base):
+    """One-shot "notify me when the price crosses X" alert."""
+    __tablename__ = "price_alerts"
+    __table_args__ = (
+        # the alert engine loads active alerts by id; users list theirs
+        Index("ix_price_alerts_status_id", "status", "id"),
+        Index("ix_price_alerts_user_id", "user_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    threshold = Column(Float, nullable=False)
+    direction = Column(String(5), nullable=False)  # 'above', 'below' or 'cross'
+    status = Column(String(10), nullable=False, default="active")  # active, fired, cancelled
+    created_at = Column(DateTime, default=datetime.utcnow)
+    fired_at = Column(DateTime, nullable=True)
+    fired_price = Column(Float, nullable=True)
+
+
+class AlertNotification(Base):
+    """Outbox of fired alerts; every worker streams new rows to its connected users."""
+    __tablename__ = "alert_outbox"
+    __table_args__ = (
+        Index("ix_alert_outbox_user_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    alert_id = Column(Integer, ForeignKey("price_alerts.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    symbol = Column(String(50), nullable=False)
+    threshold = Column(Float, nullable=False)
+    direction = Column(String(5), nullable=False)
+    previous_price = Column(Float, nullable=False)
+    price = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
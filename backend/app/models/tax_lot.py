@@ -0,0 +1,43 @@
+# app/models/tax_lot.py
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from app.core.fixed_point import MONEY_PLACES, PRICE_PLACES, QUANTITY_PLACES
+from app.db.base import Base
+from app.db.types import FixedPoint
+
+class TaxLot(Base):
+    """One buy, tracked until it has been sold off (remaining == 0)."""
+    __tablename__ = "tax_lots"
+    __table_args__ = (
+        # open lots of one position, in acquisition order
+        Index("ix_tax_lots_user_asset_acquired", "user_id", "asset_id", "acquired_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    transaction_id = Column(Integer, ForeignKey("transactions.id", ondelete="SET NULL"), nullable=True)
+    acquired_at = Column(DateTime, nullable=False)
+    quantity = Column(FixedPoint(QUANTITY_PLACES), nullable=False)
+    remaining = Column(FixedPoint(QUANTITY_PLACES), nullable=False)
+    cost_price = Column(FixedPoint(PRICE_PLACES), nullable=False)
+
+
+class RealizedGain(Base):
+    """The part of one sell that closed (part of) one lot."""
+    __tablename__ = "realized_gains"
+    __table_args__ = (
+        Index("ix_realized_gains_user_sold", "user_id", "sold_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    # null when the sell exceeded the tracked lots (e.g. holdings from before lot tracking)
+    lot_id = Column(Integer, ForeignKey("tax_lots.id", ondelete="SET NULL"), nullable=True)
+    transaction_id = Column(Integer, ForeignKey("transactions.id", ondelete="SET NULL"), nullable=True)
+    acquired_at = Column(DateTime, nullable=True)
+    sold_at = Column(DateTime, nullable=False)
+    quantity = Column(FixedPoint(QUANTITY_PLACES), nullable=False)
+    cost_price = Column(FixedPoint(PRICE_PLACES), nullable=False)
+    sale_price = Column(FixedPoint(PRICE_PLACES), nullable=False)
+    gain = Column(FixedPoint(MONEY_PLACES), nullable=False)
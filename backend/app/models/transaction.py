@@ -1,19 +1,24 @@
 # app/models/transaction.py
-from sqlalchemy import Column, Integer, ForeignKey, Float, String, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, Index
 from sqlalchemy.orm import relationship
+from app.core.fixed_point import PRICE_PLACES, QUANTITY_PLACES
 from app.db.base import Base
+from app.db.types import FixedPoint
 from datetime import datetime
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # keyset pagination of a user's history: WHERE user_id = ? AND (date, id) < (?, ?)
+    __table_args__ = (Index("ix_transactions_user_date_id", "user_id", "date", "id"),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    portfolio_entry_id = Column(Integer, ForeignKey("portfolio_entries.id"), nullable=False)
+    # the ledger outlives the position: selling out deletes the entry, not its trades
+    portfolio_entry_id = Column(Integer, ForeignKey("portfolio_entries.id", ondelete="SET NULL"), nullable=True)
     asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
     type = Column(String(10), nullable=False)  # 'buy' or 'sell'
-    quantity = Column(Float, nullable=False)
-    price = Column(Float, nullable=False)
+    quantity = Column(FixedPoint(QUANTITY_PLACES), nullable=False)
+    price = Column(FixedPoint(PRICE_PLACES), nullable=False)
     date = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
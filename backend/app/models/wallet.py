@@ -1,13 +1,15 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime , Numeric
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.sql import func
+from app.core.fixed_point import MONEY_PLACES
 from app.db.base import Base
+from app.db.types import FixedPoint
 
 class Wallet(Base):
     __tablename__ = "wallet"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
-    balance = Column(Numeric(18, 2), nullable=False, default=0)
+    balance = Column(FixedPoint(MONEY_PLACES), nullable=False, default=0)
     currency = Column(String(10), nullable=False, default="USD")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
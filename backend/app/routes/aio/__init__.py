@@ -0,0 +1,21 @@
+# app/routes/aio/__init__.py
+"""
+async def versions of the main routers, on an AsyncSession (DB_ASYNC=true).
+Each module mirrors its sync counterpart in app/routes: same paths, schemas
+and responses. Trade logic stays in the sync services and runs through
+AsyncSession.run_sync; blocking price lookups go to a worker thread.
+"""
+from fastapi import APIRouter
+
+
+def with_sync_fallback(router: APIRouter, sync_router: APIRouter) -> APIRouter:
+    """
+    Append the routes of `sync_router` that `router` doesn't define, so the
+    async module serves the whole prefix. Used for endpoints that gain
+    nothing from being async (streaming exports, CPU-bound analytics).
+    """
+    defined = {(route.path, frozenset(route.methods)) for route in router.routes}
+    for route in sync_router.routes:
+        if (route.path, frozenset(route.methods)) not in defined:
+            router.routes.append(route)
+    return router
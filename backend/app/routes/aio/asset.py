@@ -0,0 +1,74 @@
+# app/routes/aio/asset.py
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import get_async_db
+from app.models.asset import Asset
+from app.routes.asset import _to_timestamp
+from app.schemas.asset import AssetWithPrice, PriceHistoryResponse
+from app.services.market_data import get_current_prices
+from app.services.price_history import INTERVALS, price_history
+
+router = APIRouter(prefix="/assets", tags=["assets"])
+
+
+@router.get("/", response_model=list[AssetWithPrice])
+async def get_assets(db: AsyncSession = Depends(get_async_db)):
+    assets = (await db.execute(select(Asset))).scalars().all()
+    if not assets:
+        return []
+
+    # a cache miss fetches from the provider, which blocks
+    prices = await asyncio.to_thread(get_current_prices, [asset.symbol for asset in assets])
+    return [
+        {
+            "id": asset.id,
+            "symbol": asset.symbol,
+            "name": asset.name,
+            "current_price": float(prices.get(asset.symbol.upper(), Decimal("0.0")))
+        }
+        for asset in assets
+    ]
+
+
+@router.get("/{asset_id}/history", response_model=PriceHistoryResponse)
+async def get_asset_history(
+    asset_id: int,
+    interval: str = Query("1h", description="tick, 1m, 1h or 1d"),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    points: int = Query(500, ge=1, le=5000, description="Max candles returned, larger ranges are downsampled"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if interval != "tick" and interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of tick, {', '.join(INTERVALS)}")
+
+    asset = await db.get(Asset, asset_id)
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    start = _to_timestamp(from_) if from_ else 0.0
+    end = _to_timestamp(to) if to else datetime.now(timezone.utc).timestamp()
+    # reads history files
+    rows = await asyncio.to_thread(price_history.query, asset.symbol.upper(), interval, start, end, points)
+
+    return {
+        "asset_id": asset.id,
+        "symbol": asset.symbol,
+        "interval": interval,
+        "candles": [
+            {
+                "time": datetime.fromtimestamp(t, timezone.utc),
+                "open": o,
+                "high": h,
+                "low": l,
+                "close": c
+            }
+            for t, o, h, l, c in rows
+        ]
+    }
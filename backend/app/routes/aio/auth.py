@@ -0,0 +1,40 @@
+# app/routes/aio/auth.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import get_async_db
+from app.models.user import User
+from app.routes import auth as sync_auth
+from app.routes.aio import with_sync_fallback
+from app.schemas.auth import Token, UserLogin
+from app.schemas.user import UserCreate
+from app.services.auth_service import create_user_async, login_user_async
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.post("/register", response_model=dict)
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = (await db.execute(select(User.id).where(User.email == user_in.email))).first()
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    user = await create_user_async(db, email=user_in.email, password=user_in.password)
+    return {"id": user.id, "email": user.email}
+
+
+@router.post("/login", response_model=Token)
+async def login(user_in: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    token = await login_user_async(db, user_in.email, user_in.password)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+    return {"access_token": token, "token_type": "bearer"}
+
+
+with_sync_fallback(router, sync_auth.router)
@@ -0,0 +1,169 @@
+# app/routes/aio/portfolio_entry.py
+import asyncio
+from datetime import date, datetime, time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import get_async_db
+from app.models.asset import Asset
+from app.models.portfolio_entry import PortfolioEntry
+from app.models.tax_lot import TaxLot
+from app.models.user import User
+from app.routes import portfolio_entry as sync_portfolio_entry
+from app.routes.aio import with_sync_fallback
+from app.schemas.portfolio import (
+    PortfolioEntryCreate, PortfolioEntryResponse, PortfolioSummary, NavPoint, OpenLotsReport, RealizedGainsReport
+)
+from app.services.dependecy import get_current_user_async
+from app.services.market_data import get_current_prices
+from app.services.portfolio_service import get_portfolio_summary
+from app.services.snapshot_service import get_nav_history
+from app.services.tax_lots import get_open_lots, get_realized_gains
+
+router = APIRouter(prefix="/portfolios", tags=["portfolios"])
+
+
+async def _get_entry(db: AsyncSession, entry_id: int, user_id: int) -> PortfolioEntry:
+    entry = (await db.execute(
+        select(PortfolioEntry).where(PortfolioEntry.id == entry_id, PortfolioEntry.user_id == user_id)
+    )).scalar_one_or_none()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Portfolio entry not found")
+    return entry
+
+
+async def _current_prices(db: AsyncSession, model, *where) -> dict:
+    """
+    Current prices of the assets referenced by the `model` rows matching
+    `where`. A cache miss fetches upstream synchronously, so the lookup
+    runs in a thread rather than inside run_sync on the event loop.
+    """
+    symbols = (await db.execute(
+        select(Asset.symbol).distinct().join(model, model.asset_id == Asset.id).where(*where)
+    )).scalars().all()
+    return await asyncio.to_thread(get_current_prices, symbols) if symbols else {}
+
+
+@router.post("/", response_model=PortfolioEntryResponse)
+async def create_or_update_portfolio_entry(
+    entry_in: PortfolioEntryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    entry = (await db.execute(select(PortfolioEntry).where(
+        PortfolioEntry.user_id == current_user.id,
+        PortfolioEntry.asset_id == entry_in.asset_id
+    ))).scalar_one_or_none()
+
+    if entry:
+        total_quantity = entry.quantity + entry_in.quantity
+        entry.average_buy_price = (
+            (entry.average_buy_price * entry.quantity) +
+            (entry_in.average_buy_price * entry_in.quantity)
+        ) / total_quantity
+        entry.quantity = total_quantity
+    else:
+        entry = PortfolioEntry(
+            user_id=current_user.id,
+            asset_id=entry_in.asset_id,
+            quantity=entry_in.quantity,
+            average_buy_price=entry_in.average_buy_price
+        )
+        db.add(entry)
+    await db.commit()
+    return entry
+
+
+@router.get("/", response_model=list[PortfolioEntryResponse])
+async def read_my_portfolios(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return (await db.execute(select(PortfolioEntry).where(PortfolioEntry.user_id == current_user.id))).scalars().all()
+
+
+@router.get("/summary", response_model=PortfolioSummary)
+async def read_my_portfolio_summary(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Positions valued at current prices with P&L, weights, totals and wallet balance
+    """
+    user_id = current_user.id
+    prices = await _current_prices(db, PortfolioEntry, PortfolioEntry.user_id == user_id)
+    return await db.run_sync(lambda session: get_portfolio_summary(session, user_id, prices))
+
+
+@router.get("/nav", response_model=list[NavPoint])
+async def read_my_nav_history(
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Daily net asset value (holdings + cash) from the precomputed snapshots
+    """
+    user_id = current_user.id
+    return await db.run_sync(lambda session: get_nav_history(session, user_id, from_, to))
+
+
+@router.get("/lots", response_model=OpenLotsReport)
+async def read_my_open_lots(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Open tax lots with their cost basis and unrealized gain at current prices
+    """
+    user_id = current_user.id
+    prices = await _current_prices(db, TaxLot, TaxLot.user_id == user_id, TaxLot.remaining > 0)
+    return await db.run_sync(lambda session: get_open_lots(session, user_id, prices))
+
+
+@router.get("/realized-gains", response_model=RealizedGainsReport)
+async def read_my_realized_gains(
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Realized gains per asset for sells in [from, to], by the configured lot method
+    """
+    user_id = current_user.id
+    start = datetime.combine(from_, time.min) if from_ else None
+    end = datetime.combine(to, time.max) if to else None
+    return await db.run_sync(lambda session: get_realized_gains(session, user_id, start, end))
+
+
+@router.put("/{entry_id}", response_model=PortfolioEntryResponse)
+async def update_portfolio_entry(
+    entry_id: int,
+    entry_in: PortfolioEntryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    entry = await _get_entry(db, entry_id, current_user.id)
+    entry.quantity = entry_in.quantity
+    entry.average_buy_price = entry_in.average_buy_price
+    await db.commit()
+    return entry
+
+
+@router.delete("/{entry_id}", status_code=204)
+async def delete_portfolio_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    entry = await _get_entry(db, entry_id, current_user.id)
+    await db.delete(entry)
+    await db.commit()
+
+
+# /analytics (process pool) and /export (streams from its own session) stay sync
+with_sync_fallback(router, sync_portfolio_entry.router)
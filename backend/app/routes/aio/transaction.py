@@ -0,0 +1,122 @@
+# app/routes/aio/transaction.py
+import asyncio
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import get_async_db
+from app.models.asset import Asset
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.routes import transaction as sync_transaction
+from app.routes.aio import with_sync_fallback
+from app.routes.transaction import (
+    _batch_assets, _decode_cursor, _encode_cursor, _execute_batch, _get_tradeable_price, _get_tradeable_prices, _trade_error,
+)
+from app.schemas.transaction import BatchTradeRequest, BatchTradeResponse, TransactionCreate, TransactionPage, TransactionResponse
+from app.services import trade_service
+from app.services.dependecy import get_current_user_async
+from app.services.snapshot_service import record_nav_snapshot_for_user
+from app.services.trade_service import TradeError
+
+router = APIRouter(prefix="/transactions", tags=["transactions"])
+
+
+@router.get("/", response_model=TransactionPage)
+async def list_transactions(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    The user's trades, newest first, keyset-paginated on (date, id)
+    """
+    query = select(Transaction).where(Transaction.user_id == current_user.id)
+    if cursor:
+        query = query.where(tuple_(Transaction.date, Transaction.id) < _decode_cursor(cursor))
+    rows = (await db.execute(
+        query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit + 1)
+    )).scalars().all()
+
+    items = rows[:limit]
+    next_cursor = _encode_cursor(items[-1]) if len(rows) > limit else None
+    return TransactionPage(items=items, next_cursor=next_cursor)
+
+
+async def _trade(db: AsyncSession, user_id: int, transaction: TransactionCreate, side: str):
+    asset = await db.get(Asset, transaction.asset_id)
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    price = await asyncio.to_thread(_get_tradeable_price, asset.symbol)
+    execute = trade_service.buy if side == "buy" else trade_service.sell
+    try:
+        result = await db.run_sync(lambda session: execute(session, user_id, asset.id, transaction.quantity, price))
+    except TradeError as e:
+        await db.rollback()
+        raise _trade_error(e)
+    await db.commit()
+
+    return TransactionResponse(
+        asset_id=asset.id,
+        quantity=transaction.quantity,
+        transaction_id=result["transaction_id"],
+        average_buy_price=result["average_buy_price"],
+        type=side,
+        price=price,
+        date=datetime.utcnow(),
+        wallet_balance=result["wallet_balance"],
+        realized_gain=result.get("realized_gain")
+    )
+
+
+@router.post("/buy", response_model=TransactionResponse)
+async def buy_asset(
+    transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    response = await _trade(db, current_user.id, transaction, "buy")
+    background_tasks.add_task(record_nav_snapshot_for_user, current_user.id)
+    return response
+
+
+@router.post("/sell", response_model=TransactionResponse)
+async def sell_asset(
+    transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    response = await _trade(db, current_user.id, transaction, "sell")
+    background_tasks.add_task(record_nav_snapshot_for_user, current_user.id)
+    return response
+
+
+@router.post("/batch", response_model=BatchTradeResponse)
+async def batch_trade(
+    batch: BatchTradeRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Execute many buy/sell legs in one transaction, exactly as the sync route does
+    """
+    user_id = current_user.id
+    assets = await db.run_sync(lambda session: _batch_assets(session, batch))
+    prices = await asyncio.to_thread(_get_tradeable_prices, [asset.symbol for asset in assets.values()])
+    results, wallet_balance = await db.run_sync(
+        lambda session: _execute_batch(session, user_id, batch, assets, prices)
+    )
+    if any(r["status"] == "filled" for r in results):
+        background_tasks.add_task(record_nav_snapshot_for_user, user_id)
+    return BatchTradeResponse(legs=results, date=datetime.utcnow(), wallet_balance=wallet_balance)
+
+
+# /export streams from its own session and /import parses the upload in a thread: both stay sync
+with_sync_fallback(router, sync_transaction.router)
@@ -0,0 +1,42 @@
+# app/routes/aio/wallet.py
+from fastapi import APIRouter, BackgroundTasks, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import get_async_db
+from app.models.wallet import Wallet
+from app.schemas.wallet import DepositRequest, WalletResponse
+from app.services.dependecy import get_current_user_async
+from app.services.snapshot_service import record_nav_snapshot_for_user
+from app.services.trade_service import credit_wallet
+
+router = APIRouter(prefix="/wallet", tags=["Wallet"])
+
+
+@router.post("/deposit", response_model=WalletResponse)
+async def deposit(
+    payload: DepositRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async)
+):
+    user_id = current_user.id
+    await db.run_sync(lambda session: credit_wallet(session, user_id, payload.amount, create=True))
+    await db.commit()
+    wallet = (await db.execute(select(Wallet).where(Wallet.user_id == user_id))).scalar_one()
+    background_tasks.add_task(record_nav_snapshot_for_user, user_id)
+    return wallet
+
+
+@router.get("/balance", response_model=WalletResponse)
+async def get_balance(db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user_async)):
+    """
+    Get the current balance of the logged-in user's wallet
+    """
+    wallet = (await db.execute(select(Wallet).where(Wallet.user_id == current_user.id))).scalar_one_or_none()
+    if not wallet:
+        wallet = Wallet(user_id=current_user.id, balance=0)
+        db.add(wallet)
+        await db.commit()
+        await db.refresh(wallet)
+    return wallet
@@ -0,0 +1,123 @@
+# app/routes/alerts.py
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import get_db
+from app.models.asset import Asset
+from app.models.price_alert import AlertNotification, PriceAlert
+from app.models.user import User
+from app.schemas.alert import AlertCreate, AlertNotificationResponse, AlertResponse
+from app.services.dependecy import get_current_user, get_read_db
+from app.services.price_alerts import alert_engine
+from app.services.price_stream import price_broadcaster
+
+router = APIRouter(prefix="/alerts", tags=["alerts"])
+
+
+@router.post("/", response_model=AlertResponse, status_code=201)
+def create_alert(
+    alert_in: AlertCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    One-shot alert on the asset's price crossing `threshold`. It is picked
+    up on the next price refresh and fires at most once.
+    """
+    if not db.query(Asset.id).filter(Asset.id == alert_in.asset_id).first():
+        raise HTTPException(status_code=404, detail="Asset not found")
+    alert = PriceAlert(user_id=current_user.id, status="active", **alert_in.model_dump())
+    db.add(alert)
+    db.commit()
+    db.refresh(alert)
+    return alert
+
+
+@router.get("/", response_model=list[AlertResponse])
+def read_my_alerts(
+    status: Optional[str] = Query(None, pattern="^(active|fired|cancelled)$"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(PriceAlert).filter(PriceAlert.user_id == current_user.id)
+    if status:
+        query = query.filter(PriceAlert.status == status)
+    return query.order_by(PriceAlert.id.desc()).limit(limit).all()
+
+
+@router.get("/notifications", response_model=list[AlertNotificationResponse])
+def read_my_notifications(
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Fired alerts after `after_id`, oldest first: how a client catches up after reconnecting"""
+    return (
+        db.query(AlertNotification)
+        .filter(AlertNotification.user_id == current_user.id, AlertNotification.id > after_id)
+        .order_by(AlertNotification.id)
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get("/stream")
+async def stream_my_alerts(current_user: User = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of the caller's alerts as they fire
+    """
+    user_id = current_user.id
+    queue = price_broadcaster.subscribe_user(user_id)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.PRICE_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            price_broadcaster.unsubscribe_user(user_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats")
+def read_alert_engine_stats(current_user: User = Depends(get_current_user)):
+    """Ticks evaluated, alerts fired and index size on this worker"""
+    return alert_engine.stats()
+
+
+@router.delete("/{alert_id}", response_model=AlertResponse)
+def cancel_alert(
+    alert_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Conditional, so an alert that already fired stays fired
+    cancelled = db.execute(
+        update(PriceAlert)
+        .where(PriceAlert.id == alert_id, PriceAlert.user_id == current_user.id, PriceAlert.status == "active")
+        .values(status="cancelled")
+    ).rowcount
+    db.commit()
+    alert = db.query(PriceAlert).filter(PriceAlert.id == alert_id, PriceAlert.user_id == current_user.id).first()
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Alert is already {alert.status}")
+    alert_engine.discard(alert_id, alert.direction)
+    return alert
@@ -1,17 +1,19 @@
 # app/routes/assets.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from datetime import datetime, timezone
+from typing import Optional
 from app.models.asset import Asset
-from app.services.dependecy import get_current_user
+from app.services.dependecy import get_current_user, get_read_db
 from app.services.market_data import get_current_prices
-from app.schemas.asset import AssetWithPrice
+from app.schemas.asset import AssetWithPrice, PriceHistoryResponse
+from app.services.price_history import price_history, INTERVALS
 from decimal import Decimal
 
 router = APIRouter(prefix="/assets", tags=["assets"])
 
 @router.get("/", response_model=list[AssetWithPrice])
-def get_assets(db: Session = Depends(get_db)):
+def get_assets(db: Session = Depends(get_read_db)):
     assets = db.query(Asset).all()
     
     if not assets:
@@ -36,3 +38,47 @@ def get_assets(db: Session = Depends(get_db)):
         result.append(asset_data)
     
     return result
+
+
+@router.get("/{asset_id}/history", response_model=PriceHistoryResponse)
+def get_asset_history(
+    asset_id: int,
+    interval: str = Query("1h", description="tick, 1m, 1h or 1d"),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    points: int = Query(500, ge=1, le=5000, description="Max candles returned, larger ranges are downsampled"),
+    db: Session = Depends(get_read_db)
+):
+    if interval != "tick" and interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of tick, {', '.join(INTERVALS)}")
+
+    asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    start = _to_timestamp(from_) if from_ else 0.0
+    end = _to_timestamp(to) if to else datetime.now(timezone.utc).timestamp()
+    rows = price_history.query(asset.symbol.upper(), interval, start, end, points)
+
+    return {
+        "asset_id": asset.id,
+        "symbol": asset.symbol,
+        "interval": interval,
+        "candles": [
+            {
+                "time": datetime.fromtimestamp(t, timezone.utc),
+                "open": o,
+                "high": h,
+                "low": l,
+                "close": c
+            }
+            for t, o, h, l, c in rows
+        ]
+    }
+
+
+def _to_timestamp(value: datetime) -> float:
+    # Naive datetimes are treated as UTC, like the rest of the API
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
@@ -6,6 +6,8 @@ from app.db.session import get_db
 from app.models.user import User
 from app.schemas.auth import UserLogin, Token
 from app.services.auth_service import login_user
+from app.services.dependecy import get_current_user
+from app.services.user_cache import user_cache
 
 
 
@@ -36,4 +38,13 @@ def login(user_in: UserLogin, db: Session = Depends(get_db)):
 
 @router.post("/logout")
 def logout():
-    return {"message": "Logged out"}
\ No newline at end of file
+    return {"message": "Logged out"}
+
+
+@router.get("/user-cache-stats", response_model=dict)
+def get_user_cache_stats(current_user: User = Depends(get_current_user)):
+    """
+    Hit rate, expiries, evictions and invalidations of the cache that
+    resolves tokens to users
+    """
+    return user_cache.stats()
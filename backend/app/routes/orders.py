@@ -0,0 +1,76 @@
+# app/routes/orders.py
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.asset import Asset
+from app.models.order import Order
+from app.models.user import User
+from app.schemas.order import OrderCreate, OrderResponse
+from app.services.dependecy import get_current_user, get_read_db
+from app.services.order_book import order_engine
+
+router = APIRouter(prefix="/orders", tags=["orders"])
+
+
+@router.post("/", response_model=OrderResponse, status_code=201)
+def place_order(
+    order_in: OrderCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Rest a limit or stop order. It fills through the normal buy/sell path on
+    the first price refresh that crosses its trigger; funds and holdings are
+    checked at fill time.
+    """
+    if not db.query(Asset.id).filter(Asset.id == order_in.asset_id).first():
+        raise HTTPException(status_code=404, detail="Asset not found")
+    order = Order(user_id=current_user.id, status="open", **order_in.model_dump())
+    db.add(order)
+    db.commit()
+    db.refresh(order)
+    return order
+
+
+@router.get("/", response_model=list[OrderResponse])
+def read_my_orders(
+    status: Optional[str] = Query(None, pattern="^(open|filled|cancelled|rejected)$"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(Order).filter(Order.user_id == current_user.id)
+    if status:
+        query = query.filter(Order.status == status)
+    return query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit).all()
+
+
+@router.get("/stats")
+def read_order_engine_stats(current_user: User = Depends(get_current_user)):
+    """Fills, rejections and resting orders in this worker's order book"""
+    return order_engine.stats()
+
+
+@router.delete("/{order_id}", response_model=OrderResponse)
+def cancel_order(
+    order_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Conditional, so an order already claimed by a fill stays filled
+    cancelled = db.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.user_id == current_user.id, Order.status == "open")
+        .values(status="cancelled")
+    ).rowcount
+    db.commit()
+    order = db.query(Order).filter(Order.id == order_id, Order.user_id == current_user.id).first()
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Order is already {order.status}")
+    order_engine.book.discard(order_id)
+    return order
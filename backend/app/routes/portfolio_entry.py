@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends , HTTPException
+import asyncio
+from datetime import date, datetime, time
+from typing import Optional
+from fastapi import APIRouter, Depends , HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.services.dependecy import get_current_user
+from app.services.dependecy import get_current_user, get_read_db, reads_from_primary
 from app.models.user import User
 from app.models.portfolio_entry import PortfolioEntry
-from app.schemas.portfolio import PortfolioEntryCreate, PortfolioEntryResponse
+from app.schemas.portfolio import (
+    PortfolioEntryCreate, PortfolioEntryResponse, PortfolioSummary, PortfolioAnalytics, NavPoint,
+    OpenLotsReport, RealizedGainsReport
+)
+from app.services.portfolio_service import get_portfolio_summary
+from app.services.analytics import analytics_pool, run_portfolio_analytics
+from app.services.snapshot_service import get_nav_history
+from app.services.export_service import EXPORT_FORMATS, export_holdings
+from app.services.tax_lots import get_open_lots, get_realized_gains
 
 
 router = APIRouter(prefix="/portfolios", tags=["portfolios"])
@@ -49,7 +61,7 @@ def create_or_update_portfolio_entry(
 
 @router.get("/", response_model=list[PortfolioEntryResponse])
 def read_my_portfolios(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     entries = db.query(PortfolioEntry).filter(
@@ -58,6 +70,86 @@ def read_my_portfolios(
     return entries
 
 
+@router.get("/summary", response_model=PortfolioSummary)
+def read_my_portfolio_summary(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Positions valued at current prices with P&L, weights, totals and wallet balance
+    """
+    return get_portfolio_summary(db, current_user.id)
+
+
+@router.get("/nav", response_model=list[NavPoint])
+def read_my_nav_history(
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Daily net asset value (holdings + cash) from the precomputed snapshots
+    """
+    return get_nav_history(db, current_user.id, from_, to)
+
+
+@router.get("/analytics", response_model=PortfolioAnalytics)
+async def read_my_portfolio_analytics(
+    lookback_days: int = Query(365, ge=2, le=3650),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns, volatility, Sharpe ratio, max drawdown, correlations and historical VaR
+    of the current holdings over their daily price history
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        analytics_pool, run_portfolio_analytics, db, current_user.id, lookback_days
+    )
+
+
+
+@router.get("/lots", response_model=OpenLotsReport)
+def read_my_open_lots(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Open tax lots with their cost basis and unrealized gain at current prices
+    """
+    return get_open_lots(db, current_user.id)
+
+
+@router.get("/realized-gains", response_model=RealizedGainsReport)
+def read_my_realized_gains(
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Realized gains per asset for sells in [from, to], by the configured lot method
+    """
+    start = datetime.combine(from_, time.min) if from_ else None
+    end = datetime.combine(to, time.max) if to else None
+    return get_realized_gains(db, current_user.id, start, end)
+
+
+@router.get("/export")
+def export_my_holdings(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    primary: bool = Depends(reads_from_primary),
+    current_user: User = Depends(get_current_user)
+):
+    """Current holdings with cost basis and market value, streamed as CSV or NDJSON."""
+    return StreamingResponse(
+        export_holdings(current_user.id, format, primary),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="holdings.{format}"'},
+    )
+
 
 @router.put("/{entry_id}", response_model=PortfolioEntryResponse)
 def update_portfolio_entry(
@@ -0,0 +1,95 @@
+# app/routes/prices.py
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.schemas.price import PriceStatus
+from app.services.market_data import get_price_ages, get_cache_stats, get_provider_stats
+from app.services.price_stream import price_broadcaster
+
+router = APIRouter(prefix="/prices", tags=["prices"])
+
+
+@router.get("/status", response_model=list[PriceStatus])
+def get_price_status():
+    """
+    Cached price and its age for every tracked symbol
+    """
+    result = []
+    for symbol, (price, age) in sorted(get_price_ages().items()):
+        result.append({
+            "symbol": symbol,
+            "price": float(price) if price is not None else None,
+            "age_seconds": age,
+            "stale": age is None or age > settings.MAX_PRICE_AGE_SECONDS
+        })
+    return result
+
+
+@router.get("/cache-stats", response_model=dict)
+def get_price_cache_stats():
+    """
+    Hit, miss, coalesced and stale-served counters of the price cache
+    """
+    return get_cache_stats()
+
+
+@router.get("/provider-stats", response_model=dict)
+def get_price_provider_stats():
+    """
+    Per-provider latency histograms and hedge win counts
+    """
+    return get_provider_stats()
+
+
+@router.get("/stream")
+async def stream_prices():
+    """
+    Server-Sent Events stream of price changes: one snapshot, then a delta
+    message per refresh containing only the symbols whose price moved
+    """
+    queue = price_broadcaster.subscribe()
+
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.PRICE_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            price_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def price_websocket(websocket: WebSocket):
+    """
+    WebSocket variant of /prices/stream, same messages
+    """
+    await websocket.accept()
+    queue = price_broadcaster.subscribe()
+    try:
+        while True:
+            await websocket.send_text(await queue.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        price_broadcaster.unsubscribe(queue)
+
+
+@router.get("/stream-stats", response_model=dict)
+def get_price_stream_stats():
+    """
+    Subscriber count, published ticks and ticks dropped for slow clients
+    """
+    return price_broadcaster.stats()
@@ -1,23 +1,112 @@
 # app/routes/transactions.py
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from datetime import datetime
 from decimal import Decimal
+from typing import Optional
 
+from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import User
-from app.models.portfolio_entry import PortfolioEntry
 from app.models.asset import Asset
+from app.models.transaction import Transaction
 from app.models.wallet import Wallet
-from app.schemas.transaction import TransactionCreate, TransactionResponse
-from app.services.dependecy import get_current_user
-from app.services.market_data import get_current_price
+from app.schemas.transaction import (
+    TransactionCreate, TransactionResponse, BatchTradeRequest, BatchTradeResponse, TransactionPage, ImportResult
+)
+from app.services.dependecy import get_current_user, get_read_db, reads_from_primary
+from app.services.market_data import get_current_price, get_current_prices, get_price_age, get_price_ages
+from app.services import trade_service
+from app.services.trade_service import TradeError
+from app.services.trade_import import FORMATS, ImportRowError, import_trades
+from app.services.export_service import EXPORT_FORMATS, export_transactions
+from app.services.snapshot_service import record_nav_snapshot_for_user
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
+
+def _get_tradeable_price(symbol: str) -> Decimal:
+    """Current price for `symbol`, refusing to trade on a missing or stale quote."""
+    price = get_current_price(symbol)
+    age = get_price_age(symbol)
+    if not price or age is None or age > settings.MAX_PRICE_AGE_SECONDS:
+        raise HTTPException(status_code=503, detail="Price data is stale, try again shortly")
+    return price
+
+
+def _get_tradeable_prices(symbols: list) -> dict:
+    """Current prices for `symbols` in one lookup, refusing to trade if any quote is missing or stale."""
+    prices = get_current_prices(symbols)
+    ages = get_price_ages(list(prices))
+    stale = [
+        symbol for symbol, price in prices.items()
+        if not price or ages[symbol][1] is None or ages[symbol][1] > settings.MAX_PRICE_AGE_SECONDS
+    ]
+    if stale:
+        raise HTTPException(status_code=503, detail=f"Price data is stale for {', '.join(stale)}, try again shortly")
+    return prices
+
+def _encode_cursor(transaction: Transaction) -> str:
+    raw = f"{transaction.date.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date, transaction_id = raw.split("|")
+        return datetime.fromisoformat(date), int(transaction_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/", response_model=TransactionPage)
+def list_transactions(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The user's trades, newest first. Pages are keyed on the last row's
+    (date, id) rather than an OFFSET, so every page is one range scan of
+    ix_transactions_user_date_id however deep it is.
+    """
+    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+    if cursor:
+        query = query.filter(tuple_(Transaction.date, Transaction.id) < _decode_cursor(cursor))
+    rows = query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit + 1).all()
+
+    items = rows[:limit]
+    next_cursor = _encode_cursor(items[-1]) if len(rows) > limit else None
+    return TransactionPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/export")
+def export_my_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    primary: bool = Depends(reads_from_primary),
+    current_user: User = Depends(get_current_user)
+):
+    """The user's full trade history, oldest first, streamed as CSV or NDJSON."""
+    return StreamingResponse(
+        export_transactions(current_user.id, format, primary),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
+
+
+def _trade_error(e: TradeError) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.message)
+
+
 @router.post("/buy", response_model=TransactionResponse)
 def buy_asset(
     transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -25,67 +114,31 @@ def buy_asset(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
-    price = get_current_price(asset.symbol)
-    total_cost = Decimal(transaction.quantity) * Decimal(price)
-
-    # Fetch user's wallet
-    wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-    if not wallet:
-        raise HTTPException(status_code=404, detail="Wallet not found")
-    if wallet.balance < total_cost:
-        raise HTTPException(status_code=400, detail="Insufficient balance")
-
-    # Deduct from wallet
-    wallet.balance -= total_cost
-    db.add(wallet)
-
-    # Update or create portfolio entry
-    entry = db.query(PortfolioEntry).filter(
-        PortfolioEntry.user_id == current_user.id,
-        PortfolioEntry.asset_id == transaction.asset_id
-    ).first()
-
-    if entry:
-        # Convert to Decimal for precise arithmetic
-        entry_avg_price = Decimal(str(entry.average_buy_price)) if entry.average_buy_price else Decimal('0')
-        entry_qty = Decimal(str(entry.quantity))
-        trans_qty = Decimal(str(transaction.quantity))
-        current_price = Decimal(str(price))
-        
-        # Calculate weighted average
-        numerator = (entry_avg_price * entry_qty) + (current_price * trans_qty)
-        total_quantity = entry_qty + trans_qty
-        
-        # Update entry
-        entry.average_buy_price = float(numerator / total_quantity)
-        entry.quantity = float(total_quantity)
-    else:
-        entry = PortfolioEntry(
-            user_id=current_user.id,
-            asset_id=transaction.asset_id,
-            quantity=transaction.quantity,
-            average_buy_price=price
-        )
-        db.add(entry)
-
+    price = _get_tradeable_price(asset.symbol)
+    try:
+        result = trade_service.buy(db, current_user.id, asset.id, transaction.quantity, price)
+    except TradeError as e:
+        db.rollback()
+        raise _trade_error(e)
     db.commit()
-    db.refresh(entry)
-    db.refresh(wallet)
+    background_tasks.add_task(record_nav_snapshot_for_user, current_user.id)
 
     return TransactionResponse(
-        asset_id=entry.asset_id,
+        asset_id=asset.id,
         quantity=transaction.quantity,
-        average_buy_price=entry.average_buy_price,
+        transaction_id=result["transaction_id"],
+        average_buy_price=result["average_buy_price"],
         type="buy",
         price=price,
         date=datetime.utcnow(),
-        wallet_balance=wallet.balance  # Added wallet balance to response
+        wallet_balance=result["wallet_balance"]
     )
 
 
 @router.post("/sell", response_model=TransactionResponse)
 def sell_asset(
     transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -93,42 +146,124 @@ def sell_asset(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
-    price = get_current_price(asset.symbol)
-    total_sell = Decimal(transaction.quantity) * Decimal(price)
-
-    # Fetch user's portfolio entry
-    entry = db.query(PortfolioEntry).filter(
-        PortfolioEntry.user_id == current_user.id,
-        PortfolioEntry.asset_id == transaction.asset_id
-    ).first()
-    if not entry:
-        raise HTTPException(status_code=400, detail="Asset not in portfolio")
-    if transaction.quantity > entry.quantity:
-        raise HTTPException(status_code=400, detail="Not enough quantity to sell")
-
-    # Update wallet
-    wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-    if not wallet:
-        raise HTTPException(status_code=404, detail="Wallet not found")
-    wallet.balance += total_sell
-    db.add(wallet)
-
-    # Update portfolio
-    entry.quantity -= transaction.quantity
-    if entry.quantity == 0:
-        db.delete(entry)
-    else:
-        db.add(entry)
-
+    price = _get_tradeable_price(asset.symbol)
+    try:
+        result = trade_service.sell(db, current_user.id, asset.id, transaction.quantity, price)
+    except TradeError as e:
+        db.rollback()
+        raise _trade_error(e)
     db.commit()
-    db.refresh(wallet)
+    background_tasks.add_task(record_nav_snapshot_for_user, current_user.id)
 
     return TransactionResponse(
-        asset_id=entry.asset_id,
+        asset_id=asset.id,
         quantity=transaction.quantity,
-        average_buy_price=entry.average_buy_price,
+        transaction_id=result["transaction_id"],
+        average_buy_price=result["average_buy_price"],
         type="sell",
         price=price,
         date=datetime.utcnow(),
-        wallet_balance=wallet.balance  # ✅ ADD THIS
+        wallet_balance=result["wallet_balance"],
+        realized_gain=result["realized_gain"]
     )
+
+
+def _batch_assets(db: Session, batch: BatchTradeRequest) -> dict:
+    """The batch's assets by id; 404 if any is unknown."""
+    asset_ids = {leg.asset_id for leg in batch.legs}
+    assets = {asset.id: asset for asset in db.query(Asset).filter(Asset.id.in_(asset_ids)).all()}
+    missing = asset_ids - set(assets)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Asset not found: {', '.join(map(str, sorted(missing)))}")
+    return assets
+
+
+def _execute_batch(db: Session, user_id: int, batch: BatchTradeRequest, assets: dict, prices: dict) -> tuple:
+    """
+    Apply the legs in order at `prices` and commit, or roll back and answer
+    400 if an atomic batch has a rejected leg. Returns (leg results, wallet
+    balance after the last filled leg). Shared with the async route, which
+    looks the prices up off the event loop first.
+    """
+    # checked up front so a leg can only be rejected before it writes anything
+    if not db.query(Wallet.id).filter(Wallet.user_id == user_id).first():
+        raise HTTPException(status_code=404, detail="Wallet not found")
+
+    results = []
+    wallet_balance = None
+    for index, leg in enumerate(batch.legs):
+        price = prices[assets[leg.asset_id].symbol.upper()]
+        execute = trade_service.buy if leg.side == "buy" else trade_service.sell
+        result = {
+            "index": index,
+            "asset_id": leg.asset_id,
+            "type": leg.side,
+            "quantity": leg.quantity,
+            "price": price,
+            "status": "filled",
+        }
+        try:
+            filled = execute(db, user_id, leg.asset_id, leg.quantity, price)
+            result["transaction_id"] = filled["transaction_id"]
+            result["average_buy_price"] = filled["average_buy_price"]
+            result["realized_gain"] = filled.get("realized_gain")
+            wallet_balance = filled["wallet_balance"]
+        except TradeError as e:
+            result.update(status="rejected", error=e.message)
+        results.append(result)
+
+    rejected = [r for r in results if r["status"] == "rejected"]
+    if rejected and batch.atomic:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=[{"index": r["index"], "asset_id": r["asset_id"], "error": r["error"]} for r in rejected]
+        )
+
+    db.commit()
+    return results, wallet_balance
+
+
+@router.post("/batch", response_model=BatchTradeResponse)
+def batch_trade(
+    batch: BatchTradeRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Execute many buy/sell legs in one transaction: one price lookup and one
+    commit. Legs are applied in order, so a sell can fund a later buy.
+    """
+    assets = _batch_assets(db, batch)
+    prices = _get_tradeable_prices([asset.symbol for asset in assets.values()])
+    results, wallet_balance = _execute_batch(db, current_user.id, batch, assets, prices)
+    if any(r["status"] == "filled" for r in results):
+        background_tasks.add_task(record_nav_snapshot_for_user, current_user.id)
+
+    return BatchTradeResponse(legs=results, date=datetime.utcnow(), wallet_balance=wallet_balance)
+
+
+@router.post("/import", response_model=ImportResult)
+def import_transactions(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description=f"One of {', '.join(FORMATS)}; detected from the header if omitted"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Load a Binance/Coinbase trade-history CSV into the ledger and rebuild
+    holdings from it. Bad rows are skipped and reported; the wallet is not
+    touched.
+    """
+    if format is not None and format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    try:
+        result = import_trades(db, current_user.id, file.file, format)
+    except ImportRowError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    if result["imported"]:
+        background_tasks.add_task(record_nav_snapshot_for_user, current_user.id)
+    return result
@@ -1,44 +1,42 @@
-from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.models.wallet import Wallet
 from app.schemas.wallet import DepositRequest, WalletResponse
-from app.services.dependecy import get_current_user
+from app.services.dependecy import get_current_user, get_read_db
+from app.services.trade_service import credit_wallet
+from app.services.snapshot_service import record_nav_snapshot_for_user
 
 router = APIRouter(prefix="/wallet", tags=["Wallet"])
 
 
 @router.post("/deposit", response_model=WalletResponse)
-def deposit(payload: DepositRequest, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-
-    if not wallet:
-        wallet = Wallet(user_id=current_user.id, balance=Decimal("0.00"))
-        db.add(wallet)
-        db.commit()
-        db.refresh(wallet)
-
-    wallet.balance += Decimal(payload.amount)
+def deposit(payload: DepositRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    # single UPDATE ... RETURNING, so concurrent deposits can't overwrite each other
+    credit_wallet(db, current_user.id, payload.amount, create=True)
     db.commit()
-    db.refresh(wallet)
+    wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
+    background_tasks.add_task(record_nav_snapshot_for_user, current_user.id)
 
     return wallet
 
 
 @router.get("/balance", response_model=WalletResponse)
-def get_balance(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+def get_balance(db: Session = Depends(get_read_db), current_user = Depends(get_current_user)):
     """
     Get the current balance of the logged-in user's wallet
     """
     wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
 
     if not wallet:
-        # Optionally auto-create wallet
-        wallet = Wallet(user_id=current_user.id, balance=0)
-        db.add(wallet)
-        db.commit()
-        db.refresh(wallet)
+        # Optionally auto-create wallet, on the primary: a replica may only be lagging
+        with SessionLocal() as primary:
+            wallet = primary.query(Wallet).filter(Wallet.user_id == current_user.id).first()
+            if not wallet:
+                wallet = Wallet(user_id=current_user.id, balance=0)
+                primary.add(wallet)
+                primary.commit()
+                primary.refresh(wallet)
 
     return wallet
\ No newline at end of file
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class AlertCreate(BaseModel):
+    asset_id: int
+    threshold: float = Field(gt=0)
+    # above: the price rises to the threshold; below: it falls to it; cross: either
+    direction: Literal["above", "below", "cross"]
+
+
+class AlertResponse(BaseModel):
+    id: int
+    asset_id: int
+    threshold: float
+    direction: str
+    status: str
+    created_at: datetime
+    fired_at: Optional[datetime] = None
+    fired_price: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+
+class AlertNotificationResponse(BaseModel):
+    id: int
+    alert_id: int
+    symbol: str
+    threshold: float
+    direction: str
+    previous_price: float
+    price: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 
 class AssetWithPrice(BaseModel):
     id: int
@@ -7,4 +8,18 @@ class AssetWithPrice(BaseModel):
     current_price: float
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PriceCandle(BaseModel):
+    time: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+
+
+class PriceHistoryResponse(BaseModel):
+    asset_id: int
+    symbol: str
+    interval: str
+    candles: list[PriceCandle]
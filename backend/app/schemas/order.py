@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+from app.schemas.types import PositivePrice, PositiveQuantity, Price, Quantity
+
+
+class OrderCreate(BaseModel):
+    asset_id: int
+    side: Literal["buy", "sell"]
+    # limit: buy at or below / sell at or above the trigger
+    # stop: buy at or above / sell at or below the trigger (stop-loss)
+    type: Literal["limit", "stop"]
+    quantity: PositiveQuantity
+    trigger_price: PositivePrice
+
+
+class OrderResponse(BaseModel):
+    id: int
+    asset_id: int
+    side: str
+    type: str
+    quantity: Quantity
+    trigger_price: Price
+    status: str
+    created_at: datetime
+    filled_at: Optional[datetime] = None
+    fill_price: Optional[Price] = None
+    transaction_id: Optional[int] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -1,16 +1,113 @@
 from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+from app.schemas.types import Money, Price, Quantity
 
 class PortfolioEntryCreate(BaseModel):
     asset_id: int
-    quantity: float
-    average_buy_price: float
+    quantity: Quantity
+    average_buy_price: Price
 
 class PortfolioEntryResponse(BaseModel):
     id: int
     user_id: int
     asset_id: int
-    quantity: float
-    average_buy_price: float
+    quantity: Quantity
+    average_buy_price: Price
 
     class Config:
         orm_mode = True
+
+
+class PositionSummary(BaseModel):
+    entry_id: int
+    asset_id: int
+    symbol: str
+    name: str
+    quantity: Quantity
+    average_buy_price: Price
+    current_price: float
+    cost_basis: float
+    market_value: float
+    unrealized_pnl: float
+    unrealized_pnl_pct: float
+    weight: float  # % of total market value
+
+
+class PortfolioSummary(BaseModel):
+    positions: list[PositionSummary]
+    total_cost_basis: float
+    total_market_value: float
+    total_unrealized_pnl: float
+    total_unrealized_pnl_pct: float
+    cash_balance: float
+    net_asset_value: float
+    currency: str
+
+
+class PortfolioMetrics(BaseModel):
+    days: int
+    market_value: float
+    weights: list[float]
+    total_return: float
+    annualized_return: float
+    annualized_volatility: float
+    sharpe_ratio: Optional[float] = None
+    max_drawdown: float
+    var_95: float  # 1-day historical VaR in currency units
+    var_99: float
+    asset_volatility: list[float]
+    correlation: list[list[float]]
+
+
+class PortfolioAnalytics(BaseModel):
+    symbols: list[str]  # the holdings the metrics cover, in the order of weights/correlation
+    missing_history: list[str] = []  # holdings left out: no daily price in the window
+    lookback_days: int
+    metrics: Optional[PortfolioMetrics] = None  # None until there are 2+ days of history
+
+
+class NavPoint(BaseModel):
+    day: date
+    holdings_value: Money
+    cash_balance: Money
+    nav: Money
+
+    class Config:
+        from_attributes = True
+
+
+class TaxLotPosition(BaseModel):
+    lot_id: int
+    asset_id: int
+    symbol: str
+    acquired_at: datetime
+    quantity: Quantity
+    remaining: Quantity
+    cost_price: Price
+    current_price: Price
+    cost_basis: float
+    unrealized_gain: float
+
+
+class OpenLotsReport(BaseModel):
+    method: str  # fifo, lifo or hifo
+    lots: list[TaxLotPosition]
+    total_cost_basis: float
+    total_unrealized_gain: float
+
+
+class RealizedGainSummary(BaseModel):
+    asset_id: int
+    symbol: str
+    quantity: Quantity
+    cost_basis: Money
+    proceeds: Money
+    gain: Money
+
+
+class RealizedGainsReport(BaseModel):
+    method: str
+    assets: list[RealizedGainSummary]
+    total_gain: Money
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class PriceStatus(BaseModel):
+    symbol: str
+    price: Optional[float] = None
+    age_seconds: Optional[float] = None
+    stale: bool
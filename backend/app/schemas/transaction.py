@@ -1,29 +1,93 @@
 # app/schemas/transaction.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from decimal import Decimal
-from typing import Optional
+from typing import Literal, Optional
+
+from app.schemas.types import Money, PositiveQuantity, Price, Quantity
 
 
 from pydantic import BaseModel
 
 class TransactionCreate(BaseModel):
     asset_id: int
-    quantity: float
+    quantity: PositiveQuantity
 
 
 
 # app/schemas/transaction.py
 
 class TransactionResponse(BaseModel):
+    transaction_id: Optional[int] = None
     asset_id: int
-    quantity: float
-    average_buy_price: float
+    quantity: Quantity
+    average_buy_price: Price
     type: str  
-    price: float
+    price: Price
     date: datetime
-    wallet_balance: Optional[Decimal] = None
+    wallet_balance: Optional[Money] = None
+    realized_gain: Optional[Money] = None  # sells only, from the closed tax lots
 
     class Config:
         orm_mode = True
 
+
+class TradeLeg(BaseModel):
+    asset_id: int
+    side: Literal["buy", "sell"]
+    quantity: PositiveQuantity
+
+
+class BatchTradeRequest(BaseModel):
+    legs: list[TradeLeg] = Field(min_length=1, max_length=100)
+    # all-or-nothing by default; with atomic=False rejected legs are skipped
+    atomic: bool = True
+
+
+class TradeLegResult(BaseModel):
+    index: int
+    transaction_id: Optional[int] = None
+    asset_id: int
+    type: str
+    quantity: Quantity
+    price: Price
+    status: Literal["filled", "rejected"]
+    average_buy_price: Optional[Price] = None
+    realized_gain: Optional[Money] = None
+    error: Optional[str] = None
+
+
+class BatchTradeResponse(BaseModel):
+    legs: list[TradeLegResult]
+    date: datetime
+    wallet_balance: Optional[Money] = None
+
+
+class TransactionRecord(BaseModel):
+    id: int
+    asset_id: int
+    portfolio_entry_id: Optional[int] = None
+    type: str
+    quantity: Quantity
+    price: Price
+    date: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TransactionPage(BaseModel):
+    items: list[TransactionRecord]
+    # pass back as ?cursor= for the next (older) page; null on the last page
+    next_cursor: Optional[str] = None
+
+
+class ImportRowIssue(BaseModel):
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    skipped: int
+    errors: list[ImportRowIssue]  # first 100 rejected rows
+    positions: Optional[int] = None  # open positions after holdings were rebuilt
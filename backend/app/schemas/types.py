@@ -0,0 +1,47 @@
+# app/schemas/types.py
+"""
+Fixed-point fields (see app.core.fixed_point): Decimals rounded to their
+places on the way in, JSON numbers on the way out like the floats they
+replace. JSON input is read straight into Decimal, without a float in
+between.
+
+Values are checked after rounding: all of them against what their BIGINT
+column can hold, and the Positive* variants against zero, so an amount
+too small to represent is rejected rather than stored as zero.
+"""
+from decimal import Decimal
+from typing import Annotated
+
+from pydantic import AfterValidator, PlainSerializer
+
+from app.core.fixed_point import MONEY_PLACES, PRICE_PLACES, QUANTITY_PLACES, max_amount, quantize
+
+_as_number = PlainSerializer(float, return_type=float, when_used="json")
+
+
+def _fixed_point(places: int) -> AfterValidator:
+    limit = max_amount(places)
+
+    def validate(value: Decimal) -> Decimal:
+        value = quantize(value, places)
+        if abs(value) > limit:
+            raise ValueError(f"must be at most {limit} in magnitude")
+        return value
+
+    return AfterValidator(validate)
+
+
+Quantity = Annotated[Decimal, _fixed_point(QUANTITY_PLACES), _as_number]
+Price = Annotated[Decimal, _fixed_point(PRICE_PLACES), _as_number]
+Money = Annotated[Decimal, _fixed_point(MONEY_PLACES), _as_number]
+
+
+def _positive(value: Decimal) -> Decimal:
+    if value <= 0:
+        raise ValueError("must be greater than 0 at this precision")
+    return value
+
+
+PositiveQuantity = Annotated[Quantity, AfterValidator(_positive)]
+PositivePrice = Annotated[Price, AfterValidator(_positive)]
+PositiveMoney = Annotated[Money, AfterValidator(_positive)]
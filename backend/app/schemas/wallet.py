@@ -1,12 +1,14 @@
 from pydantic import BaseModel, Field
 
+from app.schemas.types import Money, PositiveMoney
+
 class DepositRequest(BaseModel):
-    amount: float = Field(gt=0, example=100.0)
+    amount: PositiveMoney = Field(example=100.0)
 
 
 class WalletResponse(BaseModel):
     user_id: int
-    balance: float
+    balance: Money
     currency: str
 
     class Config:
@@ -0,0 +1,122 @@
+# app/services/analytics.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.asset import Asset
+from app.models.portfolio_entry import PortfolioEntry
+from app.services.price_history import price_history
+
+DAY = 86400
+PERIODS_PER_YEAR = 365  # crypto trades every day
+
+# NumPy releases the GIL for the heavy array work, so threads scale here
+analytics_pool = ThreadPoolExecutor(max_workers=settings.ANALYTICS_WORKERS, thread_name_prefix="analytics")
+
+
+def load_price_matrix(symbols: list, start: float, end: float):
+    """
+    Daily closes for `symbols` aligned on one day grid: (days, matrix[days, assets]).
+    Gaps are forward-filled; days before an asset's first close stay NaN.
+    """
+    first_day = start - start % DAY
+    days = np.arange(first_day, end + 1, DAY, dtype=np.float64)
+    matrix = np.full((len(days), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        times, closes = price_history.closes(symbol, "1d", first_day, end)
+        if not len(times):
+            continue
+        rows = np.searchsorted(days, np.frombuffer(times, dtype=np.float64))
+        matrix[rows, j] = np.frombuffer(closes, dtype=np.float64)
+    return days, _forward_fill(matrix)
+
+
+def _forward_fill(matrix: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(matrix)
+    index = np.where(valid, np.arange(matrix.shape[0])[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = matrix[index, np.arange(matrix.shape[1])]
+    # leading gaps have nothing to carry forward
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+    return filled
+
+
+def compute_metrics(prices: np.ndarray, quantities: np.ndarray, risk_free_rate: float = 0.0) -> dict:
+    """
+    Risk/performance metrics for holdings `quantities` over the daily price
+    matrix `prices[days, assets]`, all as whole-array operations.
+    Weights are today's market-value weights, held constant over the window.
+    """
+    # Only days where every held asset has a price
+    complete = ~np.isnan(prices).any(axis=1)
+    prices = prices[complete]
+    n_days, n_assets = prices.shape
+    if n_days < 2 or n_assets == 0:
+        return None
+
+    values = prices[-1] * quantities
+    total_value = values.sum()
+    weights = values / total_value if total_value else np.full(n_assets, 1.0 / n_assets)
+
+    asset_returns = prices[1:] / prices[:-1] - 1.0
+    portfolio_returns = asset_returns @ weights
+
+    growth = np.cumprod(1.0 + portfolio_returns)
+    drawdowns = growth / np.maximum.accumulate(growth) - 1.0
+    mean = portfolio_returns.mean()
+    volatility = portfolio_returns.std(ddof=1) * np.sqrt(PERIODS_PER_YEAR) if len(portfolio_returns) > 1 else 0.0
+    annualized_return = (1.0 + mean) ** PERIODS_PER_YEAR - 1.0
+    var_95, var_99 = -np.percentile(portfolio_returns, [5, 1]) * total_value
+
+    if n_assets > 1:
+        correlation = np.corrcoef(asset_returns, rowvar=False)
+        correlation = np.nan_to_num(correlation, nan=0.0)
+    else:
+        correlation = np.ones((1, 1))
+
+    return {
+        "days": int(n_days),
+        "market_value": float(total_value),
+        "weights": weights.tolist(),
+        "total_return": float(growth[-1] - 1.0),
+        "annualized_return": float(annualized_return),
+        "annualized_volatility": float(volatility),
+        "sharpe_ratio": float((annualized_return - risk_free_rate) / volatility) if volatility else None,
+        "max_drawdown": float(drawdowns.min()),
+        "var_95": float(var_95),
+        "var_99": float(var_99),
+        "asset_volatility": (asset_returns.std(axis=0, ddof=1) * np.sqrt(PERIODS_PER_YEAR)).tolist()
+        if len(asset_returns) > 1 else [0.0] * n_assets,
+        "correlation": correlation.tolist(),
+    }
+
+
+def run_portfolio_analytics(db: Session, user_id: int, lookback_days: int) -> dict:
+    """
+    Load the user's holdings and their daily price history, then compute
+    metrics. Holdings with no recorded price in the window are left out and
+    listed under `missing_history`, so one new asset doesn't void the rest.
+    """
+    rows = (
+        db.query(Asset.symbol, PortfolioEntry.quantity)
+        .join(Asset, PortfolioEntry.asset_id == Asset.id)
+        .filter(PortfolioEntry.user_id == user_id)
+        .all()
+    )
+    end = time.time()
+    start = end - lookback_days * DAY
+    symbols = [symbol.upper() for symbol, _ in rows]
+    quantities = np.array([float(quantity) for _, quantity in rows], dtype=np.float64)
+
+    _, prices = load_price_matrix(symbols, start, end)
+    has_history = ~np.isnan(prices).all(axis=0)
+    metrics = compute_metrics(prices[:, has_history], quantities[has_history], settings.RISK_FREE_RATE)
+    return {
+        "symbols": [symbol for symbol, kept in zip(symbols, has_history) if kept],
+        "missing_history": [symbol for symbol, kept in zip(symbols, has_history) if not kept],
+        "lookback_days": lookback_days,
+        "metrics": metrics,
+    }
@@ -1,3 +1,6 @@
+import asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.core.security import hash_password
@@ -23,9 +26,24 @@ def login_user(db: Session, email: str, password: str):
     user = authenticate_user(db, email, password)
     if not user:
         return None
-    token = create_access_token({"sub": user.email})
+    token = create_access_token({"sub": user.email, "uid": user.id})
     return token
 
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+    # bcrypt is deliberately slow, keep it off the event loop
+    if not user or not await asyncio.to_thread(verify_password, password, user.hashed_password):
+        return None
+    return user
 
+async def create_user_async(db: AsyncSession, email: str, password: str) -> User:
+    user = User(email=email, hashed_password=await asyncio.to_thread(hash_password, password))
+    db.add(user)
+    await db.commit()
+    return user
 
-
+async def login_user_async(db: AsyncSession, email: str, password: str):
+    user = await authenticate_user_async(db, email, password)
+    if not user:
+        return None
+    return create_access_token({"sub": user.email, "uid": user.id})
@@ -1,19 +1,29 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Cookie, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 from app.db.session import get_db
+from app.db.async_session import get_async_db
+from app.db.replicas import READ_YOUR_WRITES_COOKIE, cookie_window_open, read_session, recent_writers
 from app.models.user import User
 from app.core.config import settings  # using the Settings object
+from app.services.user_cache import CachedUser, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _claims(token: str) -> tuple:
+    """(email, user id) from the token; the id is None in tokens issued before it was added."""
     try:
         # Use settings.JWT_SECRET and settings.JWT_ALGO
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGO])
@@ -22,8 +32,69 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    user_id = payload.get("uid")
+    return email, user_id if isinstance(user_id, int) else None
 
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+
+def _resolved(user: Optional[User], email: str) -> CachedUser:
+    # an id that now belongs to someone else (user deleted, id reused) doesn't authenticate
+    if user is None or user.email != email:
         raise credentials_exception
-    return user
+    cached = CachedUser.of(user)
+    user_cache.put(cached)
+    return cached
+
+
+def token_subject(token: Optional[str]) -> Optional[str]:
+    """The token's subject, or None for a missing or invalid token."""
+    if not token:
+        return None
+    try:
+        return _claims(token)[0]
+    except HTTPException:
+        return None
+
+
+def reads_from_primary(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    read_primary_until: Optional[str] = Cookie(None, alias=READ_YOUR_WRITES_COOKIE),
+) -> bool:
+    """Whether the caller wrote recently enough that a replica may not have their change yet."""
+    if cookie_window_open(read_primary_until):
+        return True
+    subject = token_subject(token)
+    return subject is not None and recent_writers.wrote_recently(subject)
+
+
+def get_read_db(primary: bool = Depends(reads_from_primary)):
+    """get_db for routes that only read: a replica session unless the caller just wrote."""
+    db = read_session(primary)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> CachedUser:
+    """
+    The caller, from the user cache when their token carries an id; the
+    session is only used on a miss or for tokens without one.
+    """
+    email, user_id = _claims(token)
+    if user_id is None:
+        return _resolved(db.query(User).filter(User.email == email).first(), email)
+    cached = user_cache.get(user_id)
+    if cached is not None and cached.email == email:
+        return cached
+    return _resolved(db.get(User, user_id), email)
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> CachedUser:
+    """get_current_user for the async routes: same cache, awaited query on a miss."""
+    email, user_id = _claims(token)
+    if user_id is None:
+        return _resolved((await db.execute(select(User).where(User.email == email))).scalar_one_or_none(), email)
+    cached = user_cache.get(user_id)
+    if cached is not None and cached.email == email:
+        return cached
+    return _resolved(await db.get(User, user_id), email)
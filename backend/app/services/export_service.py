@@ -0,0 +1,110 @@
+# app/services/export_service.py
+"""
+Streaming CSV/NDJSON exports. Rows come off a server-side cursor
+(`yield_per`) one partition at a time and are encoded as they arrive, so
+the first bytes go out immediately and memory doesn't depend on how much
+history a user has.
+
+The generators open their own session: the request's session may be
+closed before a StreamingResponse finishes sending. It is a read session,
+on a replica unless `primary` is set.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.core.fixed_point import money, notional
+from app.db.replicas import read_session
+from app.models.asset import Asset
+from app.models.portfolio_entry import PortfolioEntry
+from app.models.transaction import Transaction
+from app.services.market_data import get_current_prices
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+PARTITION_SIZE = 1000
+
+TRANSACTION_COLUMNS = ("id", "date", "symbol", "type", "quantity", "price", "total")
+HOLDING_COLUMNS = ("symbol", "name", "quantity", "average_buy_price", "cost_basis", "current_price", "market_value")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)  # numbers, like the API responses
+    raise TypeError(f"Not serializable: {type(value)}")
+
+
+def encode(partitions, columns: tuple, fmt: str):
+    """Turn an iterable of row-tuple batches into CSV or NDJSON chunks, one chunk per batch."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()  # header goes out before the first query returns
+        for rows in partitions:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue()
+    else:
+        for rows in partitions:
+            yield "".join(
+                json.dumps(dict(zip(columns, row)), default=_json_default, separators=(",", ":")) + "\n"
+                for row in rows
+            )
+
+
+def _transaction_partitions(user_id: int, primary: bool):
+    db = read_session(primary)
+    try:
+        result = db.execute(
+            select(Transaction.id, Transaction.date, Asset.symbol, Transaction.type, Transaction.quantity, Transaction.price)
+            .join(Asset, Transaction.asset_id == Asset.id)
+            .where(Transaction.user_id == user_id)
+            .order_by(Transaction.date, Transaction.id)
+            .execution_options(yield_per=PARTITION_SIZE)
+        )
+        for rows in result.partitions():
+            yield [
+                (id_, date.isoformat() if date else None, symbol, type_, quantity, price, notional(quantity, price))
+                for id_, date, symbol, type_, quantity, price in rows
+            ]
+    finally:
+        db.close()
+
+
+def _holding_partitions(user_id: int, primary: bool):
+    db = read_session(primary)
+    try:
+        result = db.execute(
+            select(Asset.symbol, Asset.name, PortfolioEntry.quantity, PortfolioEntry.average_buy_price)
+            .join(Asset, PortfolioEntry.asset_id == Asset.id)
+            .where(PortfolioEntry.user_id == user_id)
+            .order_by(Asset.symbol)
+            .execution_options(yield_per=PARTITION_SIZE)
+        )
+        for rows in result.partitions():
+            prices = get_current_prices([symbol for symbol, _, _, _ in rows])  # one batch lookup per partition
+            batch = []
+            for symbol, name, quantity, average_price in rows:
+                price = prices.get(symbol.upper(), Decimal("0"))
+                batch.append((
+                    symbol, name, quantity, average_price, money(quantity * average_price),
+                    price, money(quantity * price),
+                ))
+            yield batch
+    finally:
+        db.close()
+
+
+def export_transactions(user_id: int, fmt: str, primary: bool = False):
+    return encode(_transaction_partitions(user_id, primary), TRANSACTION_COLUMNS, fmt)
+
+
+def export_holdings(user_id: int, fmt: str, primary: bool = False):
+    return encode(_holding_partitions(user_id, primary), HOLDING_COLUMNS, fmt)
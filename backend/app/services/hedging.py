@@ -0,0 +1,152 @@
+# app/services/hedging.py
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from app.core.config import settings
+from app.services.market_providers import MarketDataProvider, ProviderError
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram plus a window of recent samples used to
+    estimate percentiles that follow the provider's current behaviour.
+    """
+
+    def __init__(self, window: int = 500):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=window)
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, ok: bool = True):
+        with self._lock:
+            self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            self.recent.append(latency_ms)
+            if not ok:
+                self.errors += 1
+
+    def percentile(self, q: float):
+        """q-th percentile (0-100) over the recent window, or None without samples."""
+        with self._lock:
+            samples = sorted(self.recent)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * q / 100))
+        return samples[index]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            errors = self.errors
+        labels = [f"le_{b}ms" for b in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "buckets": dict(zip(labels, counts)),
+            "count": sum(counts),
+            "errors": errors,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
+class HedgedProvider(MarketDataProvider):
+    """
+    Sends each request to the primary provider and, if it hasn't answered
+    within its recent p95 latency (clamped to [min_delay, max_delay]), sends
+    the same request to the secondary. The first successful answer wins.
+    A primary that fails before the delay triggers the secondary right away.
+    """
+
+    name = "hedged"
+
+    def __init__(self, primary: MarketDataProvider, secondary: MarketDataProvider,
+                 min_delay_ms: float = None, max_delay_ms: float = None, initial_delay_ms: float = None,
+                 min_samples: int = 20):
+        self.primary = primary
+        self.secondary = secondary
+        self.min_delay_ms = min_delay_ms if min_delay_ms is not None else settings.MARKET_DATA_HEDGE_MIN_DELAY_MS
+        self.max_delay_ms = max_delay_ms if max_delay_ms is not None else settings.MARKET_DATA_HEDGE_MAX_DELAY_MS
+        self.initial_delay_ms = initial_delay_ms if initial_delay_ms is not None else settings.MARKET_DATA_HEDGE_INITIAL_DELAY_MS
+        self.min_samples = min_samples
+        self.histograms = {"primary": LatencyHistogram(), "secondary": LatencyHistogram()}
+        self.wins = {"primary": 0, "secondary": 0}
+        self.hedges_sent = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=settings.MARKET_DATA_POOL_SIZE * 2, thread_name_prefix="hedge")
+
+    def supported_symbols(self) -> list:
+        return sorted(set(self.primary.supported_symbols()) | set(self.secondary.supported_symbols()))
+
+    def hedge_delay_ms(self) -> float:
+        histogram = self.histograms["primary"]
+        if len(histogram.recent) < self.min_samples:
+            return self.initial_delay_ms
+        return min(self.max_delay_ms, max(self.min_delay_ms, histogram.percentile(95)))
+
+    def _timed(self, role: str, provider: MarketDataProvider, symbols: list) -> dict:
+        start = time.perf_counter()
+        ok = False
+        try:
+            prices = provider.fetch_prices(symbols)
+            ok = True
+            return prices
+        finally:
+            self.histograms[role].record((time.perf_counter() - start) * 1000, ok)
+
+    def fetch_prices(self, symbols: list) -> dict:
+        primary = self._executor.submit(self._timed, "primary", self.primary, symbols)
+        roles = {primary: "primary"}
+        done, _ = wait([primary], timeout=self.hedge_delay_ms() / 1000)
+        if primary in done and primary.exception() is None:
+            return self._win("primary", primary.result())
+
+        secondary = self._executor.submit(self._timed, "secondary", self.secondary, symbols)
+        roles[secondary] = "secondary"
+        with self._lock:
+            self.hedges_sent += 1
+
+        pending = set(roles)
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return self._win(roles[future], future.result())
+                last_error = future.exception()
+        raise last_error if isinstance(last_error, ProviderError) else ProviderError(f"All providers failed: {last_error}")
+
+    def _win(self, role: str, prices: dict) -> dict:
+        with self._lock:
+            self.wins[role] += 1
+        return prices
+
+    def stats(self) -> dict:
+        with self._lock:
+            wins = dict(self.wins)
+            hedges_sent = self.hedges_sent
+        return {
+            "provider": self.name,
+            "hedge_delay_ms": self.hedge_delay_ms(),
+            "hedges_sent": hedges_sent,
+            "wins": wins,
+            "latency": {role: histogram.snapshot() for role, histogram in self.histograms.items()},
+        }
+
+    def close(self):
+        self.primary.close()
+        self.secondary.close()
+        self._executor.shutdown(wait=False)
+
+    async def aclose(self):
+        await self.primary.aclose()
+        await self.secondary.aclose()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,57 @@
+# app/services/id_watermark.py
+"""
+Incremental loading of new rows by id, for the order and alert engines.
+
+Ids come from a sequence when the row is inserted, not when it commits:
+on PostgreSQL a slow transaction can commit id 41 after id 42 has been
+loaded. A plain `id > last_id` scan then skips 41 forever. Each scan here
+resumes from the high-water mark as it stood `lookback` seconds earlier,
+so rows whose commit lagged by less than that are still picked up, and
+the ids already loaded in that window are filtered out.
+"""
+import time
+from collections import deque
+
+
+class IdWatermark:
+    """Scans (floor, new, rewind) must come from one thread; loaded() may be called from any."""
+
+    def __init__(self, lookback: float):
+        self.lookback = lookback
+        self.last_id = 0
+        self._marks = deque()  # (monotonic time of a scan, last_id before it)
+        self._floor = 0
+        self._loaded = set()   # ids above the floor that were loaded
+
+    def floor(self) -> int:
+        """Start of the next scan: load rows with id greater than this."""
+        now = time.monotonic()
+        self._marks.append((now, self.last_id))
+        # keep the newest mark at least `lookback` old, and everything after it
+        while len(self._marks) > 1 and self._marks[1][0] <= now - self.lookback:
+            self._marks.popleft()
+        self._floor = self._marks[0][1]
+        self._loaded = {row_id for row_id in self._loaded if row_id > self._floor}
+        return self._floor
+
+    def new(self, ids) -> set:
+        """The ids in `ids` not loaded before; records them (and the high-water mark) as loaded."""
+        fresh = {row_id for row_id in ids if row_id not in self._loaded}
+        self._loaded |= fresh
+        self.last_id = max(self.last_id, max(ids, default=0))
+        return fresh
+
+    def loaded(self, row_id: int) -> bool:
+        """Whether a scan has already returned `row_id` (ids at or below the floor count as seen)."""
+        return row_id <= self._floor or row_id in self._loaded
+
+    def rewind(self, row_id: int):
+        """
+        Load `row_id` again on the next scan, e.g. after failing to act on it.
+        Rows loaded between it and the old floor can come back too, so only
+        callers that dedupe what they load (like OrderBook.add) should rewind.
+        """
+        self.last_id = min(self.last_id, row_id - 1)
+        self._marks = deque((at, min(mark, row_id - 1)) for at, mark in self._marks)
+        self._floor = min(self._floor, row_id - 1)
+        self._loaded.discard(row_id)
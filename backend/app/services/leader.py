@@ -0,0 +1,53 @@
+# app/services/leader.py
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, assume a single worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """
+    Elects one worker process per host through an exclusive, non-blocking
+    file lock. The OS drops the lock when the holder exits, so another
+    worker takes over on its next attempt.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logger.info(f"Worker {os.getpid()} took the leader lock {self.path}")
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
@@ -1,170 +1,142 @@
 # app/services/market_data.py
-import requests
 import time
 from decimal import Decimal
+from functools import partial
 import logging
-from functools import lru_cache
+
+from app.core.config import settings
+from app.services.price_cache import PriceCache
+from app.services.price_cache_backends import create_backend
+from app.services.market_providers import SYMBOL_TO_COINGECKO_ID, ProviderError, create_provider
+from app.services.rate_limiter import AdaptiveTokenBucket
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Map database symbols to CoinGecko IDs
-SYMBOL_TO_COINGECKO_ID = {
-    "BTC": "bitcoin",
-    "ETH": "ethereum",
-    "ADA": "cardano"
-    # Add more as needed
-}
-
-# Global cache
-_price_cache = {}
-_CACHE_DURATION = 60  # Cache for 60 seconds
-_LAST_BULK_FETCH_TIME = 0
-_BULK_CACHE_DURATION = 30  # Bulk fetch every 30 seconds
-
-def _fetch_from_coingecko(symbols: list = None) -> dict:
+# Where prices come from (CoinGecko by default, a recorded fixture offline)
+provider = create_provider()
+
+# Every outbound call in this process takes a token; 429/5xx shrink the rate (0 disables)
+_rate_limiter = AdaptiveTokenBucket(
+    rate=settings.MARKET_DATA_RATE_LIMIT_PER_SECOND,
+    burst=settings.MARKET_DATA_RATE_LIMIT_BURST,
+    min_rate=settings.MARKET_DATA_RATE_LIMIT_MIN_PER_SECOND,
+    recovery_step=settings.MARKET_DATA_RATE_LIMIT_PER_SECOND / 20,
+    max_backoff=settings.MARKET_DATA_RATE_LIMIT_MAX_BACKOFF_SECONDS
+) if settings.MARKET_DATA_RATE_LIMIT_PER_SECOND > 0 else None
+
+# Global cache: fresh for 60s, then served stale while one refresh runs
+_price_cache = PriceCache(
+    soft_ttl=settings.PRICE_CACHE_SOFT_TTL_SECONDS,
+    hard_ttl=settings.PRICE_CACHE_HARD_TTL_SECONDS,
+    backend=create_backend(settings.PRICE_CACHE_BACKEND, settings.PRICE_CACHE_PATH)
+)
+
+def is_shared_cache() -> bool:
+    """True when the cache is shared between worker processes."""
+    return _price_cache.backend.name != "memory"
+
+def _fetch_prices(symbols: list, max_wait: float = None) -> dict:
     """
-    Fetch prices from CoinGecko API.
-    If symbols provided, fetch specific ones. Otherwise fetch all.
+    Fetch `symbols` from the configured provider and return {SYMBOL: Decimal price}
+    for those it knows. Waits at most `max_wait` seconds for a rate limit token
+    (None queues until one is free); without a token nothing is fetched and the
+    cache serves what it has.
     """
+    if _rate_limiter is not None and not _rate_limiter.acquire(timeout=max_wait):
+        logger.info(f"Outbound rate limit reached, not fetching {symbols}")
+        return {}
     try:
-        if symbols:
-            # Fetch specific symbols
-            coin_ids = [SYMBOL_TO_COINGECKO_ID.get(s.upper()) for s in symbols]
-            coin_ids = [cid for cid in coin_ids if cid]  # Remove None
-            
-            if not coin_ids:
-                return {}
-                
-            url = "https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                "ids": ",".join(coin_ids),
-                "vs_currencies": "usd",
-                "precision": "full"
-            }
+        prices = provider.fetch_prices(symbols)
+    except ProviderError as e:
+        if e.is_throttle and _rate_limiter is not None:
+            _rate_limiter.on_throttle(e.retry_after)
+        if e.status_code == 429:
+            logger.warning("Rate limit exceeded. Using cached values.")
         else:
-            # Fetch all mapped symbols
-            coin_ids = list(SYMBOL_TO_COINGECKO_ID.values())
-            url = "https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                "ids": ",".join(coin_ids),
-                "vs_currencies": "usd",
-                "precision": "full"
-            }
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Accept": "application/json"
-        }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            if response.status_code == 429:
-                logger.warning("Rate limit exceeded. Using cached values.")
-            else:
-                logger.error(f"CoinGecko API error: {response.status_code} - {response.text}")
-            return {}
-        
-        data = response.json()
-        return data
-        
-    except Exception as e:
-        logger.error(f"Error fetching from CoinGecko: {e}")
+            logger.error(str(e))
         return {}
+    if _rate_limiter is not None:
+        _rate_limiter.on_success()
+    return prices
 
-def get_current_price(symbol: str) -> Decimal:
+def supported_symbols() -> list:
+    """Symbols the configured provider can price."""
+    return provider.supported_symbols()
+
+def _supported() -> set:
+    return set(provider.supported_symbols())
+
+def _request_fetcher(max_wait: float = None):
+    if max_wait is None:
+        max_wait = settings.MARKET_DATA_REQUEST_MAX_WAIT_SECONDS
+    return partial(_fetch_prices, max_wait=max_wait)
+
+def get_current_price(symbol: str, max_wait: float = None) -> Decimal:
     """
     Fetch current price with caching to avoid rate limits.
+    On a cache miss, waits up to `max_wait` seconds (MARKET_DATA_REQUEST_MAX_WAIT_SECONDS
+    by default) for the outbound rate limiter before falling back to the cache.
     """
     symbol_upper = symbol.upper()
-    current_time = time.time()
-    
-    # Check cache first
-    if symbol_upper in _price_cache:
-        price, timestamp = _price_cache[symbol_upper]
-        if current_time - timestamp < _CACHE_DURATION:
-            return price
-    
-    # Cache miss or expired - fetch fresh price
-    coingecko_id = SYMBOL_TO_COINGECKO_ID.get(symbol_upper)
-    if not coingecko_id:
+    if symbol_upper not in _supported() and _price_cache.peek(symbol_upper) is None:
         logger.warning(f"Unknown symbol: {symbol}")
         return Decimal("0.0")
-    
-    # Try bulk fetch first (more efficient)
-    global _LAST_BULK_FETCH_TIME
-    if current_time - _LAST_BULK_FETCH_TIME > _BULK_CACHE_DURATION:
-        logger.info("Performing bulk price fetch...")
-        bulk_data = _fetch_from_coingecko()
-        if bulk_data:
-            _LAST_BULK_FETCH_TIME = current_time
-            # Update cache with all fetched prices
-            for sym, cg_id in SYMBOL_TO_COINGECKO_ID.items():
-                if cg_id in bulk_data and "usd" in bulk_data[cg_id]:
-                    price = Decimal(str(bulk_data[cg_id]["usd"]))
-                    _price_cache[sym] = (price, current_time)
-            
-            # Return requested price if available
-            if symbol_upper in _price_cache:
-                return _price_cache[symbol_upper][0]
-    
-    # If bulk fetch failed or symbol not in bulk, fetch single
-    logger.info(f"Fetching single price for {symbol}...")
-    data = _fetch_from_coingecko([symbol])
-    
-    if data and coingecko_id in data and "usd" in data[coingecko_id]:
-        price = Decimal(str(data[coingecko_id]["usd"]))
-        _price_cache[symbol_upper] = (price, current_time)
-        return price
-    
-    # If API call failed, return cached value even if expired, or 0
-    if symbol_upper in _price_cache:
-        price, _ = _price_cache[symbol_upper]
-        logger.warning(f"API failed, using expired cache for {symbol}: ${price}")
-        return price
-    
-    logger.error(f"Failed to fetch price for {symbol}")
-    return Decimal("0.0")
 
-# Optional: Batch function for fetching multiple prices at once
-def get_current_prices(symbols: list) -> dict:
-    """Fetch multiple prices efficiently in one API call."""
+    price = _price_cache.get_many([symbol_upper], _request_fetcher(max_wait)).get(symbol_upper)
+    if price is None:
+        logger.error(f"Failed to fetch price for {symbol}")
+        return Decimal("0.0")
+    return price
+
+def refresh_prices(symbols: list = None, max_wait: float = None) -> dict:
+    """
+    Fetch fresh prices for `symbols` (all mapped symbols by default) and store
+    them in the cache. Used by the background refresher so request handlers
+    only ever read from memory. Queues for the rate limiter up to `max_wait`
+    seconds (forever by default).
+    """
+    supported = _supported()
+    wanted = [s.upper() for s in symbols] if symbols else list(supported)
+    wanted = [s for s in wanted if s in supported]
+    if not wanted:
+        return {}
+    return _price_cache.fetch(wanted, partial(_fetch_prices, max_wait=max_wait))
+
+def get_price_age(symbol: str):
+    """Seconds since the cached price for `symbol` was fetched, or None if never fetched."""
+    cached = _price_cache.peek(symbol.upper())
+    if cached is None:
+        return None
+    return time.time() - cached[1]
+
+def get_price_ages(symbols: list = None) -> dict:
+    """Cached price and age for each symbol (every cached symbol by default)."""
     current_time = time.time()
+    wanted = [s.upper() for s in symbols] if symbols else _price_cache.symbols()
     result = {}
-    
-    # Check cache for each symbol
-    symbols_to_fetch = []
-    for symbol in symbols:
-        symbol_upper = symbol.upper()
-        if symbol_upper in _price_cache:
-            price, timestamp = _price_cache[symbol_upper]
-            if current_time - timestamp < _CACHE_DURATION:
-                result[symbol_upper] = price
-            else:
-                symbols_to_fetch.append(symbol)
+    for symbol in wanted:
+        cached = _price_cache.peek(symbol)
+        if cached is None:
+            result[symbol] = (None, None)
         else:
-            symbols_to_fetch.append(symbol)
-    
-    # Fetch remaining symbols
-    if symbols_to_fetch:
-        data = _fetch_from_coingecko(symbols_to_fetch)
-        
-        for symbol in symbols_to_fetch:
-            symbol_upper = symbol.upper()
-            coingecko_id = SYMBOL_TO_COINGECKO_ID.get(symbol_upper)
-            
-            if coingecko_id and data and coingecko_id in data and "usd" in data[coingecko_id]:
-                price = Decimal(str(data[coingecko_id]["usd"]))
-                result[symbol_upper] = price
-                _price_cache[symbol_upper] = (price, current_time)
-            else:
-                # Use cache even if expired, or 0
-                if symbol_upper in _price_cache:
-                    price, _ = _price_cache[symbol_upper]
-                    result[symbol_upper] = price
-                else:
-                    result[symbol_upper] = Decimal("0.0")
-    
-    return result
\ No newline at end of file
+            result[symbol] = (cached[0], current_time - cached[1])
+    return result
+
+def get_cache_stats() -> dict:
+    """Hit/miss/coalesced/stale-served counters of the price cache."""
+    return _price_cache.stats()
+
+def get_provider_stats() -> dict:
+    """Provider latency histograms, hedge win counts and outbound rate limiter state."""
+    stats = provider.stats()
+    stats["rate_limiter"] = _rate_limiter.stats() if _rate_limiter is not None else None
+    return stats
+
+# Optional: Batch function for fetching multiple prices at once
+def get_current_prices(symbols: list, max_wait: float = None) -> dict:
+    """Fetch multiple prices efficiently in one API call."""
+    wanted = [symbol.upper() for symbol in symbols]
+    prices = _price_cache.get_many(wanted, _request_fetcher(max_wait))
+    return {symbol: prices.get(symbol, Decimal("0.0")) for symbol in wanted}
@@ -0,0 +1,271 @@
+# app/services/market_providers.py
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+from app.core.fixed_point import PRICE_PLACES, quantize
+
+logger = logging.getLogger(__name__)
+
+# Map database symbols to CoinGecko IDs
+SYMBOL_TO_COINGECKO_ID = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "ADA": "cardano"
+    # Add more as needed
+}
+
+
+class ProviderError(Exception):
+    """
+    An upstream call failed. `status_code` is set for HTTP errors (e.g. 429),
+    `retry_after` (seconds) when the upstream asked us to back off.
+    """
+
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def is_throttle(self) -> bool:
+        """Rate limited or a server-side error: the caller should slow down."""
+        return self.status_code is not None and (self.status_code == 429 or self.status_code >= 500)
+
+
+class MarketDataProvider:
+    """
+    Source of spot prices. Implementations return {SYMBOL: Decimal price}
+    for the symbols they know and raise ProviderError when the call fails.
+    """
+
+    name = "base"
+
+    def supported_symbols(self) -> list:
+        raise NotImplementedError
+
+    def fetch_prices(self, symbols: list) -> dict:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"provider": self.name}
+
+    async def afetch_prices(self, symbols: list) -> dict:
+        # Providers without a native async client run the sync call in a thread
+        return await asyncio.to_thread(self.fetch_prices, symbols)
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        self.close()
+
+
+class CoinGeckoProvider(MarketDataProvider):
+    """
+    CoinGecko /simple/price over pooled keep-alive connections, so only the
+    first call (per pooled connection) pays for the TCP/TLS handshake.
+    """
+
+    name = "coingecko"
+
+    def __init__(self, base_url: str = None, symbol_map: dict = None, api_key: str = None,
+                 timeout: float = None, pool_size: int = None):
+        self.base_url = (base_url or settings.COINGECKO_BASE_URL).rstrip("/")
+        # extra symbols from settings or the caller extend the built-in map rather than replace it
+        self.symbol_map = {**SYMBOL_TO_COINGECKO_ID, **settings.COINGECKO_SYMBOL_MAP, **(symbol_map or {})}
+        self.timeout = timeout or settings.MARKET_DATA_TIMEOUT_SECONDS
+        self.pool_size = pool_size or settings.MARKET_DATA_POOL_SIZE
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "application/json"
+        }
+        api_key = api_key or settings.COINGECKO_API_KEY
+        if api_key:
+            self.headers["x-cg-demo-api-key"] = api_key
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._async_client = None
+
+    def supported_symbols(self) -> list:
+        return list(self.symbol_map)
+
+    def _params(self, symbols: list):
+        coin_ids = [self.symbol_map[s] for s in symbols if s in self.symbol_map]
+        if not coin_ids:
+            return None
+        return {
+            "ids": ",".join(coin_ids),
+            "vs_currencies": "usd",
+            "precision": "full"
+        }
+
+    def _parse(self, symbols: list, data: dict) -> dict:
+        prices = {}
+        for symbol in symbols:
+            coin_id = self.symbol_map.get(symbol)
+            if coin_id and coin_id in data and "usd" in data[coin_id]:
+                prices[symbol] = quantize(data[coin_id]["usd"], PRICE_PLACES)
+        return prices
+
+    def _check(self, status_code: int, text: str, headers):
+        if status_code == 429:
+            retry_after = headers.get("Retry-After")
+            retry_after = float(retry_after) if retry_after and retry_after.isdigit() else None
+            raise ProviderError("CoinGecko rate limit exceeded", status_code, retry_after)
+        if status_code != 200:
+            raise ProviderError(f"CoinGecko API error: {status_code} - {text[:200]}", status_code)
+
+    def fetch_prices(self, symbols: list) -> dict:
+        params = self._params(symbols)
+        if params is None:
+            return {}
+        try:
+            response = self.session.get(f"{self.base_url}/simple/price", params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ProviderError(f"Error fetching from CoinGecko: {e}")
+        self._check(response.status_code, response.text, response.headers)
+        return self._parse(symbols, response.json())
+
+    async def afetch_prices(self, symbols: list) -> dict:
+        try:
+            import httpx
+        except ImportError:
+            return await super().afetch_prices(symbols)
+
+        params = self._params(symbols)
+        if params is None:
+            return {}
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+        try:
+            response = await self._async_client.get(f"{self.base_url}/simple/price", params=params)
+        except httpx.HTTPError as e:
+            raise ProviderError(f"Error fetching from CoinGecko: {e}")
+        self._check(response.status_code, response.text, response.headers)
+        return self._parse(symbols, response.json())
+
+    def close(self):
+        self.session.close()
+
+    async def aclose(self):
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Offline provider that replays recorded frames from a JSONL fixture, one
+    frame per fetch, looping at the end. Each line looks like
+    {"ts": 1700000000.0, "prices": {"BTC": "43000.5", "ETH": "2250.1"}}
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.MARKET_DATA_REPLAY_PATH
+        with open(self.path) as f:
+            self.frames = [
+                {symbol.upper(): quantize(price, PRICE_PLACES) for symbol, price in json.loads(line)["prices"].items()}
+                for line in f if line.strip()
+            ]
+        if not self.frames:
+            raise ValueError(f"No price frames in {self.path}")
+        self._position = 0
+        self._lock = threading.Lock()
+        self._symbols = sorted({symbol for frame in self.frames for symbol in frame})
+
+    def supported_symbols(self) -> list:
+        return list(self._symbols)
+
+    def fetch_prices(self, symbols: list) -> dict:
+        with self._lock:
+            frame = self.frames[self._position]
+            self._position = (self._position + 1) % len(self.frames)
+        return {symbol: frame[symbol] for symbol in symbols if symbol in frame}
+
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps another provider and appends every successful fetch to a JSONL fixture."""
+
+    def __init__(self, inner: MarketDataProvider, path: str):
+        self.inner = inner
+        self.path = path
+        self.name = inner.name
+        self._lock = threading.Lock()
+
+    def supported_symbols(self) -> list:
+        return self.inner.supported_symbols()
+
+    def _record(self, prices: dict):
+        if not prices:
+            return
+        line = json.dumps({"ts": time.time(), "prices": {s: str(p) for s, p in prices.items()}})
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+    def fetch_prices(self, symbols: list) -> dict:
+        prices = self.inner.fetch_prices(symbols)
+        self._record(prices)
+        return prices
+
+    def stats(self) -> dict:
+        return self.inner.stats()
+
+    async def afetch_prices(self, symbols: list) -> dict:
+        prices = await self.inner.afetch_prices(symbols)
+        self._record(prices)
+        return prices
+
+    def close(self):
+        self.inner.close()
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+def _build_provider(name: str, base_url: str = None, replay_path: str = None) -> MarketDataProvider:
+    if name == "coingecko":
+        return CoinGeckoProvider(base_url=base_url)
+    if name == "replay":
+        return ReplayProvider(replay_path)
+    raise ValueError(f"Unknown market data provider: {name}")
+
+
+def create_provider(name: str = None) -> MarketDataProvider:
+    """
+    Build the provider named by MARKET_DATA_PROVIDER. With
+    MARKET_DATA_SECONDARY_PROVIDER set, requests are hedged against it;
+    with MARKET_DATA_RECORD_PATH set, every fetch is recorded.
+    """
+    provider = _build_provider(name or settings.MARKET_DATA_PROVIDER)
+
+    if settings.MARKET_DATA_SECONDARY_PROVIDER:
+        from app.services.hedging import HedgedProvider
+
+        secondary = _build_provider(
+            settings.MARKET_DATA_SECONDARY_PROVIDER,
+            base_url=settings.MARKET_DATA_SECONDARY_BASE_URL,
+            replay_path=settings.MARKET_DATA_SECONDARY_REPLAY_PATH
+        )
+        provider = HedgedProvider(provider, secondary)
+
+    if settings.MARKET_DATA_RECORD_PATH:
+        provider = RecordingProvider(provider, settings.MARKET_DATA_RECORD_PATH)
+    return provider
@@ -0,0 +1,170 @@
+# app/services/order_book.py
+"""
+Resting limit/stop orders. The database holds the orders; this module keeps
+them mirrored in per-symbol trigger heaps so each price tick only touches
+the orders it actually crosses: O(log n) per fill instead of a scan of
+every open order.
+
+Orders are evaluated on the worker that refreshes prices. It picks up
+orders created on any worker by id (one indexed query per tick, over a
+trailing window so orders that commit out of id order aren't missed), and every
+fill first claims the row with a conditional UPDATE, so a cancel that
+races a fill, or two workers evaluating the same order, can't fill twice.
+"""
+import heapq
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.asset import Asset
+from app.models.order import Order
+from app.services import trade_service
+from app.services.id_watermark import IdWatermark
+from app.services.trade_service import TradeError
+
+logger = logging.getLogger(__name__)
+
+
+def fires_below(side: str, type_: str) -> bool:
+    """Limit buys and stop sells trigger when the price falls to the trigger; the rest when it rises to it."""
+    return (side == "buy") == (type_ == "limit")
+
+
+class OrderBook:
+    """
+    Two heaps per symbol: orders that fire at or below their trigger (a
+    max-heap, highest trigger first) and orders that fire at or above it (a
+    min-heap). Removed orders are dropped lazily when they reach the top.
+    Thread-safe.
+    """
+
+    def __init__(self):
+        self._below = defaultdict(list)  # symbol -> [(-trigger, order_id)]
+        self._above = defaultdict(list)  # symbol -> [(trigger, order_id)]
+        self._live = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._live)
+
+    def add(self, order_id: int, symbol: str, below: bool, trigger: Decimal):
+        with self._lock:
+            if order_id in self._live:
+                return
+            self._live.add(order_id)
+            if below:
+                heapq.heappush(self._below[symbol], (-trigger, order_id))
+            else:
+                heapq.heappush(self._above[symbol], (trigger, order_id))
+
+    def discard(self, order_id: int):
+        with self._lock:
+            self._live.discard(order_id)
+
+    def crossed(self, symbol: str, price: Decimal) -> list:
+        """Pop and return the ids of every order on `symbol` triggered by `price`."""
+        triggered = []
+        with self._lock:
+            below = self._below.get(symbol)
+            while below and -below[0][0] >= price:
+                _, order_id = heapq.heappop(below)
+                if order_id in self._live:
+                    self._live.discard(order_id)
+                    triggered.append(order_id)
+            above = self._above.get(symbol)
+            while above and above[0][0] <= price:
+                _, order_id = heapq.heappop(above)
+                if order_id in self._live:
+                    self._live.discard(order_id)
+                    triggered.append(order_id)
+        return triggered
+
+
+class OrderEngine:
+    def __init__(self):
+        self.book = OrderBook()
+        self._watermark = IdWatermark(settings.ENGINE_SYNC_LOOKBACK_SECONDS)
+        self._stats = {"filled": 0, "rejected": 0, "skipped": 0}
+
+    def sync(self, db):
+        """Add open orders created since the last sync (on any worker) to the book."""
+        rows = db.execute(
+            select(Order.id, Asset.symbol, Order.side, Order.type, Order.trigger_price)
+            .join(Asset, Order.asset_id == Asset.id)
+            .where(Order.status == "open", Order.id > self._watermark.floor())
+            .order_by(Order.id)
+        ).all()
+        fresh = self._watermark.new([row.id for row in rows])
+        for order_id, symbol, side, type_, trigger in rows:
+            if order_id in fresh:
+                self.book.add(order_id, symbol.upper(), fires_below(side, type_), trigger)
+
+    def on_prices(self, prices: dict) -> int:
+        """Fill every order crossed by this tick's prices. Returns how many filled."""
+        db = SessionLocal()
+        try:
+            self.sync(db)
+        finally:
+            db.close()
+
+        filled = 0
+        for symbol, price in prices.items():
+            if price is None:
+                continue
+            for order_id in self.book.crossed(symbol.upper(), price):
+                filled += self.fill(order_id, price)
+        return filled
+
+    def fill(self, order_id: int, price: Decimal) -> bool:
+        db = SessionLocal()
+        try:
+            # Claim the order; a concurrent cancel or another worker's fill wins otherwise
+            claimed = db.execute(
+                update(Order)
+                .where(Order.id == order_id, Order.status == "open")
+                .values(status="filled", filled_at=datetime.utcnow(), fill_price=price)
+                .returning(Order.user_id, Order.asset_id, Order.side, Order.quantity)
+            ).first()
+            if claimed is None:
+                self._stats["skipped"] += 1
+                return False
+
+            user_id, asset_id, side, quantity = claimed
+            execute = trade_service.buy if side == "buy" else trade_service.sell
+            try:
+                result = execute(db, user_id, asset_id, quantity, price)
+            except TradeError as e:
+                db.rollback()
+                db.execute(
+                    update(Order)
+                    .where(Order.id == order_id, Order.status == "open")
+                    .values(status="rejected", error=e.message)
+                )
+                db.commit()
+                self._stats["rejected"] += 1
+                return False
+
+            db.execute(update(Order).where(Order.id == order_id).values(transaction_id=result["transaction_id"]))
+            db.commit()
+            self._stats["filled"] += 1
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Filling order {order_id} failed: {e}")
+            # still open in the database: the next sync puts it back in the book
+            self._watermark.rewind(order_id)
+            return False
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return dict(self._stats, resting=len(self.book))
+
+
+order_engine = OrderEngine()
@@ -1,52 +1,66 @@
 # app/services/portfolio_service.py
+from decimal import Decimal
 from sqlalchemy.orm import Session
+from app.models.asset import Asset
 from app.models.portfolio_entry import PortfolioEntry
-from app.models.transaction import Transaction
+from app.models.wallet import Wallet
+from app.services.market_data import get_current_prices
 
-def buy_asset(db: Session, user_id: int, asset_id: int, quantity: float, price: float):
-    entry = db.query(PortfolioEntry).filter_by(user_id=user_id, asset_id=asset_id).first()
-    if entry:
-        # update average_buy_price
-        total_cost = entry.average_buy_price * entry.quantity + price * quantity
-        entry.quantity += quantity
-        entry.average_buy_price = total_cost / entry.quantity
-    else:
-        entry = PortfolioEntry(user_id=user_id, asset_id=asset_id, quantity=quantity, average_buy_price=price)
-        db.add(entry)
-
-    db.commit()
-    db.refresh(entry)
-
-    # log transaction
-    transaction = Transaction(
-        user_id=user_id,
-        portfolio_entry_id=entry.id,
-        type="buy",
-        quantity=quantity,
-        price=price
+def get_portfolio_summary(db: Session, user_id: int, prices: dict = None) -> dict:
+    """
+    Value every position of `user_id` at current prices: one entries+assets
+    join, one wallet lookup and one batch price lookup. Callers that can't
+    block on the lookup pass `prices` (symbol -> price) in.
+    """
+    rows = (
+        db.query(PortfolioEntry, Asset)
+        .join(Asset, PortfolioEntry.asset_id == Asset.id)
+        .filter(PortfolioEntry.user_id == user_id)
+        .all()
     )
-    db.add(transaction)
-    db.commit()
-    return entry
+    wallet = db.query(Wallet).filter(Wallet.user_id == user_id).first()
+    if prices is None:
+        prices = get_current_prices([asset.symbol for _, asset in rows]) if rows else {}
 
-def sell_asset(db: Session, user_id: int, asset_id: int, quantity: float, price: float):
-    entry = db.query(PortfolioEntry).filter_by(user_id=user_id, asset_id=asset_id).first()
-    if not entry or entry.quantity < quantity:
-        raise ValueError("Not enough assets to sell")
+    positions = []
+    total_cost = Decimal("0")
+    total_value = Decimal("0")
+    for entry, asset in rows:
+        quantity = entry.quantity
+        average_price = entry.average_buy_price
+        current_price = prices.get(asset.symbol.upper(), Decimal("0"))
+        cost_basis = quantity * average_price
+        market_value = quantity * current_price
+        total_cost += cost_basis
+        total_value += market_value
+        positions.append({
+            "entry_id": entry.id,
+            "asset_id": asset.id,
+            "symbol": asset.symbol,
+            "name": asset.name,
+            "quantity": quantity,
+            "average_buy_price": average_price,
+            "current_price": current_price,
+            "cost_basis": cost_basis,
+            "market_value": market_value,
+            "unrealized_pnl": market_value - cost_basis,
+            "unrealized_pnl_pct": _pct(market_value - cost_basis, cost_basis),
+        })
 
-    entry.quantity -= quantity
-    if entry.quantity == 0:
-        db.delete(entry)
-    db.commit()
+    for position in positions:
+        position["weight"] = _pct(position["market_value"], total_value)
 
-    # log transaction
-    transaction = Transaction(
-        user_id=user_id,
-        portfolio_entry_id=entry.id,
-        type="sell",
-        quantity=quantity,
-        price=price
-    )
-    db.add(transaction)
-    db.commit()
-    return entry
+    cash = wallet.balance if wallet else Decimal("0")
+    return {
+        "positions": positions,
+        "total_cost_basis": total_cost,
+        "total_market_value": total_value,
+        "total_unrealized_pnl": total_value - total_cost,
+        "total_unrealized_pnl_pct": _pct(total_value - total_cost, total_cost),
+        "cash_balance": cash,
+        "net_asset_value": total_value + cash,
+        "currency": wallet.currency if wallet else "USD",
+    }
+
+def _pct(part: Decimal, whole: Decimal) -> Decimal:
+    return part / whole * 100 if whole else Decimal("0")
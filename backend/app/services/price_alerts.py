@@ -0,0 +1,268 @@
+# app/services/price_alerts.py
+"""
+Price alerts. Active alerts are kept in memory as sorted threshold arrays,
+one per symbol and direction, so a tick finds exactly the alerts between
+the previous and the new price with two bisects and slices them out:
+O(log n + fired) per symbol, regardless of how many alerts are resting.
+
+The worker that refreshes prices evaluates alerts and writes fired ones
+to the alert_outbox table. Every worker then polls the outbox by id and
+pushes new rows to the live streams of its connected users.
+"""
+import logging
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import func, insert, select, update
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.asset import Asset
+from app.models.price_alert import AlertNotification, PriceAlert
+from app.services.id_watermark import IdWatermark
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+COMPACT_AFTER = 10000  # dead alerts tolerated before the arrays are rebuilt
+
+
+class ThresholdIndex:
+    """Alert thresholds of one symbol in ascending order, with the alert ids alongside."""
+
+    def __init__(self):
+        self.thresholds = array("d")
+        self.ids = array("q")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, threshold: float, alert_id: int):
+        i = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(i, threshold)
+        self.ids.insert(i, alert_id)
+
+    def load(self, pairs: list):
+        """Bulk add (threshold, alert_id) pairs with one sort instead of many inserts."""
+        merged = sorted(list(zip(self.thresholds, self.ids)) + pairs)
+        self.thresholds = array("d", (t for t, _ in merged))
+        self.ids = array("q", (i for _, i in merged))
+
+    def pop_range(self, lo: int, hi: int) -> array:
+        ids = self.ids[lo:hi]
+        del self.thresholds[lo:hi]
+        del self.ids[lo:hi]
+        return ids
+
+    def pop_rising(self, old: float, new: float) -> array:
+        """Alerts with old < threshold <= new."""
+        return self.pop_range(bisect_right(self.thresholds, old), bisect_right(self.thresholds, new))
+
+    def pop_falling(self, old: float, new: float) -> array:
+        """Alerts with new <= threshold < old."""
+        return self.pop_range(bisect_left(self.thresholds, new), bisect_left(self.thresholds, old))
+
+    def compact(self, dead: dict):
+        keep = [i for i, alert_id in enumerate(self.ids) if abs(alert_id) not in dead]
+        self.thresholds = array("d", (self.thresholds[i] for i in keep))
+        self.ids = array("q", (self.ids[i] for i in keep))
+
+
+class AlertEngine:
+    """
+    A 'cross' alert sits in both arrays of its symbol under its negated id,
+    so whichever copy fires first marks the other one dead. Cancelled alerts
+    are marked dead too. Dead copies are skipped and forgotten as ticks pop
+    them; the arrays are only rebuilt if dead copies pile up out of reach.
+    """
+
+    def __init__(self):
+        self._rising = defaultdict(ThresholdIndex)   # 'above' and 'cross' alerts
+        self._falling = defaultdict(ThresholdIndex)  # 'below' and 'cross' alerts
+        self._last_price = {}
+        self._dead = {}  # alert_id -> copies still in the arrays
+        self._entries = 0
+        self._watermark = IdWatermark(settings.ENGINE_SYNC_LOOKBACK_SECONDS)
+        self._outbox_id = None
+        self._lock = threading.Lock()
+        self._stats = {"fired": 0, "ticks": 0, "compactions": 0}
+
+    def add(self, alert_id: int, symbol: str, direction: str, threshold: float):
+        self.load([(alert_id, symbol, direction, threshold)])
+
+    def load(self, alerts):
+        """Add (alert_id, symbol, direction, threshold) rows, sorting each touched array once."""
+        rising, falling = defaultdict(list), defaultdict(list)
+        for alert_id, symbol, direction, threshold in alerts:
+            key = -alert_id if direction == "cross" else alert_id
+            if direction != "below":
+                rising[symbol].append((threshold, key))
+            if direction != "above":
+                falling[symbol].append((threshold, key))
+        with self._lock:
+            for indexes, batch in ((self._rising, rising), (self._falling, falling)):
+                for symbol, pairs in batch.items():
+                    if len(pairs) == 1:
+                        indexes[symbol].add(*pairs[0])
+                    else:
+                        indexes[symbol].load(pairs)
+                    self._entries += len(pairs)
+
+    def discard(self, alert_id: int, direction: str):
+        """Forget a cancelled alert."""
+        with self._lock:
+            if not self._watermark.loaded(alert_id):
+                return  # cancelled before it was loaded
+            self._dead[alert_id] = 2 if direction == "cross" else 1
+
+    def evaluate(self, symbol: str, price: float) -> list:
+        """Ids of alerts on `symbol` crossed by moving from the last seen price to `price`."""
+        with self._lock:
+            old = self._last_price.get(symbol)
+            self._last_price[symbol] = price
+            if old is None or old == price:
+                return []
+            if price > old:
+                index = self._rising.get(symbol)
+                crossed = index.pop_rising(old, price) if index else ()
+            else:
+                index = self._falling.get(symbol)
+                crossed = index.pop_falling(old, price) if index else ()
+            self._entries -= len(crossed)
+
+            fired = []
+            dead = self._dead
+            for key in crossed:
+                alert_id = abs(key)
+                copies = dead.get(alert_id)
+                if copies is None:
+                    fired.append(alert_id)
+                    if key < 0:
+                        dead[alert_id] = 1  # the other direction's copy
+                elif copies == 1:
+                    del dead[alert_id]
+                else:
+                    dead[alert_id] = copies - 1
+            if len(dead) > COMPACT_AFTER and len(dead) * 4 > self._entries:
+                self._compact()
+            return fired
+
+    def _compact(self):
+        for indexes in (self._rising, self._falling):
+            for index in indexes.values():
+                index.compact(self._dead)
+        self._entries = sum(len(index) for indexes in (self._rising, self._falling) for index in indexes.values())
+        self._dead.clear()
+        self._stats["compactions"] += 1
+
+    def sync(self, db):
+        """Load alerts created since the last sync, on any worker (see app/services/id_watermark.py)."""
+        rows = db.execute(
+            select(PriceAlert.id, Asset.symbol, PriceAlert.direction, PriceAlert.threshold)
+            .join(Asset, PriceAlert.asset_id == Asset.id)
+            .where(PriceAlert.status == "active", PriceAlert.id > self._watermark.floor())
+            .order_by(PriceAlert.id)
+            .execution_options(yield_per=10000)
+        )
+        for chunk in rows.partitions():
+            fresh = self._watermark.new([row.id for row in chunk])
+            self.load([
+                (alert_id, symbol.upper(), direction, threshold)
+                for alert_id, symbol, direction, threshold in chunk if alert_id in fresh
+            ])
+
+    def on_prices(self, prices: dict) -> int:
+        """Fire every alert crossed by this tick and write it to the outbox. Returns how many fired."""
+        db = SessionLocal()
+        try:
+            self.sync(db)
+            fired = []
+            for symbol, price in prices.items():
+                if price is None:
+                    continue
+                symbol = symbol.upper()
+                previous = self._last_price.get(symbol)
+                for alert_id in self.evaluate(symbol, float(price)):
+                    fired.append((alert_id, symbol, previous, float(price)))
+            self._stats["ticks"] += 1
+            if fired:
+                self._record(db, fired)
+            return len(fired)
+        finally:
+            db.close()
+
+    def _record(self, db, fired: list):
+        now = datetime.utcnow()
+        for i in range(0, len(fired), CHUNK_SIZE):
+            chunk = fired[i:i + CHUNK_SIZE]
+            by_id = {alert_id: (symbol, previous, price) for alert_id, symbol, previous, price in chunk}
+            notifications = []
+            # an alert cancelled since it was loaded stays cancelled
+            for alert_id, user_id, threshold, direction in db.execute(
+                update(PriceAlert)
+                .where(PriceAlert.id.in_(list(by_id)), PriceAlert.status == "active")
+                .values(status="fired", fired_at=now)
+                .returning(PriceAlert.id, PriceAlert.user_id, PriceAlert.threshold, PriceAlert.direction)
+            ):
+                symbol, previous, price = by_id[alert_id]
+                notifications.append({
+                    "alert_id": alert_id,
+                    "user_id": user_id,
+                    "symbol": symbol,
+                    "threshold": threshold,
+                    "direction": direction,
+                    "previous_price": previous,
+                    "price": price,
+                    "created_at": now,
+                })
+            if notifications:
+                db.execute(
+                    update(PriceAlert),
+                    [{"id": n["alert_id"], "fired_price": n["price"]} for n in notifications],
+                )
+                db.execute(insert(AlertNotification), notifications)
+            db.commit()
+            self._stats["fired"] += len(notifications)
+
+    def poll_outbox(self) -> list:
+        """Outbox rows written (by any worker) since the last poll. The first poll only sets the mark."""
+        db = SessionLocal()
+        try:
+            if self._outbox_id is None:
+                self._outbox_id = db.query(func.max(AlertNotification.id)).scalar() or 0
+                return []
+            rows = (
+                db.query(AlertNotification)
+                .filter(AlertNotification.id > self._outbox_id)
+                .order_by(AlertNotification.id)
+                .limit(CHUNK_SIZE)
+                .all()
+            )
+            if rows:
+                self._outbox_id = rows[-1].id
+            return [notification_payload(row) for row in rows]
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return dict(self._stats, indexed_entries=self._entries, dead_alerts=len(self._dead))
+
+
+def notification_payload(row: AlertNotification) -> dict:
+    return {
+        "id": row.id,
+        "alert_id": row.alert_id,
+        "user_id": row.user_id,
+        "symbol": row.symbol,
+        "threshold": row.threshold,
+        "direction": row.direction,
+        "previous_price": row.previous_price,
+        "price": row.price,
+        "created_at": row.created_at,
+    }
+
+
+alert_engine = AlertEngine()
@@ -0,0 +1,152 @@
+# app/services/price_cache.py
+import logging
+import threading
+import time
+
+from app.services.price_cache_backends import MemoryBackend
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One in-progress fetch that concurrent callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = {}
+
+
+class PriceCache:
+    """
+    Thread-safe price cache with single-flight fetches and stale-while-revalidate.
+
+    Each entry has a soft and a hard TTL:
+      - younger than soft TTL: served as a hit
+      - between soft and hard TTL: served immediately (stale) while one
+        background refresh runs
+      - older than hard TTL or missing: the caller waits for a fetch
+
+    Concurrent misses for the same symbol set share a single fetch.
+    Entries live in a pluggable backend (see price_cache_backends) so several
+    worker processes can share one store.
+    """
+
+    def __init__(self, soft_ttl: float, hard_ttl: float, backend=None):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.backend = backend or MemoryBackend()
+        self._inflight = {}  # frozenset(symbols) -> _Flight
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "stale_served": 0, "fetches": 0}
+
+    def set(self, symbol: str, price, fetched_at: float = None, soft_ttl: float = None, hard_ttl: float = None):
+        self.set_many({symbol: price}, fetched_at, soft_ttl, hard_ttl)
+
+    def set_many(self, prices: dict, fetched_at: float = None, soft_ttl: float = None, hard_ttl: float = None):
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        soft_ttl = soft_ttl if soft_ttl is not None else self.soft_ttl
+        hard_ttl = hard_ttl if hard_ttl is not None else self.hard_ttl
+        self.backend.set_many({
+            symbol: (price, fetched_at, soft_ttl, hard_ttl)
+            for symbol, price in prices.items()
+        })
+
+    def peek(self, symbol: str):
+        """(price, fetched_at) without touching counters or fetching, or None."""
+        entry = self.backend.get_many([symbol]).get(symbol)
+        return (entry[0], entry[1]) if entry else None
+
+    def symbols(self) -> list:
+        return self.backend.symbols()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["inflight"] = len(self._inflight)
+        stats["entries"] = len(self.backend.symbols())
+        stats["backend"] = self.backend.name
+        return stats
+
+    def get_many(self, symbols: list, fetch) -> dict:
+        """
+        Prices for `symbols`. `fetch(symbols) -> {symbol: price}` is only
+        called for entries past their soft TTL, at most once per symbol set
+        at a time. Symbols that cannot be priced are left out.
+        """
+        entries = self.backend.get_many(symbols)
+        now = time.time()
+        result = {}
+        missing = []
+        stale = []
+        with self._lock:
+            for symbol in symbols:
+                entry = entries.get(symbol)
+                if entry is None:
+                    self._stats["misses"] += 1
+                    missing.append(symbol)
+                    continue
+                price, fetched_at, soft_ttl, hard_ttl = entry
+                age = now - fetched_at
+                if age < soft_ttl:
+                    self._stats["hits"] += 1
+                    result[symbol] = price
+                elif age < hard_ttl:
+                    self._stats["stale_served"] += 1
+                    result[symbol] = price
+                    stale.append(symbol)
+                else:
+                    self._stats["misses"] += 1
+                    missing.append(symbol)
+
+        if stale:
+            self._revalidate_in_background(stale, fetch)
+
+        if missing:
+            fetched = self.fetch(missing, fetch)
+            for symbol in missing:
+                if symbol in fetched:
+                    result[symbol] = fetched[symbol]
+                else:
+                    # Upstream failed: an expired value beats nothing
+                    cached = self.peek(symbol)
+                    if cached is not None:
+                        logger.warning(f"API failed, using expired cache for {symbol}: ${cached[0]}")
+                        result[symbol] = cached[0]
+        return result
+
+    def fetch(self, symbols: list, fetch) -> dict:
+        """Run `fetch` for `symbols`, joining an identical in-flight fetch if there is one."""
+        key = frozenset(symbols)
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self._stats["fetches"] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            return flight.result
+
+        try:
+            fetched = fetch(list(key)) or {}
+            if fetched:
+                self.set_many(fetched)
+            flight.result = fetched
+        except Exception as e:
+            logger.error(f"Price fetch failed: {e}")
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+        return flight.result
+
+    def _revalidate_in_background(self, symbols: list, fetch):
+        with self._lock:
+            if frozenset(symbols) in self._inflight:
+                return
+        threading.Thread(target=self.fetch, args=(symbols, fetch), daemon=True).start()
@@ -0,0 +1,101 @@
+# app/services/price_cache_backends.py
+import os
+import sqlite3
+import threading
+from decimal import Decimal
+
+
+class MemoryBackend:
+    """Per-process dict storage. Each worker keeps (and refreshes) its own copy."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._entries = {}  # symbol -> (price, fetched_at, soft_ttl, hard_ttl)
+
+    def get_many(self, symbols: list) -> dict:
+        entries = self._entries
+        return {symbol: entries[symbol] for symbol in symbols if symbol in entries}
+
+    def set_many(self, entries: dict):
+        self._entries.update(entries)
+
+    def symbols(self) -> list:
+        return list(self._entries)
+
+
+class SQLiteBackend:
+    """
+    Host-local storage shared by every worker process through one SQLite file.
+
+    Reads are a local file lookup (no network hop); WAL mode lets readers run
+    while the elected refresher writes. Prices are stored as text so Decimal
+    values round-trip exactly.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            " symbol TEXT PRIMARY KEY,"
+            " price TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " soft_ttl REAL NOT NULL,"
+            " hard_ttl REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads, keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, symbols: list) -> dict:
+        if not symbols:
+            return {}
+        placeholders = ",".join("?" * len(symbols))
+        rows = self._conn().execute(
+            f"SELECT symbol, price, fetched_at, soft_ttl, hard_ttl FROM prices WHERE symbol IN ({placeholders})",
+            list(symbols)
+        ).fetchall()
+        return {
+            symbol: (Decimal(price), fetched_at, soft_ttl, hard_ttl)
+            for symbol, price, fetched_at, soft_ttl, hard_ttl in rows
+        }
+
+    def set_many(self, entries: dict):
+        if not entries:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO prices (symbol, price, fetched_at, soft_ttl, hard_ttl) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(symbol) DO UPDATE SET price = excluded.price, fetched_at = excluded.fetched_at, "
+                "soft_ttl = excluded.soft_ttl, hard_ttl = excluded.hard_ttl",
+                [
+                    (symbol, str(price), fetched_at, soft_ttl, hard_ttl)
+                    for symbol, (price, fetched_at, soft_ttl, hard_ttl) in entries.items()
+                ]
+            )
+
+    def symbols(self) -> list:
+        return [symbol for (symbol,) in self._conn().execute("SELECT symbol FROM prices").fetchall()]
+
+
+def create_backend(kind: str, path: str = None):
+    """Build the backend named by PRICE_CACHE_BACKEND ('memory' or 'sqlite')."""
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(path)
+    raise ValueError(f"Unknown price cache backend: {kind}")
@@ -0,0 +1,202 @@
+# app/services/price_history.py
+import logging
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Candle widths in seconds; "tick" keeps every refreshed price
+INTERVALS = {"1m": 60, "1h": 3600, "1d": 86400}
+TICK_FIELDS = ("time", "price")
+CANDLE_FIELDS = ("time", "open", "high", "low", "close")
+
+
+class _Series:
+    """
+    Append-only columns of float64 kept as contiguous `array('d')`s and
+    persisted as fixed-size little-endian records in one file. The last
+    record can be rewritten in place (an open candle being updated).
+
+    Other processes may append to the file (only the worker holding the
+    refresher's history lock writes); `sync()` picks up records written
+    since the last read.
+    """
+
+    def __init__(self, path: str, fields: tuple):
+        self.path = path
+        self.fields = fields
+        self.width = len(fields)
+        self.record_size = 8 * self.width
+        self.columns = [array("d") for _ in fields]
+        self._file = None
+        self._lock = threading.RLock()
+        self.sync()
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def sync(self):
+        """Load records appended (or a last record rewritten) by another process."""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                return
+            records = size // self.record_size
+            known = len(self)
+            if records == 0:
+                return
+            # Re-read the last known record too, it may be an updated open candle
+            start = max(0, known - 1)
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                tail = array("d")
+                tail.frombytes(mm[start * self.record_size:records * self.record_size])
+            for column in self.columns:
+                del column[start:]
+            for i, column in enumerate(self.columns):
+                column.extend(tail[i::self.width])
+
+    def _writer(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            open(self.path, "ab").close()  # create, but write with r+b so the last record can be rewritten
+            self._file = open(self.path, "r+b")
+        return self._file
+
+    def append(self, values: tuple):
+        with self._lock:
+            for column, value in zip(self.columns, values):
+                column.append(value)
+            f = self._writer()
+            f.seek(0, os.SEEK_END)
+            f.write(array("d", values).tobytes())
+            f.flush()
+
+    def replace_last(self, values: tuple):
+        with self._lock:
+            for column, value in zip(self.columns, values):
+                column[-1] = value
+            f = self._writer()
+            f.seek(-self.record_size, os.SEEK_END)
+            f.write(array("d", values).tobytes())
+            f.flush()
+
+    def last(self):
+        with self._lock:
+            if not len(self):
+                return None
+            return tuple(column[-1] for column in self.columns)
+
+    def slice(self, start: float, end: float) -> list:
+        """Columns for rows with start <= time <= end, located by binary search on time."""
+        with self._lock:
+            times = self.columns[0]
+            lo = bisect_left(times, start)
+            hi = bisect_right(times, end)
+            return [column[lo:hi] for column in self.columns]
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class PriceHistoryStore:
+    """
+    Per-symbol tick series plus 1m/1h/1d OHLC candles, one memory-mappable
+    file per series under `directory`. Range queries are two binary
+    searches on the time column plus optional downsampling.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _get(self, symbol: str, interval: str) -> _Series:
+        key = (symbol, interval)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    fields = TICK_FIELDS if interval == "tick" else CANDLE_FIELDS
+                    path = os.path.join(self.directory, f"{symbol}.{interval}")
+                    series = _Series(path, fields)
+                    self._series[key] = series
+        return series
+
+    def record(self, symbol: str, price: float, ts: float):
+        """Append one tick and fold it into every candle interval."""
+        ticks = self._get(symbol, "tick")
+        ticks.sync()  # another worker may have been the writer before us
+        last = ticks.last()
+        if last is not None and ts <= last[0]:
+            return  # out of order or already recorded
+        ticks.append((ts, price))
+
+        for interval, width in INTERVALS.items():
+            candles = self._get(symbol, interval)
+            candles.sync()
+            bucket = ts - ts % width
+            current = candles.last()
+            if current is not None and current[0] == bucket:
+                _, open_, high, low, _ = current
+                candles.replace_last((bucket, open_, max(high, price), min(low, price), price))
+            else:
+                candles.append((bucket, price, price, price, price))
+
+    def record_many(self, prices: dict, ts: float):
+        for symbol, price in prices.items():
+            if price is not None:
+                self.record(symbol, float(price), ts)
+
+    def query(self, symbol: str, interval: str, start: float, end: float, max_points: int = None) -> list:
+        """
+        Rows of (time, open, high, low, close) between `start` and `end`.
+        Ticks come back as flat candles. When more than `max_points` rows
+        match, consecutive rows are merged into OHLC buckets.
+        """
+        if interval != "tick" and interval not in INTERVALS:
+            raise ValueError(f"Unknown interval: {interval}")
+        series = self._get(symbol, interval)
+        series.sync()
+        columns = series.slice(start, end)
+        if interval == "tick":
+            times, prices = columns
+            columns = [times, prices, prices, prices, prices]
+        return _downsample(columns, max_points)
+
+    def closes(self, symbol: str, interval: str, start: float, end: float):
+        """(times, closes) arrays for analytics, without downsampling."""
+        series = self._get(symbol, interval)
+        series.sync()
+        columns = series.slice(start, end)
+        return columns[0], columns[-1]
+
+    def close(self):
+        for series in self._series.values():
+            series.close()
+
+
+def _downsample(columns: list, max_points: int = None) -> list:
+    times, opens, highs, lows, closes = columns
+    n = len(times)
+    if not max_points or n <= max_points:
+        return list(zip(times, opens, highs, lows, closes))
+
+    step = -(-n // max_points)  # ceil
+    rows = []
+    for lo in range(0, n, step):
+        hi = min(lo + step, n)
+        rows.append((times[lo], opens[lo], max(highs[lo:hi]), min(lows[lo:hi]), closes[hi - 1]))
+    return rows
+
+
+price_history = PriceHistoryStore(settings.PRICE_HISTORY_DIR)
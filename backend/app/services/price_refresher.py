@@ -0,0 +1,114 @@
+# app/services/price_refresher.py
+import asyncio
+import logging
+import os
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.asset import Asset
+from app.services import market_data
+from app.services.leader import LeaderLock
+from app.services.order_book import order_engine
+from app.services.price_alerts import alert_engine
+from app.services.price_stream import price_broadcaster
+from app.services.price_history import price_history
+
+logger = logging.getLogger(__name__)
+
+
+class PriceRefresher:
+    """
+    Background loop that keeps the market data cache warm so request
+    handlers never wait on CoinGecko. Started/stopped from the app lifespan.
+
+    With a shared cache backend only the worker holding the leader lock
+    refreshes; the others just read what it writes. With the per-worker
+    memory cache every worker refreshes, but only the holder of the history
+    lock appends to the price history files, which all workers share.
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or settings.PRICE_REFRESH_INTERVAL_SECONDS
+        self._task = None
+        self._symbols = []
+        self._leader = LeaderLock(settings.PRICE_CACHE_PATH + ".lock") if market_data.is_shared_cache() else None
+        self._history_writer = LeaderLock(os.path.join(settings.PRICE_HISTORY_DIR, "writer.lock"))
+
+    def should_refresh(self) -> bool:
+        return self._leader is None or self._leader.try_acquire()
+
+    def tracked_symbols(self) -> list:
+        """Every symbol the provider knows plus every symbol listed in the assets table."""
+        symbols = set(market_data.supported_symbols())
+        db = SessionLocal()
+        try:
+            symbols.update(symbol.upper() for (symbol,) in db.query(Asset.symbol).all())
+        except Exception as e:
+            logger.error(f"Could not load asset symbols: {e}")
+        finally:
+            db.close()
+        return sorted(symbols)
+
+    def refresh_once(self) -> dict:
+        symbols = self.tracked_symbols()
+        self._symbols = symbols
+        # Queue for the rate limiter at most until the next tick
+        refreshed = market_data.refresh_prices(symbols, max_wait=self.interval)
+        # One worker per host appends to the history files, whatever the cache backend
+        if self._history_writer.try_acquire():
+            price_history.record_many(refreshed, time.time())
+        filled = order_engine.on_prices(refreshed)
+        if filled:
+            logger.info(f"Filled {filled} resting orders")
+        fired = alert_engine.on_prices(refreshed)
+        if fired:
+            logger.info(f"Fired {fired} price alerts")
+        logger.info(f"Refreshed {len(refreshed)}/{len(symbols)} prices")
+        return refreshed
+
+    async def _run(self):
+        while True:
+            try:
+                if self.should_refresh():
+                    # requests is blocking, keep it off the event loop
+                    await asyncio.to_thread(self.refresh_once)
+                elif not self._symbols:
+                    self._symbols = await asyncio.to_thread(self.tracked_symbols)
+                # fired alerts reach this worker's users whichever worker evaluated them
+                notifications = await asyncio.to_thread(alert_engine.poll_outbox)
+                self.on_tick(notifications)
+            except Exception as e:
+                logger.error(f"Price refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def on_tick(self, notifications: list = ()):
+        """
+        Push the cached prices to live subscribers. Reads the cache rather than
+        the refresh result so workers that aren't the elected refresher still
+        stream what the leader wrote. Fired alerts go to their owner's streams.
+        """
+        prices = {symbol: price for symbol, (price, _) in market_data.get_price_ages(self._symbols).items()}
+        price_broadcaster.publish(prices)
+        for notification in notifications:
+            price_broadcaster.notify(notification["user_id"], "alert", notification)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._leader is not None:
+            self._leader.release()
+        self._history_writer.release()
+        price_history.close()
+
+
+price_refresher = PriceRefresher()
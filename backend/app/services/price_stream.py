@@ -0,0 +1,104 @@
+# app/services/price_stream.py
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PriceBroadcaster:
+    """
+    Fans one upstream refresh out to every live subscriber (SSE/WebSocket).
+
+    Each tick is diffed against the last published prices and only changed
+    symbols go out, encoded once and shared by all subscribers. Every
+    subscriber has a bounded queue; a slow consumer loses its oldest ticks
+    instead of holding memory or slowing everyone else down.
+
+    Signed-in users can also hold a personal queue for their own events
+    (fired price alerts), sent with notify().
+
+    Must be used from the event loop thread.
+    """
+
+    def __init__(self, queue_size: int = None):
+        self.queue_size = queue_size or settings.PRICE_STREAM_QUEUE_SIZE
+        self._subscribers = set()
+        self._user_subscribers = defaultdict(set)  # user_id -> queues
+        self._last = {}  # symbol -> price string
+        self._stats = {"published": 0, "dropped": 0, "notified": 0}
+
+    def subscribe(self) -> asyncio.Queue:
+        """New subscriber queue, primed with a snapshot of the latest prices."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._last:
+            queue.put_nowait(self._encode("snapshot", self._last))
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def subscribe_user(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._user_subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe_user(self, user_id: int, queue: asyncio.Queue):
+        queues = self._user_subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._user_subscribers[user_id]
+
+    def notify(self, user_id: int, kind: str, payload: dict):
+        """Send one event to every open stream of `user_id` (no-op if they have none here)."""
+        queues = self._user_subscribers.get(user_id)
+        if not queues:
+            return
+        message = json.dumps({"type": kind, "ts": round(time.time(), 3), **payload}, separators=(",", ":"), default=str)
+        for queue in queues:
+            self._put(queue, message)
+        self._stats["notified"] += 1
+
+    def _put(self, queue: asyncio.Queue, message: str):
+        if queue.full():
+            queue.get_nowait()  # drop the oldest message for this slow consumer
+            self._stats["dropped"] += 1
+        queue.put_nowait(message)
+
+    def publish(self, prices: dict) -> dict:
+        """Send the symbols whose price changed since the last tick. Returns that delta."""
+        delta = {}
+        for symbol, price in prices.items():
+            if price is None:
+                continue
+            value = str(price)
+            if self._last.get(symbol) != value:
+                delta[symbol] = value
+        if not delta:
+            return delta
+
+        self._last.update(delta)
+        message = self._encode("prices", delta)
+        for queue in self._subscribers:
+            self._put(queue, message)
+        self._stats["published"] += 1
+        return delta
+
+    def _encode(self, kind: str, prices: dict) -> str:
+        return json.dumps({"type": kind, "ts": round(time.time(), 3), "prices": prices}, separators=(",", ":"))
+
+    def stats(self) -> dict:
+        return dict(
+            self._stats,
+            subscribers=len(self._subscribers),
+            user_subscribers=sum(len(queues) for queues in self._user_subscribers.values()),
+        )
+
+
+price_broadcaster = PriceBroadcaster()
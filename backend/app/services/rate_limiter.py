@@ -0,0 +1,94 @@
+# app/services/rate_limiter.py
+import threading
+import time
+
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose refill rate adapts to upstream feedback (AIMD):
+      - on a 429/5xx the rate is cut multiplicatively and the bucket is
+        blocked for an exponentially growing backoff (or Retry-After)
+      - every success recovers a small fixed step back towards max_rate
+
+    acquire(timeout) queues the caller until a token is available or the
+    deadline passes; timeout=0 never waits, so callers can fall back to a
+    cached value immediately.
+    """
+
+    def __init__(self, rate: float, burst: int, min_rate: float, recovery_step: float,
+                 decrease_factor: float = 0.5, base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.recovery_step = recovery_step
+        self.decrease_factor = decrease_factor
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self._streak = 0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._stats = {"granted": 0, "rejected": 0, "throttled": 0, "waited_seconds": 0.0}
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Take one token, waiting at most `timeout` seconds (None waits forever)."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self._stats["granted"] += 1
+                    self._stats["waited_seconds"] += now - start
+                    return True
+
+                if now < self.blocked_until:
+                    wait_for = self.blocked_until - now
+                else:
+                    wait_for = (1 - self.tokens) / self.rate
+                if deadline is not None:
+                    if now + wait_for > deadline:
+                        self._stats["rejected"] += 1
+                        return False
+                self._cond.wait(wait_for)
+
+    def on_success(self):
+        with self._cond:
+            self._streak = 0
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_throttle(self, retry_after: float = None):
+        """Upstream said slow down (429) or is struggling (5xx)."""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self._streak += 1
+            self._stats["throttled"] += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._streak - 1))
+            if retry_after:
+                backoff = max(backoff, retry_after)
+            self.blocked_until = max(self.blocked_until, now + backoff)
+            self.tokens = 0.0
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "rate_per_second": round(self.rate, 4),
+                "max_rate_per_second": self.max_rate,
+                "tokens": round(min(self.burst, self.tokens + (time.monotonic() - self._updated) * self.rate), 2),
+                "blocked_for_seconds": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+                "backoff_streak": self._streak,
+            })
+        return stats
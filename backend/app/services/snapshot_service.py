@@ -0,0 +1,180 @@
+# app/services/snapshot_service.py
+import asyncio
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.asset import Asset
+from app.models.nav_snapshot import NavSnapshot
+from app.models.portfolio_entry import PortfolioEntry
+from app.models.wallet import Wallet
+from app.services.leader import LeaderLock
+from app.services.market_data import get_current_prices
+from app.services.portfolio_service import get_portfolio_summary
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _apply(snapshot: NavSnapshot, holdings: Decimal, cash: Decimal):
+    snapshot.holdings_value = holdings.quantize(CENT)
+    snapshot.cash_balance = cash.quantize(CENT)
+    snapshot.nav = (holdings + cash).quantize(CENT)
+
+
+def record_nav_snapshot(db: Session, user_id: int) -> NavSnapshot:
+    """Upsert today's NAV row for one user from their current holdings and wallet."""
+    summary = get_portfolio_summary(db, user_id)
+    day = _today()
+    snapshot = db.query(NavSnapshot).filter(NavSnapshot.user_id == user_id, NavSnapshot.day == day).first()
+    if snapshot is None:
+        snapshot = NavSnapshot(user_id=user_id, day=day)
+        db.add(snapshot)
+    _apply(snapshot, summary["total_market_value"], summary["cash_balance"])
+    try:
+        db.commit()
+    except IntegrityError:
+        # the periodic job inserted today's row first, update it instead
+        db.rollback()
+        snapshot = db.query(NavSnapshot).filter(NavSnapshot.user_id == user_id, NavSnapshot.day == day).one()
+        _apply(snapshot, summary["total_market_value"], summary["cash_balance"])
+        db.commit()
+    return snapshot
+
+
+def record_nav_snapshot_for_user(user_id: int):
+    """Background-task entry point: runs after the trade/deposit response is sent."""
+    db = SessionLocal()
+    try:
+        record_nav_snapshot(db, user_id)
+    except Exception as e:
+        logger.error(f"NAV snapshot failed for user {user_id}: {e}")
+    finally:
+        db.close()
+
+
+def snapshot_all_users(db: Session) -> int:
+    """
+    Write today's NAV for every user with holdings or a wallet: one query for
+    all positions, one for all wallets, one batch price lookup, one commit.
+    """
+    positions = (
+        db.query(PortfolioEntry.user_id, PortfolioEntry.quantity, Asset.symbol)
+        .join(Asset, PortfolioEntry.asset_id == Asset.id)
+        .all()
+    )
+    wallets = dict(db.query(Wallet.user_id, Wallet.balance).all())
+    prices = get_current_prices(list({symbol for _, _, symbol in positions})) if positions else {}
+
+    holdings = defaultdict(Decimal)
+    for user_id, quantity, symbol in positions:
+        holdings[user_id] += quantity * prices.get(symbol.upper(), Decimal("0"))
+
+    day = _today()
+    existing = {
+        snapshot.user_id: snapshot
+        for snapshot in db.query(NavSnapshot).filter(NavSnapshot.day == day).all()
+    }
+    user_ids = set(holdings) | set(wallets)
+    for user_id in user_ids:
+        snapshot = existing.get(user_id)
+        if snapshot is None:
+            snapshot = NavSnapshot(user_id=user_id, day=day)
+            db.add(snapshot)
+        _apply(snapshot, holdings.get(user_id, Decimal("0")), wallets.get(user_id) or Decimal("0"))
+    db.commit()
+    return len(user_ids)
+
+
+def compact_nav_snapshots(db: Session, retain_daily_days: int) -> int:
+    """
+    Thin rows older than `retain_daily_days` down to the last row of each
+    ISO week per user, so long-range charts stay small. Returns rows deleted.
+    """
+    cutoff = _today() - timedelta(days=retain_daily_days)
+    rows = (
+        db.query(NavSnapshot.id, NavSnapshot.user_id, NavSnapshot.day)
+        .filter(NavSnapshot.day < cutoff)
+        .order_by(NavSnapshot.user_id, NavSnapshot.day)
+        .all()
+    )
+    keep = {}
+    for snapshot_id, user_id, day in rows:
+        keep[(user_id, day.isocalendar()[:2])] = snapshot_id  # rows are ordered, last one wins
+    kept = set(keep.values())
+    doomed = [snapshot_id for snapshot_id, _, _ in rows if snapshot_id not in kept]
+
+    for i in range(0, len(doomed), 1000):
+        db.query(NavSnapshot).filter(NavSnapshot.id.in_(doomed[i:i + 1000])).delete(synchronize_session=False)
+    db.commit()
+    return len(doomed)
+
+
+def get_nav_history(db: Session, user_id: int, start: date = None, end: date = None) -> list:
+    query = db.query(NavSnapshot).filter(NavSnapshot.user_id == user_id)
+    if start:
+        query = query.filter(NavSnapshot.day >= start)
+    if end:
+        query = query.filter(NavSnapshot.day <= end)
+    return query.order_by(NavSnapshot.day).all()
+
+
+class NavSnapshotJob:
+    """
+    Periodic job (started from the app lifespan) that writes today's NAV for
+    every user, so days without trades still get a point, then compacts old
+    rows. One worker per host runs it.
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or settings.NAV_SNAPSHOT_INTERVAL_SECONDS
+        self._task = None
+        self._leader = LeaderLock(os.path.join(tempfile.gettempdir(), "crypto_port_nav_snapshots.lock"))
+
+    def run_once(self):
+        db = SessionLocal()
+        try:
+            written = snapshot_all_users(db)
+            deleted = compact_nav_snapshots(db, settings.NAV_SNAPSHOT_DAILY_RETENTION_DAYS)
+            logger.info(f"NAV snapshots: {written} written, {deleted} compacted")
+        finally:
+            db.close()
+
+    async def _run(self):
+        while True:
+            try:
+                if self._leader.try_acquire():
+                    await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"NAV snapshot job failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._leader.release()
+
+
+nav_snapshot_job = NavSnapshotJob()
@@ -0,0 +1,330 @@
+# app/services/tax_lots.py
+"""
+Tax-lot cost basis. Every buy opens a lot; every sell closes lots in
+FIFO, LIFO or HIFO (highest cost first) order and writes one realized
+gain row per lot it touches.
+
+Trades are applied incrementally: a sell loads only the open lots it will
+consume (in the method's order, straight off an index) and updates just
+those, so the cost is O(lots touched) rather than a ledger replay. The
+full replay (`rebuild_lots`) is only needed after a bulk import.
+
+Quantities and prices are fixed-point Decimals, so lots close exactly;
+each gain is rounded to the cent when it is recorded.
+"""
+import heapq
+from collections import defaultdict, deque
+from datetime import datetime
+from decimal import Decimal
+from itertools import count
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.fixed_point import PRICE_PLACES, QUANTITY_PLACES, ZERO, from_units, money
+from app.db.types import widen
+from app.models.asset import Asset
+from app.models.tax_lot import RealizedGain, TaxLot
+from app.models.transaction import Transaction
+from app.services.market_data import get_current_prices
+
+METHODS = ("fifo", "lifo", "hifo")
+REBUILD_CHUNK_SIZE = 5000
+
+
+class OpenLot:
+    __slots__ = ("id", "transaction_id", "acquired_at", "quantity", "remaining", "cost_price")
+
+    def __init__(self, id, transaction_id, acquired_at, quantity, remaining, cost_price):
+        self.id = id
+        self.transaction_id = transaction_id
+        self.acquired_at = acquired_at
+        self.quantity = quantity
+        self.remaining = remaining
+        self.cost_price = cost_price
+
+
+class LotQueue:
+    """
+    Open lots of one position in the order `method` closes them: a deque
+    (oldest first) for FIFO and LIFO, a heap on (highest cost, oldest) for
+    HIFO, so each closed lot costs O(1) or O(log n).
+    """
+
+    def __init__(self, method: str, lots=()):
+        self.method = method
+        self._lots = deque()
+        self._heap = []  # HIFO: (-cost_price, arrival, lot)
+        self._arrivals = count()
+        for lot in lots:
+            self.add(lot)
+
+    def __len__(self):
+        return len(self._heap) if self.method == "hifo" else len(self._lots)
+
+    def add(self, lot: OpenLot):
+        # buys arrive in time order
+        if self.method == "hifo":
+            heapq.heappush(self._heap, (-lot.cost_price, next(self._arrivals), lot))
+        else:
+            self._lots.append(lot)
+
+    def _next(self) -> OpenLot:
+        if self.method == "fifo":
+            return self._lots[0]
+        if self.method == "lifo":
+            return self._lots[-1]
+        return self._heap[0][2]
+
+    def _pop(self):
+        if self.method == "fifo":
+            self._lots.popleft()
+        elif self.method == "lifo":
+            self._lots.pop()
+        else:
+            heapq.heappop(self._heap)
+
+    def take(self, quantity: Decimal):
+        """
+        Close `quantity` against the queue. Returns ([(lot, quantity closed)],
+        quantity left over when the queue ran out).
+        """
+        fills = []
+        while quantity > 0 and len(self):
+            lot = self._next()
+            closed = min(lot.remaining, quantity)
+            lot.remaining -= closed
+            quantity -= closed
+            fills.append((lot, closed))
+            if lot.remaining == 0:
+                self._pop()
+        return fills, quantity
+
+
+def _method(method: str = None) -> str:
+    method = (method or settings.TAX_LOT_METHOD).lower()
+    if method not in METHODS:
+        raise ValueError(f"Unknown tax lot method: {method}")
+    return method
+
+
+def _gain_row(user_id, asset_id, transaction_id, sold_at, price, lot, quantity, cost_price=None) -> dict:
+    cost = lot.cost_price if lot else cost_price
+    return {
+        "user_id": user_id,
+        "asset_id": asset_id,
+        "lot_id": lot.id if lot else None,
+        "transaction_id": transaction_id,
+        "acquired_at": lot.acquired_at if lot else None,
+        "sold_at": sold_at,
+        "quantity": quantity,
+        "cost_price": cost,
+        "sale_price": price,
+        "gain": money((price - cost) * quantity),
+    }
+
+
+def open_lot(db: Session, user_id: int, asset_id: int, transaction_id: int, quantity: Decimal, price: Decimal,
+             acquired_at: datetime):
+    db.execute(insert(TaxLot).values(
+        user_id=user_id,
+        asset_id=asset_id,
+        transaction_id=transaction_id,
+        acquired_at=acquired_at,
+        quantity=quantity,
+        remaining=quantity,
+        cost_price=price,
+    ))
+
+
+def close_lots(db: Session, user_id: int, asset_id: int, transaction_id: int, quantity: Decimal, price: Decimal,
+               sold_at: datetime, fallback_cost: Decimal, method: str = None) -> Decimal:
+    """
+    Close `quantity` sold at `price` against the position's open lots and
+    record the realized gains. Whatever the lots don't cover (holdings from
+    before lot tracking) is realized at `fallback_cost`. Returns the total gain.
+
+    Runs after trade_service.reduce_position, whose row lock on the
+    portfolio entry serializes concurrent sells of the same position.
+    """
+    method = _method(method)
+    order = {
+        "fifo": (TaxLot.acquired_at, TaxLot.id),
+        "lifo": (TaxLot.acquired_at.desc(), TaxLot.id.desc()),
+        "hifo": (TaxLot.cost_price.desc(), TaxLot.id),
+    }[method]
+    candidates = db.execute(
+        select(TaxLot.id, TaxLot.transaction_id, TaxLot.acquired_at, TaxLot.quantity, TaxLot.remaining, TaxLot.cost_price)
+        .where(TaxLot.user_id == user_id, TaxLot.asset_id == asset_id, TaxLot.remaining > 0)
+        .order_by(*order)
+        .execution_options(yield_per=64)
+    )
+    # Only as many lots as the sell needs, taken in the method's order
+    lots, covered = [], ZERO
+    for row in candidates:
+        lots.append(OpenLot(*row))
+        covered += row.remaining
+        if covered >= quantity:
+            break
+    candidates.close()
+
+    queue = LotQueue(method, sorted(lots, key=lambda l: (l.acquired_at, l.id)))
+    fills, uncovered = queue.take(quantity)
+    if fills:
+        db.execute(update(TaxLot), [{"id": lot.id, "remaining": lot.remaining} for lot, _ in fills])
+    rows = [_gain_row(user_id, asset_id, transaction_id, sold_at, price, lot, closed) for lot, closed in fills]
+    if uncovered > 0:
+        rows.append(_gain_row(user_id, asset_id, transaction_id, sold_at, price, None, uncovered, fallback_cost))
+    if not rows:
+        return ZERO  # nothing sold; an empty executemany would insert DEFAULT VALUES
+    db.execute(insert(RealizedGain), rows)
+    return sum((row["gain"] for row in rows), ZERO)
+
+
+def rebuild_lots(db: Session, user_id: int, method: str = None):
+    """
+    Replace the user's lots and realized gains by replaying their ledger in
+    date order. Works through it in chunks so only open lots stay in memory.
+    Doesn't commit.
+    """
+    method = _method(method)
+    db.execute(delete(RealizedGain).where(RealizedGain.user_id == user_id))
+    db.execute(delete(TaxLot).where(TaxLot.user_id == user_id))
+
+    queues = defaultdict(lambda: LotQueue(method))
+    ledger = db.execute(
+        select(Transaction.id, Transaction.asset_id, Transaction.type, Transaction.quantity, Transaction.price, Transaction.date)
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.date, Transaction.id)
+        .execution_options(yield_per=REBUILD_CHUNK_SIZE)
+    )
+    for chunk in ledger.partitions():
+        new_lots, touched, gains = [], set(), []
+        for transaction_id, asset_id, side, quantity, price, date in chunk:
+            if side == "buy":
+                lot = OpenLot(None, transaction_id, date, quantity, quantity, price)
+                queues[asset_id].add(lot)
+                new_lots.append((asset_id, lot))
+                continue
+            fills, uncovered = queues[asset_id].take(quantity)
+            for lot, closed in fills:
+                touched.add(lot)
+                gains.append((asset_id, transaction_id, date, price, lot, closed))
+            if uncovered > 0:
+                # sold more than the ledger ever bought (transferred in): cost unknown, realize no gain
+                gains.append((asset_id, transaction_id, date, price, None, uncovered))
+        _flush_rebuild_chunk(db, user_id, new_lots, touched, gains)
+
+
+def _flush_rebuild_chunk(db: Session, user_id: int, new_lots: list, touched: set, gains: list):
+    # lots from earlier chunks need their remaining updated; new ones are inserted with it
+    stored = [lot for lot in touched if lot.id is not None]
+    if stored:
+        db.execute(update(TaxLot), [{"id": lot.id, "remaining": lot.remaining} for lot in stored])
+    if new_lots:
+        ids = db.execute(
+            insert(TaxLot).returning(TaxLot.id, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": user_id,
+                    "asset_id": asset_id,
+                    "transaction_id": lot.transaction_id,
+                    "acquired_at": lot.acquired_at,
+                    "quantity": lot.quantity,
+                    "remaining": lot.remaining,
+                    "cost_price": lot.cost_price,
+                }
+                for asset_id, lot in new_lots
+            ],
+        ).scalars().all()
+        for (_, lot), lot_id in zip(new_lots, ids):
+            lot.id = lot_id
+    if gains:
+        db.execute(insert(RealizedGain), [
+            _gain_row(user_id, asset_id, transaction_id, sold_at, price, lot, closed, cost_price=price)
+            for asset_id, transaction_id, sold_at, price, lot, closed in gains
+        ])
+
+
+def get_open_lots(db: Session, user_id: int, prices: dict = None) -> dict:
+    """
+    Open lots valued at current prices, with unrealized gain per lot.
+    Callers that can't block on the price lookup pass `prices` in.
+    """
+    rows = (
+        db.query(TaxLot, Asset.symbol)
+        .join(Asset, TaxLot.asset_id == Asset.id)
+        .filter(TaxLot.user_id == user_id, TaxLot.remaining > 0)
+        .order_by(Asset.symbol, TaxLot.acquired_at, TaxLot.id)
+        .all()
+    )
+    if prices is None:
+        prices = get_current_prices(list({symbol for _, symbol in rows})) if rows else {}
+    lots = []
+    total_cost = total_unrealized = ZERO
+    for lot, symbol in rows:
+        price = prices.get(symbol.upper(), ZERO)
+        cost_basis = lot.remaining * lot.cost_price
+        unrealized = lot.remaining * price - cost_basis
+        total_cost += cost_basis
+        total_unrealized += unrealized
+        lots.append({
+            "lot_id": lot.id,
+            "asset_id": lot.asset_id,
+            "symbol": symbol,
+            "acquired_at": lot.acquired_at,
+            "quantity": lot.quantity,
+            "remaining": lot.remaining,
+            "cost_price": lot.cost_price,
+            "current_price": price,
+            "cost_basis": cost_basis,
+            "unrealized_gain": unrealized,
+        })
+    return {
+        "method": _method(),
+        "lots": lots,
+        "total_cost_basis": total_cost,
+        "total_unrealized_gain": total_unrealized,
+    }
+
+
+def get_realized_gains(db: Session, user_id: int, start: datetime = None, end: datetime = None) -> dict:
+    """Realized gains per asset for sells between `start` and `end`, summed in the database."""
+    query = (
+        db.query(
+            RealizedGain.asset_id,
+            Asset.symbol,
+            func.sum(RealizedGain.quantity),
+            func.sum(widen(RealizedGain.quantity) * widen(RealizedGain.cost_price)),
+            func.sum(widen(RealizedGain.quantity) * widen(RealizedGain.sale_price)),
+            func.sum(RealizedGain.gain),
+        )
+        .join(Asset, RealizedGain.asset_id == Asset.id)
+        .filter(RealizedGain.user_id == user_id)
+    )
+    if start:
+        query = query.filter(RealizedGain.sold_at >= start)
+    if end:
+        query = query.filter(RealizedGain.sold_at <= end)
+    assets = [
+        {
+            "asset_id": asset_id,
+            "symbol": symbol,
+            "quantity": quantity,
+            "cost_basis": _money_from_products(cost),
+            "proceeds": _money_from_products(proceeds),
+            "gain": gain,
+        }
+        for asset_id, symbol, quantity, cost, proceeds, gain in query.group_by(RealizedGain.asset_id, Asset.symbol).order_by(Asset.symbol)
+    ]
+    return {
+        "method": _method(),
+        "assets": assets,
+        "total_gain": sum((asset["gain"] for asset in assets), ZERO),
+    }
+
+
+def _money_from_products(units) -> Decimal:
+    """A sum of quantity units * price units, back in money."""
+    return money(from_units(Decimal(units), QUANTITY_PLACES + PRICE_PLACES))
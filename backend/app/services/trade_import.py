@@ -0,0 +1,300 @@
+# app/services/trade_import.py
+"""
+Bulk import of exchange trade-history CSVs (Binance, Coinbase, or a plain
+date,symbol,side,quantity,price file) into the transactions ledger.
+
+The upload is processed as a chain of generators, one row in flight at a
+time: read -> parse -> resolve asset -> chunk -> executemany INSERT.
+Holdings of the imported assets and the tax lots are rebuilt once at the
+end by streaming the user's ledger, so memory stays flat however long the
+file is. Imported trades don't move
+the wallet balance; they were paid for on the exchange.
+"""
+import csv
+import io
+import re
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.fixed_point import PRICE_PLACES, QUANTITY_PLACES, ZERO, max_amount, quantize
+from app.models.asset import Asset
+from app.models.portfolio_entry import PortfolioEntry
+from app.models.transaction import Transaction
+from app.services.tax_lots import rebuild_lots
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+# Dollar quote currencies stripped from Binance pairs like BTCUSDT; other
+# quotes (ETHBTC) are rejected since their prices aren't in dollars
+QUOTE_CURRENCIES = ("USDT", "USDC", "BUSD", "FDUSD", "TUSD", "DAI", "USD")
+
+_NUMBER = re.compile(r"-?[\d,]*\.?\d+(?:[eE]-?\d+)?")
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+
+    def reject(self, line: int, error: str):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+
+def _number(value: str) -> Decimal:
+    """'0.0100BTC', '$57,000.00', '1e-8' -> Decimal, exactly as written."""
+    match = _NUMBER.search(value or "")
+    try:
+        return Decimal(match.group().replace(",", ""))
+    except (AttributeError, InvalidOperation):
+        raise ImportRowError(f"Not a number: {value!r}")
+
+
+def _timestamp(value: str) -> datetime:
+    """ISO-ish exchange timestamps -> naive UTC, like Transaction.date."""
+    value = (value or "").strip().replace(" UTC", "").replace("Z", "+00:00")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ImportRowError(f"Bad date: {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _side(value: str) -> str:
+    side = (value or "").strip().lower()
+    for candidate in ("buy", "sell"):
+        # Coinbase writes "Advanced Trade Buy"
+        if side == candidate or side.endswith(" " + candidate):
+            return candidate
+    raise ImportRowError(f"Unsupported transaction type: {value!r}")
+
+
+def _parse_binance(row: dict) -> tuple:
+    return (
+        _timestamp(row["Date(UTC)"]),
+        row["Pair"].strip().upper(),  # resolved against known assets later
+        _side(row.get("Side") or row.get("Type")),
+        _number(row.get("Executed") or row.get("Amount")),
+        _number(row["Price"]),
+    )
+
+
+def _parse_coinbase(row: dict) -> tuple:
+    price = row.get("Spot Price at Transaction") or row.get("Price at Transaction")
+    return (
+        _timestamp(row["Timestamp"]),
+        row["Asset"].strip().upper(),
+        _side(row["Transaction Type"]),
+        _number(row["Quantity Transacted"]),
+        _number(price),
+    )
+
+
+def _parse_generic(row: dict) -> tuple:
+    row = {key.strip().lower(): value for key, value in row.items() if key}
+    return (
+        _timestamp(row["date"]),
+        row["symbol"].strip().upper(),
+        _side(row["side"]),
+        _number(row["quantity"]),
+        _number(row["price"]),
+    )
+
+
+# format -> (column that identifies its header row, row parser)
+FORMATS = {
+    "binance": ("Date(UTC)", _parse_binance),
+    "coinbase": ("Transaction Type", _parse_coinbase),
+    "generic": ("symbol", _parse_generic),
+}
+
+
+def read_rows(stream, fmt: str = None):
+    """
+    Yield (line, parser, row dict) from a binary CSV stream. Preamble lines
+    before the header (Coinbase adds some) are skipped; the format is taken
+    from the header unless `fmt` is given.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    candidates = {fmt: FORMATS[fmt]} if fmt else FORMATS
+    # the file is decoded and split lazily, so these surface mid-import
+    try:
+        for header in reader:
+            cells = [cell.strip() for cell in header]
+            lowered = {cell.lower() for cell in cells}
+            parser = next((p for marker, p in candidates.values() if marker.lower() in lowered), None)
+            if parser:
+                break
+        else:
+            raise ImportRowError("No recognised header row (expected a Binance, Coinbase or date,symbol,side,quantity,price export)")
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            yield reader.line_num, parser, dict(zip(cells, row))
+    except UnicodeDecodeError:
+        raise ImportRowError("The file is not UTF-8 text")
+    except csv.Error as e:
+        raise ImportRowError(f"Malformed CSV at line {reader.line_num}: {e}")
+
+
+def parse_rows(rows, report: ImportReport):
+    for line, parser, row in rows:
+        try:
+            date, symbol, side, quantity, price = parser(row)
+        except (ImportRowError, KeyError, TypeError) as e:
+            report.reject(line, f"Missing column {e}" if isinstance(e, KeyError) else str(e))
+            continue
+        # checked on the stored values: 1e-9 of a coin rounds to nothing
+        quantity, price = quantize(quantity, QUANTITY_PLACES), quantize(price, PRICE_PLACES)
+        if quantity <= 0 or price < 0:
+            report.reject(line, "Quantity must be positive and price non-negative")
+            continue
+        if quantity > max_amount(QUANTITY_PLACES) or price > max_amount(PRICE_PLACES):
+            report.reject(line, "Quantity or price too large")
+            continue
+        yield line, date, symbol, side, quantity, price
+
+
+def resolve_assets(trades, asset_index: dict, report: ImportReport):
+    """Map symbols (or Binance pairs) to asset ids through the in-memory index."""
+    for line, date, symbol, side, quantity, price in trades:
+        asset_id = asset_index.get(symbol)
+        if asset_id is None:
+            base = next((symbol[:-len(q)] for q in QUOTE_CURRENCIES if symbol.endswith(q) and len(symbol) > len(q)), None)
+            asset_id = asset_index.get(base)
+        if asset_id is None:
+            report.reject(line, f"Unknown asset: {symbol}")
+            continue
+        yield asset_id, date, side, quantity, price
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def import_trades(db: Session, user_id: int, stream, fmt: str = None) -> dict:
+    """Stream a CSV into the ledger, then rebuild the user's holdings. Commits."""
+    report = ImportReport()
+    asset_index = {symbol.upper(): asset_id for symbol, asset_id in db.query(Asset.symbol, Asset.id)}
+
+    # ledger rows up to here predate the import; holdings they don't explain were entered by hand
+    last_id = db.query(func.max(Transaction.id)).filter(Transaction.user_id == user_id).scalar() or 0
+    touched = set()
+    trades = resolve_assets(parse_rows(read_rows(stream, fmt), report), asset_index, report)
+    for chunk in chunked(trades, CHUNK_SIZE):
+        db.execute(insert(Transaction), [
+            {
+                "user_id": user_id,
+                "asset_id": asset_id,
+                "type": side,
+                "quantity": quantity,
+                "price": price,
+                "date": date,
+            }
+            for asset_id, date, side, quantity, price in chunk
+        ])
+        report.imported += len(chunk)
+        touched.update(asset_id for asset_id, *_ in chunk)
+
+    positions = None
+    if report.imported:
+        positions = recompute_holdings(db, user_id, touched, last_id)
+        rebuild_lots(db, user_id)
+    db.commit()
+    return {
+        "imported": report.imported,
+        "skipped": report.skipped,
+        "errors": report.errors,
+        "positions": positions,
+    }
+
+
+def _replay(rows, holdings: dict) -> dict:
+    """
+    Apply ledger rows to `holdings` {asset_id: (quantity, average_buy_price)}
+    with the average-cost method. Sells beyond the running quantity (coins
+    that arrived by transfer) floor the position at zero. Returns the net
+    quantity each asset's rows add up to, without the floor.
+    """
+    net = {}
+    for asset_id, side, quantity, price in rows:
+        held, average = holdings.get(asset_id, (ZERO, ZERO))
+        if side == "buy":
+            total = held + quantity
+            # rounded at every buy, like trade_service.add_position
+            holdings[asset_id] = (total, quantize((average * held + price * quantity) / total, PRICE_PLACES))
+            net[asset_id] = net.get(asset_id, ZERO) + quantity
+        else:
+            held = max(ZERO, held - quantity)
+            holdings[asset_id] = (held, average if held else ZERO)
+            net[asset_id] = net.get(asset_id, ZERO) - quantity
+    return net
+
+
+def recompute_holdings(db: Session, user_id: int, asset_ids: set, imported_after: int) -> int:
+    """
+    Rewrite the user's entries for `asset_ids` by replaying their ledger in
+    date order. Entries for other assets are left alone.
+
+    Quantity an entry holds beyond what the ledger before the import
+    (transaction ids up to `imported_after`) adds up to was entered by hand
+    or predates the ledger; it is carried into the replay as the opening
+    position, at the cost the entry implies for it.
+    Returns the number of open positions. Doesn't commit.
+    """
+    ledger = (
+        select(Transaction.asset_id, Transaction.type, Transaction.quantity, Transaction.price)
+        .where(Transaction.user_id == user_id, Transaction.asset_id.in_(asset_ids))
+        .order_by(Transaction.date, Transaction.id)
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    existing = {
+        entry.asset_id: entry
+        for entry in db.query(PortfolioEntry).filter(
+            PortfolioEntry.user_id == user_id, PortfolioEntry.asset_id.in_(asset_ids)
+        )
+    }
+
+    before = {}
+    net = _replay(db.execute(ledger.where(Transaction.id <= imported_after)), before)
+    holdings = {}
+    for asset_id, entry in existing.items():
+        opening = entry.quantity - net.get(asset_id, ZERO)
+        if opening <= 0:
+            continue
+        held, average = before.get(asset_id, (ZERO, ZERO))
+        cost = max(ZERO, entry.quantity * entry.average_buy_price - held * average)
+        holdings[asset_id] = (opening, quantize(cost / opening, PRICE_PLACES))
+    _replay(db.execute(ledger), holdings)
+
+    for asset_id, (quantity, average) in holdings.items():
+        entry = existing.get(asset_id)
+        if quantity <= 0:
+            continue
+        if entry is None:
+            db.add(PortfolioEntry(user_id=user_id, asset_id=asset_id, quantity=quantity, average_buy_price=average))
+        else:
+            entry.quantity = quantity
+            entry.average_buy_price = average
+    closed = [entry.id for asset_id, entry in existing.items() if holdings.get(asset_id, (ZERO,))[0] <= 0]
+    if closed:
+        db.execute(delete(PortfolioEntry).where(PortfolioEntry.id.in_(closed)))
+    db.flush()
+    return db.query(func.count(PortfolioEntry.id)).filter(PortfolioEntry.user_id == user_id).scalar()
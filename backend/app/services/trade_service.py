@@ -0,0 +1,214 @@
+# app/services/trade_service.py
+"""
+Wallet and position changes as single conditional UPDATE ... RETURNING
+statements. The balance/quantity check and the write happen in the same
+statement, so concurrent trades can't both pass a check made on a stale
+read, and no row lock or stricter isolation level is needed.
+
+buy() and sell() also append the trade to the transactions ledger and
+open/close tax lots, in the same transaction as the balance change.
+
+Each function either fails before writing anything or succeeds, so a
+rejected trade leaves the transaction untouched. Nothing here commits;
+callers commit (or roll back) once per request.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, and_, cast, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.fixed_point import MONEY_PLACES, PRICE_PLACES, QUANTITY_PLACES, max_amount, notional, quantize, to_units
+from app.db.types import WIDE, widen
+from app.models.portfolio_entry import PortfolioEntry
+from app.models.transaction import Transaction
+from app.models.wallet import Wallet
+from app.services import tax_lots
+
+
+class TradeError(ValueError):
+    """A trade that can't be executed; `status_code` is what the route should answer."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _upsert(db: Session, model, values: dict, conflict_columns: list, set_: dict):
+    """INSERT ... ON CONFLICT DO UPDATE for the dialects in use (PostgreSQL, SQLite)."""
+    dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return dialect_insert(model).values(**values).on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+
+
+def debit_wallet(db: Session, user_id: int, amount: Decimal) -> Decimal:
+    """Take `amount` from the wallet only if the balance covers it. Returns the new balance."""
+    balance = db.execute(
+        update(Wallet)
+        .where(Wallet.user_id == user_id, Wallet.balance >= amount)
+        .values(balance=Wallet.balance - amount)
+        .returning(Wallet.balance)
+    ).scalar()
+    if balance is None:
+        if db.execute(select(Wallet.id).where(Wallet.user_id == user_id)).first() is None:
+            raise TradeError("Wallet not found", status_code=404)
+        raise TradeError("Insufficient balance")
+    return balance
+
+
+def credit_wallet(db: Session, user_id: int, amount: Decimal, create: bool = False) -> Decimal:
+    """Add `amount` to the wallet. With `create`, a missing wallet is opened with that balance."""
+    if create:
+        statement = _upsert(
+            db, Wallet, {"user_id": user_id, "balance": amount}, [Wallet.user_id],
+            {"balance": Wallet.balance + amount},
+        )
+        return db.execute(statement.returning(Wallet.balance)).scalar()
+
+    balance = db.execute(
+        update(Wallet)
+        .where(Wallet.user_id == user_id)
+        .values(balance=Wallet.balance + amount)
+        .returning(Wallet.balance)
+    ).scalar()
+    if balance is None:
+        raise TradeError("Wallet not found", status_code=404)
+    return balance
+
+
+def add_position(db: Session, user_id: int, asset_id: int, quantity: Decimal, price: Decimal) -> tuple:
+    """
+    Add `quantity` bought at `price`, creating the entry or folding the buy
+    into its weighted average buy price in one upsert. Returns
+    (entry_id, quantity, average_buy_price).
+
+    The average is exact on PostgreSQL, where WIDE is NUMERIC. SQLite
+    evaluates it in REAL (a double, ~15-16 significant digits), so there
+    the result can be one price unit (1e-8) off on a rounding tie or for
+    prices above ~$90M.
+    """
+    # The average is worked out on the raw units, widened since price * quantity
+    # overflows BIGINT, and rounded back to price units. SET expressions all
+    # see the row's old values.
+    quantity_units, price_units = to_units(quantity, QUANTITY_PLACES), to_units(price, PRICE_PLACES)
+    held = widen(PortfolioEntry.quantity)
+    average = cast(func.round(
+        (widen(PortfolioEntry.average_buy_price) * held + literal(price_units, WIDE) * quantity_units)
+        / (held + quantity_units)
+    ), BigInteger)
+    statement = _upsert(
+        db,
+        PortfolioEntry,
+        {"user_id": user_id, "asset_id": asset_id, "quantity": quantity, "average_buy_price": price},
+        [PortfolioEntry.user_id, PortfolioEntry.asset_id],
+        {
+            "quantity": PortfolioEntry.quantity + quantity,
+            "average_buy_price": average,
+        },
+    )
+    return tuple(db.execute(statement.returning(
+        PortfolioEntry.id, PortfolioEntry.quantity, PortfolioEntry.average_buy_price
+    )).first())
+
+
+def reduce_position(db: Session, user_id: int, asset_id: int, quantity: Decimal) -> tuple:
+    """
+    Remove `quantity` only if the position holds at least that much; a
+    position sold down to zero is deleted. Returns (entry_id, quantity,
+    average_buy_price); entry_id is None once the entry is gone.
+    """
+    row = db.execute(
+        update(PortfolioEntry)
+        .where(
+            PortfolioEntry.user_id == user_id,
+            PortfolioEntry.asset_id == asset_id,
+            PortfolioEntry.quantity >= quantity,
+        )
+        .values(quantity=PortfolioEntry.quantity - quantity)
+        .returning(PortfolioEntry.id, PortfolioEntry.quantity, PortfolioEntry.average_buy_price)
+    ).first()
+    if row is None:
+        exists = db.execute(
+            select(PortfolioEntry.id).where(PortfolioEntry.user_id == user_id, PortfolioEntry.asset_id == asset_id)
+        ).first()
+        raise TradeError("Not enough quantity to sell" if exists else "Asset not in portfolio")
+
+    entry_id, remaining, average_price = row
+    if remaining == 0:
+        deleted = db.execute(
+            delete(PortfolioEntry).where(and_(PortfolioEntry.id == entry_id, PortfolioEntry.quantity == 0))
+        ).rowcount
+        if deleted:
+            entry_id = None
+    return entry_id, remaining, average_price
+
+
+def record_trade(db: Session, user_id: int, asset_id: int, side: str, quantity: Decimal, price: Decimal,
+                 entry_id: int = None, date: datetime = None) -> int:
+    """Append one row to the transactions ledger. Returns its id."""
+    return db.execute(
+        insert(Transaction)
+        .values(
+            user_id=user_id,
+            portfolio_entry_id=entry_id,
+            asset_id=asset_id,
+            type=side,
+            quantity=quantity,
+            price=price,
+            date=date or datetime.utcnow(),
+        )
+        .returning(Transaction.id)
+    ).scalar()
+
+
+def _on_scale(quantity, price) -> tuple:
+    """
+    Round to the stored places up front, so the tax lots work on what the
+    ledger records. Anything that isn't positive once rounded is refused:
+    a negative buy would pass the balance check and credit the wallet.
+    """
+    quantity, price = quantize(quantity, QUANTITY_PLACES), quantize(price, PRICE_PLACES)
+    if quantity <= 0:
+        raise TradeError("Quantity must be greater than 0")
+    if price <= 0:
+        raise TradeError("Price must be greater than 0")
+    if quantity * price > max_amount(MONEY_PLACES):
+        raise TradeError("Trade value too large")
+    return quantity, price
+
+
+def buy(db: Session, user_id: int, asset_id: int, quantity: Decimal, price: Decimal) -> dict:
+    """Pay for and add `quantity` of an asset at `price`."""
+    quantity, price = _on_scale(quantity, price)
+    now = datetime.utcnow()
+    balance = debit_wallet(db, user_id, notional(quantity, price))
+    entry_id, held, average_price = add_position(db, user_id, asset_id, quantity, price)
+    transaction_id = record_trade(db, user_id, asset_id, "buy", quantity, price, entry_id, now)
+    tax_lots.open_lot(db, user_id, asset_id, transaction_id, quantity, price, now)
+    return {
+        "transaction_id": transaction_id,
+        "quantity": held,
+        "average_buy_price": average_price,
+        "wallet_balance": balance,
+    }
+
+
+def sell(db: Session, user_id: int, asset_id: int, quantity: Decimal, price: Decimal) -> dict:
+    """Remove `quantity` of an asset and credit the proceeds at `price`."""
+    quantity, price = _on_scale(quantity, price)
+    now = datetime.utcnow()
+    entry_id, held, average_price = reduce_position(db, user_id, asset_id, quantity)
+    balance = credit_wallet(db, user_id, notional(quantity, price))
+    transaction_id = record_trade(db, user_id, asset_id, "sell", quantity, price, entry_id, now)
+    realized_gain = tax_lots.close_lots(
+        db, user_id, asset_id, transaction_id, quantity, price, now, fallback_cost=average_price
+    )
+    return {
+        "transaction_id": transaction_id,
+        "realized_gain": realized_gain,
+        "quantity": held,
+        "average_buy_price": average_price,
+        "wallet_balance": balance,
+    }
@@ -0,0 +1,100 @@
+# app/services/user_cache.py
+"""
+Users resolved from access tokens, cached by id so an authenticated
+request doesn't need a query just to know who is calling.
+
+The cache is an LRU bounded to USER_CACHE_SIZE entries, each kept for
+USER_CACHE_TTL_SECONDS. Updating or deleting a User through the ORM
+drops its entry in this process. Other workers see the change once their
+entry expires, and so do bulk UPDATE/DELETE statements, which the ORM
+events don't see. Code that issues those should call
+user_cache.invalidate().
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class CachedUser:
+    """The identity routes get as current_user: a plain object, safe to share between requests."""
+
+    __slots__ = ("id", "email")
+
+    def __init__(self, id: int, email: str):
+        self.id = id
+        self.email = email
+
+    @classmethod
+    def of(cls, user: User) -> "CachedUser":
+        return cls(user.id, user.email)
+
+
+class UserCache:
+    """Thread-safe LRU of CachedUser by id, each entry expiring `ttl` seconds after it was loaded."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user id -> (CachedUser, monotonic expiry)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, user_id: int):
+        """The cached user, or None on a miss (counted either way)."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    self._stats["hits"] += 1
+                    return entry[0]
+                del self._entries[user_id]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, user: CachedUser):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return dict(
+            self._stats,
+            size=len(self._entries),
+            maxsize=self.maxsize,
+            ttl_seconds=self.ttl,
+            hit_rate=self._stats["hits"] / lookups if lookups else None,
+        )
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
@@ -0,0 +1,153 @@
+# benchmarks/async_db.py
+"""
+Requests/sec of the sync (threadpool + Session) and async (AsyncSession)
+route stacks. Seeds one database, then starts uvicorn once per stack and
+drives the same mix of authenticated GETs and trades at it.
+
+    python -m benchmarks.async_db --concurrency 64 --duration 10
+    DATABASE_URL=postgresql://... python -m benchmarks.async_db   # needs psycopg2 + asyncpg
+
+Uses a throwaway SQLite file unless DATABASE_URL is set.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/async_db.db"
+
+import httpx
+
+from app.core.security import hash_password
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.asset import Asset
+from app.models.portfolio_entry import PortfolioEntry
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.models.wallet import Wallet
+
+EMAIL, PASSWORD = f"bench-{time.time_ns()}@example.com", "bench"
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "fixtures", "prices.jsonl")
+READS = ["/wallet/balance", "/portfolios/", "/portfolios/summary", "/transactions/?limit=50", "/assets/"]
+
+
+def seed(transactions: int):
+    engine.echo = False
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    user = User(email=EMAIL, hashed_password=hash_password(PASSWORD))
+    assets = [Asset(symbol=symbol, name=symbol) for symbol in ("BTC", "ETH", "ADA") if not db.query(Asset).filter_by(symbol=symbol).first()]
+    db.add_all([user, *assets])
+    db.commit()
+    db.add(Wallet(user_id=user.id, balance=10 ** 9))
+    asset_ids = [asset_id for (asset_id,) in db.query(Asset.id).all()]
+    for asset_id in asset_ids:
+        db.add(PortfolioEntry(user_id=user.id, asset_id=asset_id, quantity=1000.0, average_buy_price=1.0))
+    db.bulk_insert_mappings(Transaction, [
+        {"user_id": user.id, "asset_id": asset_ids[i % len(asset_ids)], "type": "buy", "quantity": 1.0, "price": 1.0}
+        for i in range(transactions)
+    ])
+    db.commit()
+    asset_id = asset_ids[0]
+    db.close()
+    return asset_id
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_async: bool, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DB_ASYNC=str(db_async).lower(),
+        MARKET_DATA_PROVIDER="replay",
+        MARKET_DATA_REPLAY_PATH=FIXTURE,
+        MAX_PRICE_AGE_SECONDS="1e12",  # replayed prices are old
+        NAV_SNAPSHOT_JOB_ENABLED="false",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env, cwd=os.path.join(os.path.dirname(__file__), ".."),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/prices/status", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+async def load(base_url: str, asset_id: int, concurrency: int, duration: float, trade_every: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=httpx.Limits(max_connections=concurrency)) as client:
+        token = (await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        latencies, errors = [], 0
+        stop = time.perf_counter() + duration
+
+        async def worker(n: int):
+            nonlocal errors
+            i = n
+            while time.perf_counter() < stop:
+                i += 1
+                start = time.perf_counter()
+                try:
+                    if trade_every and i % trade_every == 0:
+                        side = "buy" if i % (2 * trade_every) else "sell"
+                        response = await client.post(f"/transactions/{side}", json={"asset_id": asset_id, "quantity": 0.001}, headers=headers)
+                    else:
+                        response = await client.get(READS[i % len(READS)], headers=headers)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed),
+        "p50_ms": round(latencies[len(latencies) // 2], 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)], 1),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--transactions", type=int, default=5000, help="ledger rows seeded for the user")
+    parser.add_argument("--trade-every", type=int, default=10, help="every Nth request is a buy/sell (0: reads only)")
+    args = parser.parse_args()
+
+    asset_id = seed(args.transactions)
+    for db_async in (False, True):
+        port = free_port()
+        server = start_server(db_async, port)
+        try:
+            result = asyncio.run(load(f"http://127.0.0.1:{port}", asset_id, args.concurrency, args.duration, args.trade_every))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{'async' if db_async else 'sync ':5} | {engine.dialect.name}, {args.concurrency} clients: {result}")
+
+
+if __name__ == "__main__":
+    main()
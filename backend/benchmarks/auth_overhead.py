@@ -0,0 +1,109 @@
+# benchmarks/auth_overhead.py
+"""
+Cost of resolving the caller of an authenticated request, with and
+without the user cache: time per get_current_user call and statements
+per request, over many users polling with their own tokens.
+
+    python -m benchmarks.auth_overhead --users 1000 --requests 20000
+    DATABASE_URL=postgresql://... python -m benchmarks.auth_overhead
+
+Without DATABASE_URL it runs on a throwaway SQLite file, where a query is
+a function call; against a networked database every miss also pays a
+round trip.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/auth.db"
+os.environ.setdefault("PRICE_REFRESHER_ENABLED", "false")
+os.environ.setdefault("NAV_SNAPSHOT_JOB_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert, select
+
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.user import User
+from app.services.dependecy import get_current_user
+from app.services.user_cache import user_cache
+
+RUN_ID = time.time_ns()
+
+
+def count_statements(bind) -> dict:
+    counter = {"statements": 0}
+
+    @event.listens_for(bind, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter["statements"] += 1
+
+    return counter
+
+
+def seed_users(count: int) -> list:
+    """Tokens for `count` new users, as login hands them out."""
+    emails = [f"auth-bench-{RUN_ID}-{i}@example.com" for i in range(count)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [{"email": email, "hashed_password": "-"} for email in emails])
+        db.commit()
+        rows = db.execute(select(User.id, User.email).where(User.email.in_(emails))).all()
+    return [create_access_token({"sub": email, "uid": user_id}) for user_id, email in rows]
+
+
+def run(label: str, tokens: list, requests: int, counter: dict, maxsize: int):
+    user_cache.maxsize = maxsize
+    user_cache.clear()
+    rng = random.Random(42)
+    picks = [rng.choice(tokens) for _ in range(requests)]
+    before, stats = counter["statements"], user_cache.stats()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        for token in picks:
+            get_current_user(token, db)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    statements = counter["statements"] - before
+    hits = user_cache.stats()["hits"] - stats["hits"]
+    print(f"{label:10} {elapsed / requests * 1e6:8.1f} us/request, {statements / requests:.3f} statements/request, "
+          f"hit rate {hits / requests:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine.echo = False
+    Base.metadata.create_all(engine)
+    tokens = seed_users(args.users)
+    counter = count_statements(engine)
+    maxsize = user_cache.maxsize
+
+    print(f"{args.requests} requests from {args.users} users on {engine.dialect.name}")
+    run("no cache", tokens, args.requests, counter, 0)
+    run("cache", tokens, args.requests, counter, maxsize)
+
+    # End to end: statements a GET spends on top of its own work
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {tokens[0]}"}
+    for label, size in (("no cache", 0), ("cache", maxsize)):
+        user_cache.maxsize = size
+        user_cache.clear()
+        client.get("/orders/", headers=headers)  # warm up
+        before = counter["statements"]
+        for _ in range(100):
+            client.get("/orders/", headers=headers)
+        print(f"GET /orders/ {label:10} {(counter['statements'] - before) / 100:.1f} statements/request")
+
+
+if __name__ == "__main__":
+    main()
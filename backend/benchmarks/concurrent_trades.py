@@ -0,0 +1,142 @@
+# benchmarks/concurrent_trades.py
+"""
+Hammer one wallet and one position from many threads and check that no
+update was lost: every deposit/buy/sell goes through trade_service's
+conditional UPDATEs, so the final balance and quantity must match the
+number of successful operations exactly.
+
+    python -m benchmarks.concurrent_trades --threads 32 --iterations 200
+    python -m benchmarks.concurrent_trades --naive   # old read-modify-write, for comparison
+
+Uses DATABASE_URL if set, otherwise a throwaway SQLite file.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/concurrent_trades.db"
+
+from sqlalchemy.exc import DBAPIError
+
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.asset import Asset
+from app.models.portfolio_entry import PortfolioEntry
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.services import trade_service
+from app.services.trade_service import TradeError
+
+PRICE = Decimal("10")
+DEPOSIT = Decimal("10")
+
+
+def setup():
+    engine.echo = False
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    user = User(email=f"bench-{time.time_ns()}@example.com", hashed_password="x")
+    asset = Asset(symbol=f"B{time.time_ns() % 10 ** 8}", name="Bench coin")
+    db.add_all([user, asset])
+    db.commit()
+    db.add(Wallet(user_id=user.id, balance=Decimal("0")))
+    db.commit()
+    ids = user.id, asset.id
+    db.close()
+    return ids
+
+
+def atomic_round(db, user_id, asset_id):
+    trade_service.credit_wallet(db, user_id, DEPOSIT)
+    db.commit()
+    trade_service.buy(db, user_id, asset_id, 1.0, PRICE)
+    db.commit()
+    trade_service.sell(db, user_id, asset_id, 1.0, PRICE)
+    db.commit()
+
+
+def naive_round(db, user_id, asset_id):
+    """What the routes used to do: read the row, change it in Python, write it back."""
+    wallet = db.query(Wallet).filter(Wallet.user_id == user_id).first()
+    wallet.balance += DEPOSIT
+    db.commit()
+    wallet = db.query(Wallet).filter(Wallet.user_id == user_id).first()
+    if wallet.balance < PRICE:
+        raise TradeError("Insufficient balance")
+    wallet.balance -= PRICE
+    entry = db.query(PortfolioEntry).filter_by(user_id=user_id, asset_id=asset_id).first()
+    if entry:
+        entry.quantity += 1.0
+    else:
+        db.add(PortfolioEntry(user_id=user_id, asset_id=asset_id, quantity=1.0, average_buy_price=float(PRICE)))
+    db.commit()
+    entry = db.query(PortfolioEntry).filter_by(user_id=user_id, asset_id=asset_id).first()
+    wallet = db.query(Wallet).filter(Wallet.user_id == user_id).first()
+    if not entry or entry.quantity < 1.0:
+        raise TradeError("Not enough quantity to sell")
+    entry.quantity -= 1.0
+    wallet.balance += PRICE
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--naive", action="store_true")
+    args = parser.parse_args()
+
+    user_id, asset_id = setup()
+    work = naive_round if args.naive else atomic_round
+    counts = {"rounds": 0, "rejected": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def worker():
+        db = SessionLocal()
+        try:
+            for _ in range(args.iterations):
+                outcome = "rounds"
+                try:
+                    work(db, user_id, asset_id)
+                except TradeError:
+                    outcome = "rejected"
+                    db.rollback()
+                except DBAPIError:
+                    outcome = "errors"  # e.g. "database is locked", duplicate entry
+                    db.rollback()
+                with lock:
+                    counts[outcome] += 1
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    balance = Decimal(db.query(Wallet.balance).filter(Wallet.user_id == user_id).scalar())
+    quantity = db.query(PortfolioEntry.quantity).filter_by(user_id=user_id, asset_id=asset_id).scalar() or 0.0
+    db.close()
+
+    # every completed round deposits DEPOSIT and nets out buy/sell; rejected or
+    # failed rounds may have committed their deposit, so only a lower bound is exact
+    operations = counts["rounds"] * 3
+    expected_min = DEPOSIT * counts["rounds"]
+    expected_max = DEPOSIT * (counts["rounds"] + counts["rejected"] + counts["errors"])
+    lost = not (expected_min <= balance <= expected_max) or quantity != 0
+    print(f"{'naive' if args.naive else 'atomic'} | {args.threads} threads x {args.iterations} rounds "
+          f"on {engine.dialect.name}: {operations / elapsed:.0f} ops/s, {counts}")
+    print(f"balance {balance} (expected {expected_min}..{expected_max}), quantity {quantity} (expected 0) "
+          f"-> {'LOST UPDATES' if lost else 'consistent'}")
+
+
+if __name__ == "__main__":
+    main()
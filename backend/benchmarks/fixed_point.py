@@ -0,0 +1,119 @@
+# benchmarks/fixed_point.py
+"""
+Compare the old float amounts with the fixed-point ones on the two things
+that matter for money: drift over many trades, and the cost per value of
+the arithmetic and of moving amounts in and out of the database. Checks
+the rounding of the conversions first, and that the fixed-point round
+trip leaves exactly nothing behind.
+
+    python -m benchmarks.fixed_point --trades 100000
+"""
+import argparse
+import random
+from fractions import Fraction
+import time
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from app.core.fixed_point import (
+    MONEY_PLACES, PRICE_PLACES, QUANTITY_PLACES, from_units, notional, quantize, to_units,
+)
+
+
+def _time(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def check_conversions(rng: random.Random):
+    """Rounding of the conversions against plain Decimal arithmetic; raises AssertionError on a mismatch."""
+    # half-even at the last place, both signs
+    assert to_units(Decimal("0.000000005"), 8) == 0
+    assert to_units(Decimal("0.000000015"), 8) == 2
+    assert to_units(Decimal("0.000000025"), 8) == 2
+    assert to_units(Decimal("-0.000000015"), 8) == -2
+    assert to_units(Decimal("0.0000000051"), 8) == 1
+    # ints are whole amounts, floats go through their repr, strings are parsed
+    assert to_units(5, MONEY_PLACES) == 500
+    assert to_units(0.1, MONEY_PLACES) == 10
+    assert to_units(0.1 + 0.2, PRICE_PLACES) == 30000000
+    assert to_units(1e-8, QUANTITY_PLACES) == 1
+    assert to_units("19.999", MONEY_PLACES) == 2000
+    assert from_units(to_units(Decimal("123.45678901"), 8), 8) == Decimal("123.45678901")
+    assert quantize(Decimal("2.675"), MONEY_PLACES) == Decimal("2.68")
+
+    # notional is the exact product rounded half-even to the cent (round() of a Fraction is half-even too)
+    def exact(q, p):
+        return Decimal(round(Fraction(q) * Fraction(p) * 10 ** MONEY_PLACES)).scaleb(-MONEY_PLACES)
+
+    assert notional(Decimal("0.5"), Decimal("0.01")) == Decimal("0.00")
+    assert notional(Decimal("1.5"), Decimal("0.01")) == Decimal("0.02")
+    assert notional(Decimal("-1.5"), Decimal("0.01")) == Decimal("-0.02")
+    assert notional(Decimal("0.00000001"), Decimal("0.00000001")) == Decimal("0.00")
+    assert notional(Decimal("92233720368.54775807"), Decimal("100000")) == Decimal("9223372036854775.81")
+    # the widest operands: a rounding at 28 digits (the default context) would go wrong here
+    big = (Decimal("92233720368.54775807"), Decimal("92233.72036854775807"))
+    assert notional(*big) == exact(*big)
+    for _ in range(10000):
+        q = Decimal(rng.randrange(-10 ** 19, 10 ** 19)).scaleb(-QUANTITY_PLACES)
+        p = Decimal(rng.randrange(1, 10 ** 13)).scaleb(-PRICE_PLACES)
+        assert notional(q, p) == exact(q, p), (q, p)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trades", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    check_conversions(rng)
+    print("conversion checks passed")
+
+    # 8-place quantities and prices, as they arrive from clients and price feeds
+    quantities = [Decimal(rng.randrange(1, 10 ** 9)).scaleb(-QUANTITY_PLACES) for _ in range(args.trades)]
+    prices = [Decimal(rng.randrange(10 ** 6, 10 ** 13)).scaleb(-PRICE_PLACES) for _ in range(args.trades)]
+    float_quantities = [float(q) for q in quantities]
+    float_prices = [float(p) for p in prices]
+
+    # Drift: buy every trade then sell it all back at the same price; cash must return to zero
+    cash_float = 0.0
+    for q, p in zip(float_quantities, float_prices):
+        cash_float -= q * p
+    for q, p in zip(float_quantities, float_prices):
+        cash_float += q * p
+    cash_fixed = Decimal(0)
+    for q, p in zip(quantities, prices):
+        cash_fixed -= notional(q, p)
+    for q, p in zip(quantities, prices):
+        cash_fixed += notional(q, p)
+    # and the position sold back in reverse order
+    held_float = sum(float_quantities) - sum(float_quantities[::-1])
+    held_fixed = sum(quantities) - sum(quantities[::-1])
+    print(f"round trip of {args.trades} trades: cash left float {cash_float!r}, fixed {cash_fixed}; "
+          f"quantity left float {held_float!r}, fixed {held_fixed}")
+    assert cash_fixed == 0 and held_fixed == 0
+
+    n = args.trades
+    results = {
+        "notional, float": _time(lambda: [q * p for q, p in zip(float_quantities, float_prices)], args.runs),
+        "notional, Decimal": _time(lambda: [q * p for q, p in zip(quantities, prices)], args.runs),
+        "notional (to cents)": _time(lambda: [notional(q, p) for q, p in zip(quantities, prices)], args.runs),
+        "load, Decimal(str(float))": _time(lambda: [Decimal(str(p)) for p in float_prices], args.runs),
+        "load, from_units": _time(
+            lambda units=[to_units(p, PRICE_PLACES) for p in prices]: [from_units(u, PRICE_PLACES) for u in units],
+            args.runs,
+        ),
+        "store, to_units(Decimal)": _time(lambda: [to_units(p, PRICE_PLACES) for p in prices], args.runs),
+        "store, to_units(float)": _time(lambda: [to_units(p, MONEY_PLACES) for p in float_prices], args.runs),
+    }
+    for name, seconds in results.items():
+        print(f"{name:32} {seconds / n * 1e9:8.0f} ns/value")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/fixed_point_migration.py
+"""
+Round trip of the fixed-point migration (0004) on a filled database:
+builds the schema at 0003, puts a row with off-grid amounts in every
+table 0004 touches, upgrades and checks each amount became its rounded
+count of units, then downgrades and checks the rounded amount came back.
+Times both directions over --rows copies of those rows.
+
+    python -m benchmarks.fixed_point_migration
+    python -m benchmarks.fixed_point_migration --rows 100000
+
+Uses DATABASE_URL if set (it must point at an empty database), otherwise
+a throwaway SQLite file.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/fixed_point_migration.db"
+
+from alembic import command
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from app.core.fixed_point import quantize, to_units
+from app.db.session import engine
+from create_tables import alembic_config
+
+NOW = datetime(2026, 1, 1)
+
+# the columns of each table 0004 converts, besides user_id and the amounts
+# (row n belongs to user n, which keeps the per-user unique keys apart)
+OTHER_COLUMNS = {
+    "wallet": {"currency": "USD"},
+    "portfolio_entries": {"asset_id": 1},
+    "transactions": {"portfolio_entry_id": 1, "asset_id": 1, "type": "buy", "date": NOW},
+    "tax_lots": {"asset_id": 1, "transaction_id": 1, "acquired_at": NOW},
+    "realized_gains": {"asset_id": 1, "lot_id": 1, "transaction_id": 1, "sold_at": NOW},
+    "orders": {"asset_id": 1, "side": "buy", "type": "limit", "status": "filled", "created_at": NOW},
+    "nav_snapshots": {"day": NOW.date()},
+}
+
+
+def amount(places: int, n: int) -> Decimal:
+    """A distinct value per column with one digit more than it keeps, rounding down or up but never a tie."""
+    return Decimal(f"{12345 + n}.{'678901234'[:places]}{3 if n % 2 else 7}")
+
+
+def fill(columns: dict, rows: int) -> dict:
+    """
+    Insert `rows` copies of each table's row, amounts bound as floats like
+    the old Float columns were written. Returns {(table, column): value}.
+    """
+    expected = {}
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO assets (id, symbol, name) VALUES (1, 'BTC', 'Bitcoin')"))
+        conn.execute(
+            text("INSERT INTO users (id, email, hashed_password) VALUES (:id, :email, '-')"),
+            [{"id": i, "email": f"migration-{i}@example.com"} for i in range(1, rows + 1)],
+        )
+        n = 0
+        for table, amounts in columns.items():
+            values = dict(OTHER_COLUMNS[table])
+            for column, (places, _, _) in amounts.items():
+                n += 1
+                expected[table, column] = amount(places, n)
+                values[column] = float(expected[table, column])
+            conn.execute(
+                text(f"INSERT INTO {table} (id, user_id, {', '.join(values)}) "
+                     f"VALUES (:id, :id, {', '.join(':' + k for k in values)})"),
+                [dict(values, id=i) for i in range(1, rows + 1)],
+            )
+    return expected
+
+
+def read(columns: dict) -> dict:
+    with engine.connect() as conn:
+        return {
+            (table, column): value
+            for table, amounts in columns.items()
+            for column, value in conn.execute(text(f"SELECT {', '.join(amounts)} FROM {table} WHERE id = 1")).one()._mapping.items()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    engine.echo = False
+    config = alembic_config()
+    columns = ScriptDirectory.from_config(config).get_revision("0004").module.COLUMNS
+    command.upgrade(config, "0003")
+    expected = fill(columns, args.rows)
+    ok = True
+
+    start = time.perf_counter()
+    command.upgrade(config, "0004")
+    print(f"upgrade to 0004 on {engine.dialect.name}, {args.rows} rows per table: {time.perf_counter() - start:.2f}s")
+    for (table, column), value in read(columns).items():
+        places = columns[table][column][0]
+        if value != to_units(expected[table, column], places):
+            ok = False
+            print(f"  FAIL {table}.{column}: {expected[table, column]} became {value} units")
+
+    start = time.perf_counter()
+    command.downgrade(config, "0003")
+    print(f"downgrade to 0003: {time.perf_counter() - start:.2f}s")
+    for (table, column), value in read(columns).items():
+        places = columns[table][column][0]
+        if quantize(value, places) != quantize(expected[table, column], places):
+            ok = False
+            print(f"  FAIL {table}.{column}: {expected[table, column]} came back as {value}")
+
+    print("all checks passed" if ok else "some checks failed")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/hedged_fetch.py
+"""
+Compare plain vs hedged price fetches against two local stub servers.
+
+    python -m benchmarks.hedged_fetch --requests 400 --primary-tail-ratio 0.05
+"""
+import argparse
+import json
+import time
+
+from app.services.hedging import HedgedProvider
+from app.services.market_providers import CoinGeckoProvider
+from benchmarks.stub_price_server import StubPriceServer
+
+SYMBOLS = ["BTC", "ETH", "ADA"]
+
+
+def percentiles(samples: list) -> dict:
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))], 2)
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(samples[-1], 2)}
+
+
+def run(provider, n: int) -> list:
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        provider.fetch_prices(SYMBOLS)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--primary-delay-ms", type=float, default=15)
+    parser.add_argument("--primary-tail-ms", type=float, default=600)
+    parser.add_argument("--primary-tail-ratio", type=float, default=0.05)
+    parser.add_argument("--secondary-delay-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    primary_server = StubPriceServer(delay_ms=args.primary_delay_ms, tail_ms=args.primary_tail_ms,
+                                     tail_ratio=args.primary_tail_ratio, seed=1).start()
+    secondary_server = StubPriceServer(delay_ms=args.secondary_delay_ms, seed=2).start()
+    try:
+        plain = CoinGeckoProvider(base_url=primary_server.base_url)
+        print("plain  ", percentiles(run(plain, args.requests)))
+
+        hedged = HedgedProvider(
+            CoinGeckoProvider(base_url=primary_server.base_url),
+            CoinGeckoProvider(base_url=secondary_server.base_url),
+            initial_delay_ms=args.primary_delay_ms * 3
+        )
+        print("hedged ", percentiles(run(hedged, args.requests)))
+        stats = hedged.stats()
+        print(json.dumps({k: stats[k] for k in ("hedge_delay_ms", "hedges_sent", "wins")}, indent=2))
+        plain.close()
+        hedged.close()
+    finally:
+        primary_server.stop()
+        secondary_server.stop()
+
+
+if __name__ == "__main__":
+    main()
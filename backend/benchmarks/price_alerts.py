@@ -0,0 +1,73 @@
+# benchmarks/price_alerts.py
+"""
+Time alert evaluation against a large in-memory index: load N alerts
+spread around a few symbols' prices, then replay a random walk and time
+each tick. Compares with a linear scan of every alert per tick.
+
+    python -m benchmarks.price_alerts --alerts 2000000 --ticks 1000
+"""
+import argparse
+import random
+import time
+
+from app.services.price_alerts import AlertEngine
+
+SYMBOLS = {"BTC": 50000.0, "ETH": 3000.0, "SOL": 150.0, "ADA": 0.5, "DOGE": 0.1}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alerts", type=int, default=2_000_000)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--scan-ticks", type=int, default=5, help="ticks timed with the linear scan")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    symbols = list(SYMBOLS)
+    alerts = []
+    for alert_id in range(1, args.alerts + 1):
+        symbol = rng.choice(symbols)
+        # thresholds within +-20% of the starting price, where the walk will go
+        threshold = SYMBOLS[symbol] * rng.uniform(0.8, 1.2)
+        alerts.append((alert_id, symbol, rng.choice(("above", "below", "cross")), threshold))
+
+    engine = AlertEngine()
+    start = time.perf_counter()
+    engine.load(alerts)
+    print(f"loaded {args.alerts} alerts in {time.perf_counter() - start:.2f} s")
+
+    prices = dict(SYMBOLS)
+    for symbol, price in prices.items():
+        engine.evaluate(symbol, price)  # baseline tick
+
+    timings, fired = [], 0
+    for _ in range(args.ticks):
+        tick = {symbol: price * (1 + rng.gauss(0, 0.002)) for symbol, price in prices.items()}
+        start = time.perf_counter()
+        for symbol, price in tick.items():
+            fired += len(engine.evaluate(symbol, price))
+        timings.append((time.perf_counter() - start) * 1e6)
+        prices = tick
+    timings.sort()
+    print(f"indexed: {args.ticks} ticks x {len(symbols)} symbols, {fired} fired: "
+          f"median {timings[len(timings) // 2]:.0f} us, p99 {timings[int(len(timings) * 0.99)]:.0f} us per tick")
+
+    # what a naive evaluator does: test every resting alert on every tick
+    scan = [(symbol, direction, threshold) for _, symbol, direction, threshold in alerts]
+    scan_timings = []
+    for _ in range(args.scan_ticks):
+        tick = {symbol: price * (1 + rng.gauss(0, 0.002)) for symbol, price in prices.items()}
+        start = time.perf_counter()
+        hits = 0
+        for symbol, direction, threshold in scan:
+            old, new = prices[symbol], tick[symbol]
+            if (direction != "below" and old < threshold <= new) or (direction != "above" and new <= threshold < old):
+                hits += 1
+        scan_timings.append((time.perf_counter() - start) * 1e6)
+        prices = tick
+    scan_timings.sort()
+    print(f"linear scan: median {scan_timings[len(scan_timings) // 2]:.0f} us per tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/query_plans.py
+"""
+Query plans and latencies of the hot lookups before and after the
+migrations' indexes. Builds the baseline schema (revision 0001, what the
+old create_all produced), fills it with a ledger of --transactions rows,
+measures, runs `alembic upgrade head` on the filled database (timed) and
+measures again.
+
+    python -m benchmarks.query_plans --transactions 1000000
+    python -m benchmarks.query_plans --users 200 --transactions 100000
+
+Uses DATABASE_URL if set (it must point at an empty database), otherwise
+a throwaway SQLite file.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/query_plans.db"
+
+from alembic import command
+from sqlalchemy import text
+
+from app.db.session import engine
+from create_tables import alembic_config
+
+CHUNK_SIZE = 10000
+
+QUERIES = {
+    # every buy/sell: the position upsert
+    "entry by user/asset": (
+        "SELECT id, quantity, average_buy_price FROM portfolio_entries "
+        "WHERE user_id = :user_id AND asset_id = :asset_id"
+    ),
+    # GET /transactions/, first page
+    "ledger page": (
+        "SELECT * FROM transactions WHERE user_id = :user_id "
+        "ORDER BY date DESC, id DESC LIMIT 51"
+    ),
+    # GET /transactions/?cursor=..., deep in the history
+    "keyset page": (
+        "SELECT * FROM transactions WHERE user_id = :user_id AND (date, id) < (:date, :id) "
+        "ORDER BY date DESC, id DESC LIMIT 51"
+    ),
+    # login and every authenticated request
+    "user by email": "SELECT id, hashed_password FROM users WHERE email = :email",
+    # portfolio, snapshots, exports
+    "holdings by user": "SELECT asset_id, quantity, average_buy_price FROM portfolio_entries WHERE user_id = :user_id",
+}
+
+
+def seed(users: int, assets: int, transactions: int):
+    start = datetime(2020, 1, 1)
+    rng = random.Random(1)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (:id, :email, 'x')"),
+                     [{"id": i, "email": f"user{i}@example.com"} for i in range(1, users + 1)])
+        conn.execute(text("INSERT INTO assets (id, symbol, name) VALUES (:id, :symbol, :symbol)"),
+                     [{"id": i, "symbol": f"C{i}"} for i in range(1, assets + 1)])
+        conn.execute(text(
+            "INSERT INTO portfolio_entries (id, user_id, asset_id, quantity, average_buy_price) "
+            "VALUES (:id, :user_id, :asset_id, 1, 100)"
+        ), [{"id": (u - 1) * assets + a, "user_id": u, "asset_id": a}
+            for u in range(1, users + 1) for a in range(1, assets + 1)])
+    insert = text(
+        "INSERT INTO transactions (user_id, portfolio_entry_id, asset_id, type, quantity, price, date) "
+        "VALUES (:user_id, :entry_id, :asset_id, 'buy', 1, 100, :date)"
+    )
+    for offset in range(0, transactions, CHUNK_SIZE):
+        rows = []
+        for n in range(offset, min(offset + CHUNK_SIZE, transactions)):
+            user_id, asset_id = rng.randint(1, users), rng.randint(1, assets)
+            rows.append({
+                "user_id": user_id,
+                "asset_id": asset_id,
+                "entry_id": (user_id - 1) * assets + asset_id,
+                "date": start + timedelta(minutes=n),
+            })
+        with engine.begin() as conn:
+            conn.execute(insert, rows)
+
+
+def sample_params(conn, users: int, assets: int, rng: random.Random) -> dict:
+    user_id = rng.randint(1, users)
+    # a cursor halfway through the user's history
+    middle = conn.execute(text(
+        "SELECT date, id FROM transactions WHERE user_id = :user_id ORDER BY date, id "
+        "LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM transactions WHERE user_id = :user_id)"
+    ), {"user_id": user_id}).first()
+    return {
+        "user_id": user_id,
+        "asset_id": rng.randint(1, assets),
+        "email": f"user{user_id}@example.com",
+        "date": middle.date if middle else datetime(2020, 1, 1),
+        "id": middle.id if middle else 0,
+    }
+
+
+def explain(conn, sql: str, params: dict) -> str:
+    if engine.dialect.name == "sqlite":
+        return "; ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params))
+    return "; ".join(row[0].strip() for row in conn.execute(text("EXPLAIN " + sql), params))
+
+
+def measure(label: str, users: int, assets: int, runs: int):
+    print(f"\n{label}")
+    rng = random.Random(2)
+    with engine.connect() as conn:
+        params = [sample_params(conn, users, assets, rng) for _ in range(runs)]
+        for name, sql in QUERIES.items():
+            timings = []
+            for p in params:
+                t0 = time.perf_counter()
+                conn.execute(text(sql), p).all()
+                timings.append((time.perf_counter() - t0) * 1000)
+            print(f"  {name:20} median {statistics.median(timings):8.3f} ms   max {max(timings):8.3f} ms")
+            print(f"  {'':20} {explain(conn, sql, params[0])}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    engine.echo = False
+    config = alembic_config()
+    command.upgrade(config, "0001")
+
+    t0 = time.perf_counter()
+    seed(args.users, args.assets, args.transactions)
+    print(f"{engine.url.render_as_string()}: seeded {args.users} users, {args.users * args.assets} positions, "
+          f"{args.transactions} transactions in {time.perf_counter() - t0:.1f}s")
+
+    measure("revision 0001 (create_all schema)", args.users, args.assets, args.runs)
+
+    t0 = time.perf_counter()
+    command.upgrade(config, "head")
+    print(f"\nupgrade to head: {time.perf_counter() - t0:.1f}s")
+    # pooled connections keep statements prepared against the old schema
+    engine.dispose()
+
+    measure("head", args.users, args.assets, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/read_replicas.py
+"""
+Check read-replica routing end to end with two local databases: reads go
+to the replica, writes to the primary, and a user's reads stick to the
+primary for READ_YOUR_WRITES_SECONDS after their own trade.
+
+With the default throwaway SQLite files the "replica" is a copy of the
+primary taken with SQLite's backup API whenever the script says so, which
+makes replication lag explicit: between copies the replica serves the old
+balance, unless the reader just wrote.
+
+    python -m benchmarks.read_replicas
+    python -m benchmarks.read_replicas --reads 2000   # plus a read-mostly load split
+    DATABASE_URL=postgresql://primary/... DATABASE_REPLICA_URLS=postgresql://standby/... python -m benchmarks.read_replicas
+
+With real replicas (DATABASE_REPLICA_URLS set) the copy step is skipped and
+the stale read is only reported, since streaming replication may already
+have caught up.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+SIMULATED = not os.getenv("DATABASE_REPLICA_URLS")
+if SIMULATED:
+    _dir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{_dir}/primary.db"
+    os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{_dir}/replica.db"
+os.environ.setdefault("READ_YOUR_WRITES_SECONDS", "1")
+os.environ.setdefault("MARKET_DATA_PROVIDER", "replay")
+os.environ.setdefault("MARKET_DATA_REPLAY_PATH", os.path.join(os.path.dirname(__file__), "..", "fixtures", "prices.jsonl"))
+os.environ.setdefault("MAX_PRICE_AGE_SECONDS", "1e12")  # replayed prices are old
+os.environ.setdefault("PRICE_REFRESHER_ENABLED", "false")
+os.environ.setdefault("NAV_SNAPSHOT_JOB_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.replicas import READ_YOUR_WRITES_COOKIE, get_replica_stats, recent_writers, replica_engines
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.asset import Asset
+
+EMAIL, PASSWORD = f"bench-{time.time_ns()}@example.com", "bench"
+READS = ["/wallet/balance", "/portfolios/", "/portfolios/summary", "/transactions/?limit=50", "/assets/"]
+
+
+def count_statements(bind) -> dict:
+    counter = {"statements": 0}
+
+    @event.listens_for(bind, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter["statements"] += 1
+
+    return counter
+
+
+def replicate():
+    """Copy the primary into the replica (simulated mode only)."""
+    if not SIMULATED:
+        return
+    with sqlite3.connect(engine.url.database) as source, sqlite3.connect(replica_engines[0].url.database) as target:
+        source.backup(target)
+
+
+def balance(client, headers) -> float:
+    return float(client.get("/wallet/balance", headers=headers).json()["balance"])
+
+
+def check(label: str, ok: bool, detail: str):
+    print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reads", type=int, default=0, help="extra mixed GETs after the checks, to show the load split")
+    args = parser.parse_args()
+
+    engine.echo = False
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    if not db.query(Asset).filter_by(symbol="BTC").first():
+        db.add(Asset(symbol="BTC", name="Bitcoin"))
+        db.commit()
+    asset_id = db.query(Asset.id).filter_by(symbol="BTC").scalar()
+    db.close()
+
+    primary_counter = count_statements(engine)
+    replica_counters = [count_statements(replica) for replica in replica_engines]
+
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": EMAIL, "password": PASSWORD})
+    token = client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/wallet/deposit", json={"amount": 100000}, headers=headers)
+    time.sleep(settings.READ_YOUR_WRITES_SECONDS)
+    replicate()
+
+    print(f"primary {engine.url.render_as_string()}, replicas {[r.url.render_as_string() for r in replica_engines]}, "
+          f"read-your-writes window {settings.READ_YOUR_WRITES_SECONDS}s")
+    replicated = balance(client, headers)
+    ok = check("replicated read", replicated == 100000, f"balance {replicated}")
+
+    client.post("/transactions/buy", json={"asset_id": asset_id, "quantity": 0.1}, headers=headers)
+    after_trade = balance(client, headers)
+    ok &= check("read right after own trade", after_trade < replicated, f"balance {after_trade} (primary)")
+
+    cookie = client.cookies.get(READ_YOUR_WRITES_COOKIE)
+    client.cookies.clear()
+    ok &= check("same worker, client without cookies", balance(client, headers) == after_trade, "primary (recent writers)")
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, cookie)
+    recent_writers._until.clear()  # as if the read landed on a worker that didn't serve the trade
+    ok &= check("another worker, cookie only", balance(client, headers) == after_trade, "primary (cookie)")
+
+    time.sleep(settings.READ_YOUR_WRITES_SECONDS)
+    lagging = balance(client, headers)
+    if SIMULATED:
+        ok &= check("read after the window, replica not caught up", lagging == replicated, f"balance {lagging} (replica)")
+    else:
+        print(f"  --   read after the window: balance {lagging} (replica)")
+
+    replicate()
+    caught_up = balance(client, headers)
+    ok &= check("read after replication", caught_up == after_trade, f"balance {caught_up}")
+
+    for i in range(args.reads):
+        client.get(READS[i % len(READS)], headers=headers)
+
+    print(f"statements: primary {primary_counter['statements']}, "
+          f"replicas {[counter['statements'] for counter in replica_counters]}")
+    print(f"read sessions: {get_replica_stats()}")
+    print("all checks passed" if ok else "some checks failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/stub_price_server.py
+"""
+Local stand-in for CoinGecko's /simple/price with configurable latency, so
+market data code can be exercised without network access.
+
+    python -m benchmarks.stub_price_server --port 9001 --delay-ms 20 --tail-ms 800 --tail-ratio 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_PRICES = {"bitcoin": 43250.12, "ethereum": 2284.55, "cardano": 0.5821}
+
+
+class StubPriceServer:
+    """
+    Serves {coin_id: {"usd": price}} after `delay_ms`, or `tail_ms` for a
+    `tail_ratio` fraction of requests. `status_code` can be switched at
+    runtime to simulate 429/5xx.
+    """
+
+    def __init__(self, port: int = 0, delay_ms: float = 0, tail_ms: float = 0, tail_ratio: float = 0,
+                 prices: dict = None, seed: int = None):
+        self.delay_ms = delay_ms
+        self.tail_ms = tail_ms
+        self.tail_ratio = tail_ratio
+        self.prices = prices or dict(DEFAULT_PRICES)
+        self.status_code = 200
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    slow = stub._random.random() < stub.tail_ratio
+                time.sleep((stub.tail_ms if slow else stub.delay_ms) / 1000)
+
+                query = parse_qs(urlparse(self.path).query)
+                ids = query.get("ids", [""])[0].split(",")
+                if stub.status_code == 200:
+                    body = {cid: {"usd": stub.prices[cid]} for cid in ids if cid in stub.prices}
+                else:
+                    body = {"status": {"error_code": stub.status_code}}
+                payload = json.dumps(body).encode()
+                self.send_response(stub.status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--delay-ms", type=float, default=20)
+    parser.add_argument("--tail-ms", type=float, default=0)
+    parser.add_argument("--tail-ratio", type=float, default=0)
+    args = parser.parse_args()
+    server = StubPriceServer(args.port, args.delay_ms, args.tail_ms, args.tail_ratio)
+    print(f"Stub price server on {server.base_url}")
+    server.httpd.serve_forever()
@@ -1,4 +1,19 @@
 # create_tables.py
+"""
+Bring the database schema up to date by running the migrations in
+migrations/versions (same as `alembic upgrade head`). Safe to run on every
+deploy; a database created by the old create_all version of this script is
+upgraded in place.
+
+    python create_tables.py            # upgrade to the latest revision
+    python create_tables.py --reset    # drop everything first (destroys data)
+"""
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
 
 from app.db.base import Base
 from app.db.session import engine
@@ -8,11 +23,26 @@ from app.models.user import User
 from app.models.asset import Asset
 from app.models.portfolio_entry import PortfolioEntry
 from app.models.transaction import Transaction
+from app.models.wallet import Wallet
+from app.models.nav_snapshot import NavSnapshot
+from app.models.tax_lot import TaxLot, RealizedGain
+from app.models.order import Order
+from app.models.price_alert import PriceAlert, AlertNotification
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+def alembic_config() -> Config:
+    return Config(ALEMBIC_INI)
+
 
-def create_all_tables():
-    Base.metadata.drop_all(bind=engine)  # Optional: drops existing tables
-    Base.metadata.create_all(bind=engine)
-    print("Tables created successfully!")
+def create_all_tables(reset: bool = False):
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    command.upgrade(alembic_config(), "head")
+    print("Database schema is up to date!")
 
 if __name__ == "__main__":
-    create_all_tables()
+    create_all_tables(reset="--reset" in sys.argv)
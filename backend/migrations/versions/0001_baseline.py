@@ -0,0 +1,76 @@
+"""baseline: the schema create_tables.py used to build
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created with create_all before migrations existed already have
+some or all of these tables; those are left alone, so `alembic upgrade
+head` works on them as well as on an empty database.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False, unique=True),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+        )
+    if "assets" not in existing:
+        op.create_table(
+            "assets",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("symbol", sa.String(50), nullable=False, unique=True),
+            sa.Column("name", sa.String(100), nullable=False),
+        )
+    if "portfolio_entries" not in existing:
+        op.create_table(
+            "portfolio_entries",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id"), nullable=False),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("average_buy_price", sa.Float(), nullable=False),
+        )
+    if "transactions" not in existing:
+        op.create_table(
+            "transactions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("portfolio_entry_id", sa.Integer(), sa.ForeignKey("portfolio_entries.id"), nullable=False),
+            sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id"), nullable=False),
+            sa.Column("type", sa.String(10), nullable=False),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("price", sa.Float(), nullable=False),
+            sa.Column("date", sa.DateTime()),
+        )
+    if "wallet" not in existing:
+        op.create_table(
+            "wallet",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True),
+            sa.Column("balance", sa.Numeric(18, 2), nullable=False),
+            sa.Column("currency", sa.String(10), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_wallet_id", "wallet", ["id"])
+
+
+def downgrade():
+    op.drop_table("wallet")
+    op.drop_table("transactions")
+    op.drop_table("portfolio_entries")
+    op.drop_table("assets")
+    op.drop_table("users")
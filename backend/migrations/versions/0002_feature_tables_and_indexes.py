@@ -0,0 +1,183 @@
+"""feature tables, one position per user/asset, ledger index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Adds the tables for NAV snapshots, tax lots, resting orders and price
+alerts. Also adds the indexes behind the hot lookups:
+  - portfolio_entries (user_id, asset_id), unique: every trade's position
+    lookup/upsert. Duplicate positions from before the constraint are
+    merged first.
+  - transactions (user_id, date, id): keyset-paginated history and the
+    tax-lot replay.
+users.email and wallet.user_id are already covered by their unique
+constraints. The ledger keeps its rows when a position is sold out:
+transactions.portfolio_entry_id becomes nullable, ON DELETE SET NULL.
+
+Like 0001, anything create_all already built is skipped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# names SQLite's unnamed constraints get when batch mode reflects them
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _merge_duplicate_entries(bind):
+    duplicates = bind.execute(sa.text(
+        "SELECT user_id, asset_id FROM portfolio_entries GROUP BY user_id, asset_id HAVING COUNT(*) > 1"
+    )).all()
+    for user_id, asset_id in duplicates:
+        rows = bind.execute(sa.text(
+            "SELECT id, quantity, average_buy_price FROM portfolio_entries "
+            "WHERE user_id = :user_id AND asset_id = :asset_id ORDER BY id"
+        ), {"user_id": user_id, "asset_id": asset_id}).all()
+        keep, others = rows[0].id, [row.id for row in rows[1:]]
+        quantity = sum(row.quantity for row in rows)
+        average = sum(row.quantity * row.average_buy_price for row in rows) / quantity if quantity else rows[0].average_buy_price
+        bind.execute(sa.text(
+            "UPDATE portfolio_entries SET quantity = :quantity, average_buy_price = :average WHERE id = :id"
+        ), {"quantity": quantity, "average": average, "id": keep})
+        for other in others:
+            bind.execute(sa.text("UPDATE transactions SET portfolio_entry_id = :keep WHERE portfolio_entry_id = :other"),
+                         {"keep": keep, "other": other})
+            bind.execute(sa.text("DELETE FROM portfolio_entries WHERE id = :other"), {"other": other})
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+
+    # portfolio_entries: one row per user and asset
+    if "uq_portfolio_entries_user_asset" not in {c["name"] for c in inspector.get_unique_constraints("portfolio_entries")}:
+        _merge_duplicate_entries(bind)
+        with op.batch_alter_table("portfolio_entries") as batch:
+            batch.create_unique_constraint("uq_portfolio_entries_user_asset", ["user_id", "asset_id"])
+
+    # transactions: nullable entry reference, cleared when the entry is deleted
+    entry_fk = next(fk for fk in inspector.get_foreign_keys("transactions") if fk["constrained_columns"] == ["portfolio_entry_id"])
+    if entry_fk.get("options", {}).get("ondelete") != "SET NULL":
+        with op.batch_alter_table("transactions", naming_convention=NAMING_CONVENTION) as batch:
+            batch.alter_column("portfolio_entry_id", existing_type=sa.Integer(), nullable=True)
+            batch.drop_constraint(entry_fk["name"] or "fk_transactions_portfolio_entry_id_portfolio_entries", type_="foreignkey")
+            batch.create_foreign_key(
+                "fk_transactions_portfolio_entry_id_portfolio_entries", "portfolio_entries",
+                ["portfolio_entry_id"], ["id"], ondelete="SET NULL",
+            )
+    if "ix_transactions_user_date_id" not in {i["name"] for i in inspector.get_indexes("transactions")}:
+        op.create_index("ix_transactions_user_date_id", "transactions", ["user_id", "date", "id"])
+
+    if "nav_snapshots" not in existing:
+        op.create_table(
+            "nav_snapshots",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("holdings_value", sa.Numeric(18, 2), nullable=False),
+            sa.Column("cash_balance", sa.Numeric(18, 2), nullable=False),
+            sa.Column("nav", sa.Numeric(18, 2), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+            sa.UniqueConstraint("user_id", "day", name="uq_nav_snapshots_user_day"),
+        )
+    if "tax_lots" not in existing:
+        op.create_table(
+            "tax_lots",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id"), nullable=False),
+            sa.Column("transaction_id", sa.Integer(), sa.ForeignKey("transactions.id", ondelete="SET NULL")),
+            sa.Column("acquired_at", sa.DateTime(), nullable=False),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("remaining", sa.Float(), nullable=False),
+            sa.Column("cost_price", sa.Float(), nullable=False),
+        )
+        op.create_index("ix_tax_lots_user_asset_acquired", "tax_lots", ["user_id", "asset_id", "acquired_at", "id"])
+    if "realized_gains" not in existing:
+        op.create_table(
+            "realized_gains",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id"), nullable=False),
+            sa.Column("lot_id", sa.Integer(), sa.ForeignKey("tax_lots.id", ondelete="SET NULL")),
+            sa.Column("transaction_id", sa.Integer(), sa.ForeignKey("transactions.id", ondelete="SET NULL")),
+            sa.Column("acquired_at", sa.DateTime()),
+            sa.Column("sold_at", sa.DateTime(), nullable=False),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("cost_price", sa.Float(), nullable=False),
+            sa.Column("sale_price", sa.Float(), nullable=False),
+            sa.Column("gain", sa.Float(), nullable=False),
+        )
+        op.create_index("ix_realized_gains_user_sold", "realized_gains", ["user_id", "sold_at"])
+    if "orders" not in existing:
+        op.create_table(
+            "orders",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id"), nullable=False),
+            sa.Column("side", sa.String(4), nullable=False),
+            sa.Column("type", sa.String(5), nullable=False),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("trigger_price", sa.Float(), nullable=False),
+            sa.Column("status", sa.String(10), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("filled_at", sa.DateTime()),
+            sa.Column("fill_price", sa.Float()),
+            sa.Column("transaction_id", sa.Integer(), sa.ForeignKey("transactions.id", ondelete="SET NULL")),
+            sa.Column("error", sa.String(255)),
+        )
+        op.create_index("ix_orders_status_id", "orders", ["status", "id"])
+        op.create_index("ix_orders_user_created", "orders", ["user_id", "created_at"])
+    if "price_alerts" not in existing:
+        op.create_table(
+            "price_alerts",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id"), nullable=False),
+            sa.Column("threshold", sa.Float(), nullable=False),
+            sa.Column("direction", sa.String(5), nullable=False),
+            sa.Column("status", sa.String(10), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("fired_at", sa.DateTime()),
+            sa.Column("fired_price", sa.Float()),
+        )
+        op.create_index("ix_price_alerts_status_id", "price_alerts", ["status", "id"])
+        op.create_index("ix_price_alerts_user_id", "price_alerts", ["user_id"])
+    if "alert_outbox" not in existing:
+        op.create_table(
+            "alert_outbox",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("alert_id", sa.Integer(), sa.ForeignKey("price_alerts.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("symbol", sa.String(50), nullable=False),
+            sa.Column("threshold", sa.Float(), nullable=False),
+            sa.Column("direction", sa.String(5), nullable=False),
+            sa.Column("previous_price", sa.Float(), nullable=False),
+            sa.Column("price", sa.Float(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_alert_outbox_user_id", "alert_outbox", ["user_id", "id"])
+
+
+def downgrade():
+    for table in ("alert_outbox", "price_alerts", "orders", "realized_gains", "tax_lots", "nav_snapshots"):
+        op.drop_table(table)
+    op.drop_index("ix_transactions_user_date_id", table_name="transactions")
+    # portfolio_entry_id stays nullable: trades of sold-out positions have no entry to point at
+    entry_fk = next(
+        fk for fk in sa.inspect(op.get_bind()).get_foreign_keys("transactions")
+        if fk["constrained_columns"] == ["portfolio_entry_id"]
+    )
+    with op.batch_alter_table("transactions", naming_convention=NAMING_CONVENTION) as batch:
+        batch.drop_constraint(entry_fk["name"] or "fk_transactions_portfolio_entry_id_portfolio_entries", type_="foreignkey")
+        batch.create_foreign_key(
+            "fk_transactions_portfolio_entry_id_portfolio_entries", "portfolio_entries", ["portfolio_entry_id"], ["id"]
+        )
+    with op.batch_alter_table("portfolio_entries") as batch:
+        batch.drop_constraint("uq_portfolio_entries_user_asset", type_="unique")
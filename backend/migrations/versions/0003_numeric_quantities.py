@@ -0,0 +1,43 @@
+"""exact numeric quantities and prices for positions and the ledger
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+portfolio_entries.quantity/average_buy_price and transactions.quantity/
+price move from Float to Numeric, so the database stores what was traded
+rather than its nearest binary fraction. 18 decimal places fit ETH-style
+token quantities; prices keep 10.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+QUANTITY = sa.Numeric(36, 18)
+PRICE = sa.Numeric(28, 10)
+
+COLUMNS = {
+    "portfolio_entries": {"quantity": QUANTITY, "average_buy_price": PRICE},
+    "transactions": {"quantity": QUANTITY, "price": PRICE},
+}
+
+
+def upgrade():
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch:
+            for column, type_ in columns.items():
+                batch.alter_column(
+                    column, existing_type=sa.Float(), type_=type_, existing_nullable=False,
+                    postgresql_using=f"{column}::numeric({type_.precision}, {type_.scale})",
+                )
+
+
+def downgrade():
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch:
+            for column, type_ in columns.items():
+                batch.alter_column(column, existing_type=type_, type_=sa.Float(), existing_nullable=False)
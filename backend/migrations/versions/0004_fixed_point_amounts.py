@@ -0,0 +1,89 @@
+"""fixed-point amounts: quantities, prices and cash as BIGINT units
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Every quantity, price and cash column becomes a BIGINT count of its
+smallest unit (app.core.fixed_point): 1e-8 for quantities and prices,
+cents for money. Existing values are scaled and rounded in place.
+Price alerts keep their Float thresholds.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+QUANTITY, PRICE, MONEY = 8, 8, 2
+
+# table -> {column: (places, type before this revision, nullable)}
+COLUMNS = {
+    "wallet": {"balance": (MONEY, sa.Numeric(18, 2), False)},
+    "portfolio_entries": {
+        "quantity": (QUANTITY, sa.Numeric(36, 18), False),
+        "average_buy_price": (PRICE, sa.Numeric(28, 10), False),
+    },
+    "transactions": {
+        "quantity": (QUANTITY, sa.Numeric(36, 18), False),
+        "price": (PRICE, sa.Numeric(28, 10), False),
+    },
+    "tax_lots": {
+        "quantity": (QUANTITY, sa.Float(), False),
+        "remaining": (QUANTITY, sa.Float(), False),
+        "cost_price": (PRICE, sa.Float(), False),
+    },
+    "realized_gains": {
+        "quantity": (QUANTITY, sa.Float(), False),
+        "cost_price": (PRICE, sa.Float(), False),
+        "sale_price": (PRICE, sa.Float(), False),
+        "gain": (MONEY, sa.Float(), False),
+    },
+    "orders": {
+        "quantity": (QUANTITY, sa.Float(), False),
+        "trigger_price": (PRICE, sa.Float(), False),
+        "fill_price": (PRICE, sa.Float(), True),
+    },
+    "nav_snapshots": {
+        "holdings_value": (MONEY, sa.Numeric(18, 2), False),
+        "cash_balance": (MONEY, sa.Numeric(18, 2), False),
+        "nav": (MONEY, sa.Numeric(18, 2), False),
+    },
+}
+
+
+def _sqlite():
+    return op.get_bind().dialect.name == "sqlite"
+
+
+def upgrade():
+    for table, columns in COLUMNS.items():
+        if _sqlite():
+            # no USING clause: scale first, the batch copy keeps the integers
+            op.execute(f"UPDATE {table} SET " + ", ".join(
+                f"{column} = CAST(ROUND({column} * 1e{places}) AS INTEGER)"
+                for column, (places, _, _) in columns.items()
+            ))
+        with op.batch_alter_table(table) as batch:
+            for column, (places, type_, nullable) in columns.items():
+                batch.alter_column(
+                    column, existing_type=type_, type_=sa.BigInteger(), existing_nullable=nullable,
+                    postgresql_using=f"ROUND({column} * 1e{places})::bigint",
+                )
+
+
+def downgrade():
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch:
+            for column, (places, type_, nullable) in columns.items():
+                cast = "double precision" if isinstance(type_, sa.Float) else f"numeric({type_.precision}, {type_.scale})"
+                batch.alter_column(
+                    column, existing_type=sa.BigInteger(), type_=type_, existing_nullable=nullable,
+                    postgresql_using=f"({column} / 1e{places})::{cast}",
+                )
+        if _sqlite():
+            op.execute(f"UPDATE {table} SET " + ", ".join(
+                f"{column} = {column} / 1e{places}" for column, (places, _, _) in columns.items()
+            ))
@@ -3,7 +3,7 @@ import { TrendingUp, TrendingDown, Wallet, ArrowUpRight, ArrowDownRight, LogOut,
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 import { useNavigate } from 'react-router-dom';
 import { generateUsername } from './utils/generateUsername';
-import { getMyPortfolio, getAssets } from './services/api';
+import { getMyPortfolio, getAssets, subscribeToPrices } from './services/api';
 
 // ========================================
 // DEPOSIT MODAL COMPONENT
@@ -456,6 +456,18 @@ export default function CryptoPortfolio() {
     fetchWalletBalance();
   }, []);
 
+  // Keep prices live from the backend stream instead of re-polling /assets/
+  useEffect(() => {
+    const unsubscribe = subscribeToPrices((prices) => {
+      setAllAssets(assets => assets.map(asset =>
+        prices[asset.symbol.toUpperCase()] !== undefined
+          ? { ...asset, current_price: prices[asset.symbol.toUpperCase()] }
+          : asset
+      ));
+    });
+    return unsubscribe;
+  }, []);
+
   const fetchData = async () => {
     try {
       setLoading(true);
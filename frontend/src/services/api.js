@@ -2,6 +2,9 @@ import axios from 'axios';
 
 const API_URL = 'http://localhost:8000'; // Change to your backend URL
 
+// Send cookies cross-origin: the API uses one to keep reads on the primary database right after a write
+axios.defaults.withCredentials = true;
+
 // Create axios instance with auth header
 const createAuthHeader = () => {
   const token = localStorage.getItem('access_token');
@@ -58,6 +61,18 @@ export const getMyPortfolio = async () => {
   }
 };
 
+// Positions valued server-side with P&L, weights, totals and wallet balance
+export const getPortfolioSummary = async () => {
+  try {
+    const response = await axios.get(`${API_URL}/portfolios/summary`, {
+      headers: createAuthHeader()
+    });
+    return response.data;
+  } catch (error) {
+    throw error.response?.data?.detail || 'Failed to fetch portfolio summary';
+  }
+};
+
 export const createOrUpdatePortfolioEntry = async (asset_id, quantity, average_buy_price) => {
   try {
     const response = await axios.post(
@@ -106,6 +121,24 @@ export const getAssets = async () => {
   }
 };
 
+// Live price stream (Server-Sent Events). Calls onPrices with {SYMBOL: price}
+// for the snapshot and for every change; returns a function that closes it.
+export const subscribeToPrices = (onPrices) => {
+  const source = new EventSource(`${API_URL}/prices/stream`);
+  source.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    const prices = {};
+    Object.entries(message.prices).forEach(([symbol, price]) => {
+      prices[symbol] = parseFloat(price);
+    });
+    onPrices(prices);
+  };
+  source.onerror = (err) => {
+    console.error('Price stream error:', err);
+  };
+  return () => source.close();
+};
+
 // Transaction endpoints
 export const buyAsset = async (asset_id, quantity) => {
   try {